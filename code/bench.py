@@ -0,0 +1,332 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains a benchmark harness, to measure how fast the simulator itself runs.
+
+Every benchmark is a program run headless to completion(or its cycle limit), in a fresh worker process so
+that the peak memory of one run doesn't hide that of the next. The benchmarks are the assembled programs in
+../build, along with synthetic programs of 10^4 to 10^6 instructions. For each one, the harness reports:
+    cycles_per_second   - simulated clock cycles per second of wall time
+    peak_rss_mb         - peak resident memory of the worker process, in MB
+    stage times         - wall time spent in try_commit, try_CDB_broadcast, prefetch_tick, try_execute
+                          and try_dispatch, over the whole run
+
+The results can be saved as a baseline, and later runs compared against it. A benchmark regresses when its
+throughput drops, or its peak memory grows, by more than the tolerance. The simulated cycles are also
+compared, since a change in them means the simulator no longer behaves the same.
+
+Example:
+    python bench.py --sizes 1e4,1e5 --save-baseline bench_baseline.json
+    python bench.py --sizes 1e4,1e5 --compare bench_baseline.json
+'''
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import memory_image
+from main import Tomasulo
+from config import MachineConfig
+from constants import HistoryMode
+
+# Size(number of instructions) of the synthetic programs that are run by default
+SYNTHETIC_SIZES = [10**4, 10**5]
+
+# Pipeline stages that are timed. The memory controller's stage is looked up on the memory controller
+STAGES = ["try_commit", "try_CDB_broadcast", "prefetch_tick", "try_execute", "try_dispatch"]
+
+# Fields of the supported instructions, as (funct7, funct3, opcode)
+ENCODINGS = {
+    "ADD": (0b0000000, 0b000, 0b0110011),
+    "SUB": (0b0100000, 0b000, 0b0110011),
+    "MUL": (0b0000001, 0b000, 0b0110011),
+    "DIV": (0b0000001, 0b100, 0b0110011),
+    "ADDI": (None, 0b000, 0b0010011),
+    "LW": (None, 0b010, 0b0000011),
+    "SW": (None, 0b010, 0b0100011),
+}
+
+# Registers that the synthetic programs write to. x0 is only ever used as the base of the loads and stores,
+# and keeps its initial value of 0
+SCRATCH_REGISTERS = list(range(1, 9))
+
+# Relative frequency of the blocks that make up the synthetic programs
+SYNTHETIC_MIX = {"alu": 4, "mul": 1, "div": 1, "mem": 3}
+
+# The throughput of benchmarks that finish faster than this(in seconds) is mostly noise, so it isn't compared
+MIN_COMPARE_TIME = 0.1
+
+
+# Function to encode a register-register instruction(ADD, SUB, MUL, DIV) into its 32 bit word
+def encode_r(name, rd, rs1, rs2):
+    funct7, funct3, opcode = ENCODINGS[name]
+    return (funct7 << 25) | (rs2 << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+
+# Function to encode an instruction with a 12 bit immediate(ADDI, LW) into its 32 bit word
+def encode_i(name, rd, rs1, imm):
+    _, funct3, opcode = ENCODINGS[name]
+    return ((imm & 0xFFF) << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+
+# Function to encode a store into its 32 bit word
+def encode_s(name, rs2, base, offset):
+    _, funct3, opcode = ENCODINGS[name]
+    offset &= 0xFFF
+    return ((offset >> 5) << 25) | (rs2 << 20) | (base << 15) | (funct3 << 12) | ((offset & 0x1F) << 7) | opcode
+
+
+# Function to generate a synthetic program of n_instructions, as a list of words
+# The program is built out of small blocks, that load their operands(with ADDI or LW), compute a result and
+# sometimes store it. MUL and DIV only ever work on small immediates, and divide by a non-zero one, so the
+# values stay bounded no matter how long the program is. The blocks pick their registers at random, which
+# gives a mix of dependent and independent instructions
+def generate_program(n_instructions, mem_size, seed=0):
+    rng = random.Random(seed)
+    kinds = list(SYNTHETIC_MIX)
+    weights = list(SYNTHETIC_MIX.values())
+    words = []
+
+    def load_operand(register):
+        if rng.random() < 0.5:
+            return encode_i("ADDI", register, 0, rng.randint(-64, 64))
+
+        return encode_i("LW", register, 0, rng.randrange(mem_size))
+
+    while len(words) < n_instructions:
+        kind = rng.choices(kinds, weights)[0]
+        a, b, c = rng.sample(SCRATCH_REGISTERS, 3)
+
+        if kind == "alu":
+            words += [load_operand(a), load_operand(b), encode_r(rng.choice(["ADD", "SUB"]), c, a, b)]
+        elif kind in ["mul", "div"]:
+            words += [encode_i("ADDI", a, 0, rng.randint(-64, 64)), encode_i("ADDI", b, 0, rng.randint(1, 64)),
+                      encode_r(kind.upper(), c, a, b)]
+            if rng.random() < 0.5:
+                words.append(encode_s("SW", c, 0, rng.randrange(mem_size)))
+        else:
+            words += [encode_i("LW", a, 0, rng.randrange(mem_size)),
+                      encode_s("SW", a, 0, rng.randrange(mem_size))]
+
+    return words[:n_instructions]
+
+
+# Function to get the peak resident memory of this process in MB, or None where it can't be measured
+def get_peak_rss():
+    if resource is None:
+        return None
+
+    # ru_maxrss is in bytes on macOS, and in KB everywhere else
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return round(peak / 2**20, 2)
+
+    return round(peak / 2**10, 2)
+
+
+# Function to replace a method of an object with one that adds the time spent in it to times[name]
+def time_stage(obj, name, times):
+    method = getattr(obj, name)
+    clock = time.perf_counter
+
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            times[name] += clock() - start
+
+    setattr(obj, name, timed)
+
+
+# Function to run a single benchmark, in a worker process
+# The stages are timed by wrapping them on this machine alone, so the timers add a small, fixed cost to
+# every call, which is included in the cycles per second
+def run_benchmark(job):
+    name, program_src, data_mem_src, config = job
+
+    machine = Tomasulo(program_src, data_mem_src, HistoryMode.OFF, event_driven=True, save_memory=False,
+                       config=config)
+
+    stage_times = {stage: 0.0 for stage in STAGES}
+    for stage in STAGES:
+        time_stage(machine.get_mem_ctl() if stage == "prefetch_tick" else machine, stage, stage_times)
+
+    max_cycles = machine.get_cycle_limit()
+    start = time.perf_counter()
+    while not machine.is_complete() and machine.get_cpu_clock() < max_cycles:
+        machine.logic_loop(max_cycles)
+    wall_time = time.perf_counter() - start
+
+    cycles = machine.get_cpu_clock()
+    return {
+        "name": name,
+        "instructions": machine.get_num_instructions(),
+        "cycles": cycles,
+        "completed": machine.is_complete(),
+        "wall_time": round(wall_time, 4),
+        "cycles_per_second": round(cycles / wall_time, 1) if wall_time else 0,
+        "peak_rss_mb": get_peak_rss(),
+        "stage_times": {stage: round(value, 4) for stage, value in stage_times.items()}
+    }
+
+
+# Function to run a benchmark repeat times, each in a fresh process, and keep the fastest run
+# The peak memory is the largest one seen over all the runs
+def run_repeated(job, repeat=1, inline=False):
+    runs = []
+    for _ in range(repeat):
+        if inline:
+            runs.append(run_benchmark(job))
+            continue
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs.append(pool.submit(run_benchmark, job).result())
+
+    best = min(runs, key=lambda run: run["wall_time"])
+    rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    best["peak_rss_mb"] = max(rss) if rss else None
+
+    return best
+
+
+# Function to get the benchmarks to run as (name, program) pairs: the given programs, followed by the
+# synthetic programs of each size, which are written into work_dir as packed images
+def get_benchmarks(programs, sizes, data_mem_src, work_dir, seed=0):
+    benchmarks = [(os.path.splitext(os.path.basename(program))[0], program) for program in programs]
+
+    mem_size = len(memory_image.read_words(data_mem_src))
+    for size in sizes:
+        program_src = os.path.join(work_dir, f"synthetic_{size}.{memory_image.PACKED_PROGRAM_EXT}")
+        memory_image.write_packed(program_src, generate_program(size, mem_size, seed))
+        benchmarks.append((f"synthetic_{size}", program_src))
+
+    return benchmarks
+
+
+# Function to run all the benchmarks, and collect the results along with a description of the host
+def run_suite(programs, sizes, data_mem_src, config=None, repeat=1, inline=False, seed=0, log=None):
+    if config is None:
+        config = MachineConfig()
+
+    work_dir = tempfile.mkdtemp(prefix="tomasulo_bench_")
+    try:
+        results = {}
+        for name, program_src in get_benchmarks(programs, sizes, data_mem_src, work_dir, seed):
+            results[name] = run_repeated((name, program_src, data_mem_src, config), repeat, inline)
+            if log:
+                log(format_result(results[name]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "host": {"python": platform.python_version(), "platform": platform.platform(),
+                 "processor": platform.processor()},
+        "config": config.to_dict(),
+        "benchmarks": results
+    }
+
+
+# Function to compare the results against a baseline
+# Returns a list of messages, one for each benchmark that regressed or behaves differently
+def compare(results, baseline, tolerance=0.15):
+    problems = []
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            continue
+
+        if result["cycles"] != base["cycles"]:
+            problems.append(f"{name}: simulated {result['cycles']} cycles, the baseline took {base['cycles']}")
+
+        if base["wall_time"] >= MIN_COMPARE_TIME and \
+                result["cycles_per_second"] < base["cycles_per_second"] * (1 - tolerance):
+            problems.append(f"{name}: {result['cycles_per_second']} cycles/s, "
+                            f"down from {base['cycles_per_second']} cycles/s")
+
+        if result["peak_rss_mb"] and base["peak_rss_mb"] and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{name}: peak RSS of {result['peak_rss_mb']} MB, "
+                            f"up from {base['peak_rss_mb']} MB")
+
+    return problems
+
+
+# Function to format the result of a benchmark as a single line
+def format_result(result):
+    stages = " ".join(f"{stage}={value:.3f}s" for stage, value in result["stage_times"].items())
+    rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}MB"
+
+    return (f"{result['name']:<24} {result['instructions']:>8} inst {result['cycles']:>9} cycles "
+            f"{result['wall_time']:>8.3f}s {result['cycles_per_second']:>10.1f} cycles/s {rss:>9}  {stages}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the speed and memory use of the simulator, and compare them against a baseline")
+    parser.add_argument("programs", nargs="*", default=None,
+                        help="assembled programs(.bin/.pbin format), defaults to all the programs in ../build")
+    parser.add_argument("--data-memory", default="memory/data_memory.dat",
+                        help="data memory file(.dat/.pdat format), it is never written to")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SYNTHETIC_SIZES),
+                        help="comma separated sizes of the synthetic programs, eg: 1e4,1e5,1e6. "
+                             "Pass an empty string to skip them")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed used to generate the synthetic programs")
+    parser.add_argument("--config", default=None,
+                        help="machine config(.json/.toml/.yaml), instead of the one in constants.py")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="run every benchmark this many times, and keep the fastest run")
+    parser.add_argument("--inline", action="store_true",
+                        help="run in this process instead of a fresh one per benchmark(the peak RSS is then "
+                             "that of the whole suite so far)")
+    parser.add_argument("--save-baseline", default=None,
+                        help="write the results into this JSON file, to compare later runs against")
+    parser.add_argument("--compare", default=None,
+                        help="baseline JSON file to compare against, exits with 1 if anything regressed")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="fraction by which the throughput can drop, or the peak RSS grow, before it "
+                             "counts as a regression")
+    parser.add_argument("-o", "--output", default=None,
+                        help="write the results as JSON into this file")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob("../build/*.bin"))
+    sizes = [int(float(size)) for size in args.sizes.split(",") if size.strip()]
+    config = MachineConfig.from_file(args.config) if args.config else MachineConfig()
+
+    results = run_suite(programs, sizes, args.data_memory, config, args.repeat, args.inline, args.seed,
+                        log=lambda line: print(line, flush=True))
+
+    for filename in [args.output, args.save_baseline]:
+        if filename:
+            with open(filename, 'w') as outFile:
+                json.dump(results, outFile, indent=4)
+
+    if args.compare:
+        with open(args.compare, 'r') as baselineFile:
+            problems = compare(results, json.load(baselineFile), args.tolerance)
+
+        for problem in problems:
+            print("REGRESSION:", problem)
+
+        if problems:
+            sys.exit(1)
+
+        print(f"No regressions against {args.compare}")
@@ -1,205 +1,220 @@
-import copy
-from math import log2
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
+from collections import namedtuple
 
 from constants import DEBUG
 
-
-class CacheEntry:
-    def __init__(self) -> None:
-        self._value: int = -1
-        self._tag: int = -1
-        self._valid_bit: bool = False
-        self._dirty_bit: bool = False
-        self._busy_bit: bool = False
-
-    def update_entry(self, new_value: int, tag: int, dirty_bit: bool, valid_bit: bool = True, busy_bit: bool = False) -> None:
-        self._value = new_value
-        self._tag = tag
-        self._dirty_bit = dirty_bit
-        self._valid_bit = valid_bit
-        self._busy_bit = busy_bit
-
-    def evict(self) -> None:
-        self._valid_bit = False
-
-    def write(self, new_value: int, dirty_bit: bool = True) -> None:
-        self.update_entry(new_value, self._tag, dirty_bit, valid_bit=True)
-
-    def update_busy_bit(self, busy_bit: bool) -> None:
-        self._busy_bit = busy_bit
-
-    def update_dirty_bit(self, dirty_bit: bool) -> None:
-        self._dirty_bit = dirty_bit
-
-    def update_tag(self, new_tag: int) -> None:
-        self._tag = new_tag
-
-    def get_busy_bit(self) -> bool:
-        return self._busy_bit
-
-    def get_valid_bit(self) -> bool:
-        return self._valid_bit
-
-    def get_dirty_bit(self) -> bool:
-        return self._dirty_bit
-
-    def get_cache_value(self) -> int:
-        return self._value
-
-    def get_tag(self) -> int:
-        return self._tag
-
-    def __str__(self) -> str:
-        return f"<[{'VALID' if self._valid_bit else 'INVALID'}]CacheEntry: tag: {self._tag}, value: {self._value} [{'NOT ' if not self._dirty_bit else ''}DIRTY]>"
+# Record of a valid line that was evicted from the cache, to make space for a new line
+# addr is the address of the first word of the line, and value holds all of its words
+Victim = namedtuple("Victim", ["addr", "value", "dirty"])
 
 
+# Data structure to represent a set associative cache
+# Every line holds line_size consecutive words of the memory, starting at a multiple of line_size. All the
+# addresses given to the cache are word addresses, and the block offset of a word is addr % line_size
+# The lines are stored in flat parallel arrays(tags, values, valid/dirty/busy bits), where the line in
+# way w of set i is stored at slot i*ways + w, and its words at slot*line_size onwards. A dictionary maps
+# the line address(addr // line_size) of every line in the cache to its slot, so that lookups don't have
+# to search through the ways
 class Cache:
-    def __init__(self, size: int, name: str, ways: int = 4, fetch_on_miss: bool = False, replacement=None) -> None:
+    def __init__(self, size: int, name: str, ways: int = 4, fetch_on_miss: bool = False, replacement=None,
+                 line_size: int = 1, debug: bool = DEBUG, track_changes: bool = True) -> None:
         self._size = size
         self._ways = ways
         self._n_rows = self._size // self._ways
+        self._line_size = line_size
         self._name = name
         self._replacement_policy = replacement
         self._fetch_on_miss = fetch_on_miss
-        self._mem: List[Dict] = [defaultdict(
-            None, {}) for _ in range(self._n_rows)]
+        self._debug = debug
 
-        for row in self._mem:
-            for way in range(self._ways):
-                row[f"way {way+1}"] = CacheEntry()
+        n_slots = self._n_rows * self._ways
+        self._tags: List[int] = [-1] * n_slots
+        self._values: List[int] = [-1] * (n_slots * line_size)
+        self._valid_bits: List[bool] = [False] * n_slots
+        self._dirty_bits: List[bool] = [False] * n_slots
+        self._busy_bits: List[bool] = [False] * n_slots
 
-    # Function to get the name of the way, given the tag of the CacheEntry
-    def __find_way(self, search_tag, row):
-        for way, entry in row.items():
-            #print("way : ", way, "entry : ", entry)
-            if search_tag == entry.get_tag():
-                return way
+        self._slots: Dict[int, int] = {}
 
-        #return None
-        return False
+        # Sets whose lines or replacement state changed since the history buffer last recorded them
+        # They are only tracked if track_changes is set, when the history buffer records every cycle
+        self._track_changes = track_changes
+        self._changed_rows = set()
 
-    # Function to get the index, tag, cache row entry and the way of an entry, if it exists
-    def __find_location(self, addr):
-        index = addr % self._n_rows
-        tag = addr // self._n_rows
-        row = self._mem[index]
-        way = self.__find_way(tag, row)
+    # Function to get the slot of the line holding addr, or None if it isn't in the cache
+    def __find_slot(self, addr: int) -> Optional[int]:
+        return self._slots.get(addr // self._line_size)
 
-        return index, tag, row, way
+    # Function to get the words stored in a slot
+    def __get_words(self, slot: int) -> Tuple[int, ...]:
+        return tuple(self._values[slot * self._line_size:(slot + 1) * self._line_size])
+
+    # Function to mark a set as changed, so that only the changed sets are recorded in the history
+    def __changed(self, index: int) -> None:
+        if self._track_changes:
+            self._changed_rows.add(index)
+
+    # Function to get the address of the first word of the line holding addr
+    def get_line_address(self, addr: int) -> int:
+        return addr - addr % self._line_size
 
     # Function to update the value stored at a particular address
     def set_entry(self, addr, data):
-        _, tag, row, way = self.__find_location(addr)
-        #print(way)
-        if way:
-            entry = row[way]
+        slot = self.__find_slot(addr)
+        if slot is None:
+            return False
 
-            col_no = int(way.split(" ")[-1]) - 1
-            self._replacement_policy.update_lru(col_no, addr)
+        self.__changed(slot // self._ways)
+        self._replacement_policy.on_hit(slot // self._ways, slot % self._ways)
 
-            entry.update_entry(data, tag, True,
-                               valid_bit=True, busy_bit=True)
-            return True
-        else:
+        self._values[slot * self._line_size + addr % self._line_size] = data
+        self._dirty_bits[slot] = True
+        self._valid_bits[slot] = True
+        self._busy_bits[slot] = True
+        return True
+
+    # Function to update all the words of the line holding addr, with a dirty line written back from above
+    # The busy bit is left as it is, since this isn't an access from the processor
+    def set_line(self, addr, words):
+        slot = self.__find_slot(addr)
+        if slot is None:
             return False
 
-    # Function to get a CacheEntry, if it exists in the cache
+        self.__changed(slot // self._ways)
+        self._replacement_policy.on_hit(slot // self._ways, slot % self._ways)
+
+        self._values[slot * self._line_size:(slot + 1) * self._line_size] = words
+        self._dirty_bits[slot] = True
+        self._valid_bits[slot] = True
+        return True
+
+    # Function to get the value stored at addr, if it exists in the cache and is not busy
+    # Returns None on a miss(or a busy line), since 0 is a valid value that has to be told apart from it
     def get_memory_entry(self, addr):
-        _, _, row, way = self.__find_location(addr)
-
-        if way:
-            entry = row[way]
-            #print("In get memory entry when way is true: ", entry)
-            col_no = int(way.split(" ")[-1]) - 1
-            self._replacement_policy.update_lru(col_no, addr)
-            print(addr,entry.get_busy_bit())
-            if entry.get_busy_bit():
-                return False
-            else:
-                return entry.get_cache_value()
+        slot = self.__find_slot(addr)
+        if slot is None:
+            return None
+
+        self.__changed(slot // self._ways)
+        self._replacement_policy.on_hit(slot // self._ways, slot % self._ways)
+        if self._debug:
+            print(addr, self._busy_bits[slot])
+
+        if self._busy_bits[slot]:
+            return None
         else:
-            return False
+            return self._values[slot * self._line_size + addr % self._line_size]
+
+    # Function to get all the words of the line holding addr, without counting it as an access
+    # Returns None if the line isn't in the cache
+    def get_line(self, addr) -> Optional[Tuple[int, ...]]:
+        slot = self.__find_slot(addr)
+        if slot is None:
+            return None
+
+        return self.__get_words(slot)
+
+    # Function to get every valid line in the cache, as a Victim record of its address, words and dirty bit
+    def get_lines(self) -> List[Victim]:
+        return [Victim(line * self._line_size, self.__get_words(slot), self._dirty_bits[slot])
+                for line, slot in self._slots.items()]
 
     # Function to check if a particular entry exists in the cache
     def has_entry(self, addr):
-        _, _, _, way = self.__find_location(addr)
-
-        if way:
-            return True
-        else:
-            return False
+        return addr // self._line_size in self._slots
 
     # Set the busy bit of a cache entry, if data @ addr is stored in cache
     def update_busy_bit(self, addr, value=False):
-        _, _, row, way = self.__find_location(addr)
-
-        if way:
-            entry = row[way]
-            entry.update_busy_bit(value)
-            return True
-        else:
+        slot = self.__find_slot(addr)
+        if slot is None:
             return False
 
+        self._busy_bits[slot] = value
+        self.__changed(slot // self._ways)
+        return True
+
     # If add exists then return its Busy bit
     def get_busy_bit(self, addr):
-        _, _, row, way = self.__find_location(addr)
-
-        if way:
-            entry = row[way]
-            return entry.get_busy_bit()
-        else:
+        slot = self.__find_slot(addr)
+        if slot is None:
             return False
 
+        return self._busy_bits[slot]
 
     def update_dirty_bit(self, addr, value):
-        _, _, row, way = self.__find_location(addr)
-
-        if way:
-            row[way].update_dirty_bit(value)
-            return True
-        else:
+        slot = self.__find_slot(addr)
+        if slot is None:
             return False
 
-    # Function to add a new entry into the cache
-    # Utilizes the replacement policy to find a new cache memory location
-    def add_entry(self, data, addr, dirty_bit=False, busy_bit=False):
-        evicted_way_idx = self._replacement_policy.evict_index(addr)
-        evict_way = list(self._mem[0].keys())[evicted_way_idx]
+        self._dirty_bits[slot] = value
+        self.__changed(slot // self._ways)
+        return True
 
-        index = addr % self._n_rows
+    # Function to find the slot for a new line in a set. The first invalid way is used if there is one,
+    # and the replacement policy chooses the victim only when every way holds a valid line. The policy is told
+    # about every invalidated way, so the order it keeps still matches the lines after they are filled
+    def __get_fill_slot(self, index: int) -> int:
+        first = index * self._ways
+        for slot in range(first, first + self._ways):
+            if not self._valid_bits[slot]:
+                return slot
 
-        evicting_entry = copy.deepcopy(self._mem[index][evict_way])
-        was_dirty_true = evicting_entry.get_dirty_bit()
-        was_value = evicting_entry.get_cache_value()
-        was_tag = evicting_entry.get_tag()
+        return first + self._replacement_policy.evict_index(index)
 
-        tag = addr // self._n_rows
+    # Function to add a new line into the cache, holding the words of the line that addr is in
+    # Returns the Victim that was evicted, or None if no valid line was evicted(or addr is already cached)
+    def add_entry(self, words, addr, dirty_bit=False, busy_bit=False) -> Optional[Victim]:
+        line = addr // self._line_size
+        if line in self._slots:
+            return None
 
-        for i in list(self._mem[0].keys()):
-            if(self._mem[index][i].get_tag() == tag):
-                return False
+        index = line % self._n_rows
+        slot = self.__get_fill_slot(index)
 
-        if DEBUG:
-            print("Updating tag ", tag, " value ", data)
+        victim = None
+        if self._valid_bits[slot]:
+            victim_line = self._tags[slot] * self._n_rows + index
+            victim = Victim(victim_line * self._line_size, self.__get_words(slot), self._dirty_bits[slot])
+            del self._slots[victim_line]
 
-        self._mem[index][evict_way].update_entry(
-            data, tag, dirty_bit, True, busy_bit)
+            if self._debug:
+                print("Evict", victim)
 
-        self._replacement_policy.update_lru(evicted_way_idx, addr)
+        if self._debug:
+            print("Updating tag ", line // self._n_rows, " value ", words)
 
-        if DEBUG:
-            print(was_dirty_true, was_value)
+        self._tags[slot] = line // self._n_rows
+        self._values[slot * self._line_size:(slot + 1) * self._line_size] = words
+        self._dirty_bits[slot] = dirty_bit
+        self._valid_bits[slot] = True
+        self._busy_bits[slot] = busy_bit
+        self._slots[line] = slot
+        self.__changed(index)
 
-        if(was_dirty_true):
-            if DEBUG:
-                print("Evict tag ", was_tag, " Value ", was_value)
+        self._replacement_policy.on_fill(index, slot % self._ways)
 
-            was_tag = was_tag*self._n_rows
-            return [was_tag+index, was_value]
-        else:
-            return False
+        return victim
+
+    # Function to remove the line holding addr from the cache
+    # Returns the line as a Victim, or None if it wasn't in the cache
+    def invalidate(self, addr) -> Optional[Victim]:
+        line = addr // self._line_size
+        slot = self._slots.pop(line, None)
+        if slot is None:
+            return None
+
+        victim = Victim(line * self._line_size, self.__get_words(slot), self._dirty_bits[slot])
+
+        self._tags[slot] = -1
+        self._values[slot * self._line_size:(slot + 1) * self._line_size] = [-1] * self._line_size
+        self._valid_bits[slot] = False
+        self._dirty_bits[slot] = False
+        self._busy_bits[slot] = False
+        self.__changed(slot // self._ways)
+
+        self._replacement_policy.on_invalidate(slot // self._ways, slot % self._ways)
+
+        return victim
 
     # Check if prefetcher is to be used or not
     def get_prefetch_on_miss(self):
@@ -209,6 +224,70 @@ class Cache:
     def get_name(self):
         return self._name
 
+    # Get the number of lines, ways and words per line in the cache
+    def get_size(self):
+        return self._size
+
+    def get_ways(self):
+        return self._ways
+
+    def get_line_size(self):
+        return self._line_size
+
+    # Function to get the state of a line, as (tag, words, valid bit, dirty bit, busy bit)
+    def __get_line(self, slot):
+        return (self._tags[slot], self.__get_words(slot), self._valid_bits[slot],
+                self._dirty_bits[slot], self._busy_bits[slot])
+
     # For GUI, get the entire cache
+    # Returns a list of rows, each having a (tag, words, valid bit, dirty bit, busy bit) tuple for every way
     def get_cache(self):
-        return self._mem
+        return [[self.__get_line(index * self._ways + way) for way in range(self._ways)]
+                for index in range(self._n_rows)]
+
+    # Function to get the contents of every row and the replacement state, for the history buffer
+    def save_state(self):
+        state = {}
+        for index, row in enumerate(self.get_cache()):
+            state[("row", index)] = tuple(row)
+
+        for index, value in self._replacement_policy.save_state().items():
+            state[("replacement", index)] = value
+
+        return state
+
+    # Function to get the state of only the rows that changed since the last call, along with their
+    # replacement state, for the history buffer
+    def save_changes(self):
+        state = {}
+        for index in self._changed_rows:
+            state[("row", index)] = tuple(self.__get_line(index * self._ways + way) for way in range(self._ways))
+
+        for index, value in self._replacement_policy.save_state(self._changed_rows).items():
+            state[("replacement", index)] = value
+
+        self._changed_rows = set()
+        return state
+
+    # Function to restore the rows and the replacement state
+    def restore_state(self, state):
+        replacement_state = {}
+        for (kind, index), value in state.items():
+            if kind == "row":
+                for way, line in enumerate(value):
+                    slot = index * self._ways + way
+
+                    old_tag = self._tags[slot]
+                    if old_tag >= 0 and self._slots.get(old_tag * self._n_rows + index) == slot:
+                        del self._slots[old_tag * self._n_rows + index]
+
+                    (self._tags[slot], words, self._valid_bits[slot],
+                     self._dirty_bits[slot], self._busy_bits[slot]) = line
+                    self._values[slot * self._line_size:(slot + 1) * self._line_size] = words
+
+                    if line[0] >= 0:
+                        self._slots[line[0] * self._n_rows + index] = slot
+            else:
+                replacement_state[index] = value
+
+        self._replacement_policy.restore_state(replacement_state)
@@ -0,0 +1,24 @@
+'''
+Registry of the data prefetchers. Every module here defines a Prefetcher class with the same interface:
+    Prefetcher(size, degree=1, distance=1, ...)  - size is the number of lines in the memory
+    prefetch_addresses(addr, pc=None)            - list of addresses to prefetch, on an access to addr
+                                                   by the load at pc
+    save_state()/restore_state(state)            - for the history buffer
+'''
+
+from cache_algos.prefetcher import next_line, none, stride, stream
+
+PREFETCHERS = {
+    "next_line": next_line.Prefetcher,
+    "none": none.Prefetcher,
+    "stride": stride.Prefetcher,
+    "stream": stream.Prefetcher,
+}
+
+
+# Function to create a prefetcher, given its name
+def get_prefetcher(name, size, degree=1, distance=1, **kwargs):
+    if name.lower() not in PREFETCHERS:
+        raise ValueError(f"Unknown prefetcher: {name}. Available prefetchers: {', '.join(PREFETCHERS)}")
+
+    return PREFETCHERS[name.lower()](size, degree, distance, **kwargs)
@@ -1,10 +1,23 @@
+from typing import List, Optional, Tuple
+
+
+# Next-N line prefetcher. On every access to addr, the `degree` lines starting `distance` lines after it
+# are prefetched. The default(degree=1, distance=1) is the plain next line prefetcher
 class Prefetcher:
-    def __init__(self, size: int) -> None:
-        self._name: str = "Next Line"
+    def __init__(self, size: int, degree: int = 1, distance: int = 1) -> None:
+        self._name: str = "Next Line" if degree == 1 else f"Next {degree} Lines"
         self._size: int = size
+        self._degree: int = degree
+        self._distance: int = distance
+
+    def prefetch_addresses(self, addr: int, pc: Optional[int] = None) -> List[int]:
+        return [(addr + self._distance + i) % self._size for i in range(self._degree)]
+
+    def save_state(self) -> Tuple:
+        return ()
 
-    def prefetch_address(self, addr: int) -> int:
-        return (addr+1) % self._size
+    def restore_state(self, state: Tuple) -> None:
+        pass
 
     def __str__(self) -> str:
         return self._name
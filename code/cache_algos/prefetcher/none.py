@@ -0,0 +1,20 @@
+from typing import List, Optional, Tuple
+
+
+# Prefetcher that never prefetches anything, to measure the machine without prefetching
+class Prefetcher:
+    def __init__(self, size: int, degree: int = 1, distance: int = 1) -> None:
+        self._name: str = "None"
+        self._size: int = size
+
+    def prefetch_addresses(self, addr: int, pc: Optional[int] = None) -> List[int]:
+        return []
+
+    def save_state(self) -> Tuple:
+        return ()
+
+    def restore_state(self, state: Tuple) -> None:
+        pass
+
+    def __str__(self) -> str:
+        return self._name
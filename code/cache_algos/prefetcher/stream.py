@@ -0,0 +1,56 @@
+from typing import List, Optional, Tuple
+
+
+# Stream buffer prefetcher. A few streams are tracked, each with the last address it saw and its direction.
+# An access within `window` lines of a stream's last address continues that stream, and an access in the same
+# direction as the previous one confirms it. Confirmed streams prefetch the `degree` lines starting `distance`
+# lines ahead of the access. Accesses that don't continue any stream replace the least recently used one
+class Prefetcher:
+    def __init__(self, size: int, degree: int = 1, distance: int = 1, n_streams: int = 4, window: int = 4) -> None:
+        self._name: str = "Stream"
+        self._size: int = size
+        self._degree: int = degree
+        self._distance: int = distance
+        self._n_streams: int = n_streams
+        self._window: int = window
+
+        # [last address, direction(-1, 0 or 1), confirmed], the most recently used stream is at the end
+        self._streams: List[List] = []
+
+    # Function to find the stream that addr continues, if any
+    def __find_stream(self, addr: int) -> Optional[int]:
+        for i in range(len(self._streams) - 1, -1, -1):
+            if 0 < abs(addr - self._streams[i][0]) <= self._window:
+                return i
+
+        return None
+
+    def prefetch_addresses(self, addr: int, pc: Optional[int] = None) -> List[int]:
+        index = self.__find_stream(addr)
+
+        if index is None:
+            if len(self._streams) >= self._n_streams:
+                self._streams.pop(0)
+
+            self._streams.append([addr, 0, False])
+            return []
+
+        last_addr, direction, _ = self._streams.pop(index)
+        new_direction = 1 if addr > last_addr else -1
+        stream = [addr, new_direction, new_direction == direction]
+        self._streams.append(stream)
+
+        if not stream[2]:
+            return []
+
+        addresses = [addr + new_direction * (self._distance + n) for n in range(self._degree)]
+        return [address for address in addresses if 0 <= address < self._size]
+
+    def save_state(self) -> Tuple:
+        return tuple(tuple(stream) for stream in self._streams)
+
+    def restore_state(self, state: Tuple) -> None:
+        self._streams = [list(stream) for stream in state]
+
+    def __str__(self) -> str:
+        return self._name
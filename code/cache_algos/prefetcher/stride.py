@@ -0,0 +1,76 @@
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+
+# States of the entries of the reference prediction table
+INITIAL = 0
+TRANSIENT = 1
+STEADY = 2
+NO_PREDICTION = 3
+
+
+# PC indexed stride prefetcher, using a reference prediction table(RPT, Chen and Baer, 1995)
+# Every load instruction gets an entry with the last address it accessed, the stride between its last two
+# accesses and a state. Once the same stride is seen twice in a row, the entry is STEADY, and the `degree`
+# addresses starting `distance` strides ahead are prefetched. The least recently used entry is replaced
+# when the table is full. Accesses without a PC are not predicted
+class Prefetcher:
+    def __init__(self, size: int, degree: int = 1, distance: int = 1, table_size: int = 64) -> None:
+        self._name: str = "Stride(RPT)"
+        self._size: int = size
+        self._degree: int = degree
+        self._distance: int = distance
+        self._table_size: int = table_size
+
+        # PC: (last address, stride, state)
+        self._table: OrderedDict = OrderedDict()
+
+    # Function to update the entry of the PC with the new address, following the RPT state machine
+    def __update(self, pc: int, addr: int) -> Tuple[int, int]:
+        if pc not in self._table:
+            if len(self._table) >= self._table_size:
+                self._table.popitem(last=False)
+
+            self._table[pc] = (addr, 0, INITIAL)
+            return 0, INITIAL
+
+        last_addr, stride, state = self._table[pc]
+        self._table.move_to_end(pc)
+
+        new_stride = addr - last_addr
+        correct = new_stride == stride
+
+        if state == INITIAL:
+            state = STEADY if correct else TRANSIENT
+        elif state == TRANSIENT:
+            state = STEADY if correct else NO_PREDICTION
+        elif state == STEADY:
+            state = STEADY if correct else INITIAL
+        else:
+            state = TRANSIENT if correct else NO_PREDICTION
+
+        # The stride is only kept in the steady state, when the prediction is wrong
+        if not (correct or state == INITIAL):
+            stride = new_stride
+
+        self._table[pc] = (addr, stride, state)
+        return stride, state
+
+    def prefetch_addresses(self, addr: int, pc: Optional[int] = None) -> List[int]:
+        if pc is None:
+            return []
+
+        stride, state = self.__update(pc, addr)
+        if state != STEADY or stride == 0:
+            return []
+
+        addresses = [addr + stride * (self._distance + i) for i in range(self._degree)]
+        return [address for address in addresses if 0 <= address < self._size]
+
+    def save_state(self) -> Tuple:
+        return tuple(self._table.items())
+
+    def restore_state(self, state: Tuple) -> None:
+        self._table = OrderedDict(state)
+
+    def __str__(self) -> str:
+        return self._name
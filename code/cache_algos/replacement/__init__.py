@@ -0,0 +1,30 @@
+'''
+Registry of the cache replacement policies. Every module here defines a Replacement_policy class with
+the same interface, working on the set index and way number of the accessed lines:
+    evict_index(index)        - way of the set to be evicted for a new line
+    on_hit(index, way)        - the line in that way was read/written
+    on_fill(index, way)       - a new line was added into that way
+    on_invalidate(index, way) - the line in that way was removed, so the way is the next one to be filled
+    save_state(indices)       - state of the sets in indices(every set if it is None), along with any state
+                                shared by all of them, for the history buffer
+    restore_state(state)      - restores the sets(and the shared state) given in the state
+'''
+
+from cache_algos.replacement import lru, plru, fifo, random_policy, srrip, brrip
+
+POLICIES = {
+    "lru": lru.Replacement_policy,
+    "plru": plru.Replacement_policy,
+    "fifo": fifo.Replacement_policy,
+    "random": random_policy.Replacement_policy,
+    "srrip": srrip.Replacement_policy,
+    "brrip": brrip.Replacement_policy,
+}
+
+
+# Function to create a replacement policy for a cache, given the name of the policy
+def get_policy(name, size, ways, **kwargs):
+    if name.lower() not in POLICIES:
+        raise ValueError(f"Unknown replacement policy: {name}. Available policies: {', '.join(POLICIES)}")
+
+    return POLICIES[name.lower()](size, ways, **kwargs)
@@ -0,0 +1,32 @@
+from typing import Dict, Iterable, Optional
+
+from cache_algos.replacement.srrip import Replacement_policy as SRRIP
+
+
+# Bimodal RRIP. Same as SRRIP, except that lines are mostly added with a distant re-reference
+# interval(2^M - 1), and only once every `throttle` fills with a long re-reference interval(2^M - 2).
+# This keeps scanning/thrashing access patterns from flushing the useful lines out of the cache.
+# A fill counter is used instead of a random number, so that the simulation can be repeated
+class Replacement_policy(SRRIP):
+    def __init__(self, size: int, ways: int, rrpv_bits: int = 2, throttle: int = 32) -> None:
+        super().__init__(size, ways, rrpv_bits)
+        self._name = "BRRIP"
+        self._throttle: int = throttle
+        self._n_fills: int = 0
+
+    def insertion_rrpv(self) -> int:
+        self._n_fills = (self._n_fills + 1) % self._throttle
+        if self._n_fills == 0:
+            return self._max_rrpv - 1
+
+        return self._max_rrpv
+
+    def save_state(self, indices: Optional[Iterable[int]] = None) -> Dict:
+        state = super().save_state(indices)
+        state["n_fills"] = self._n_fills
+        return state
+
+    def restore_state(self, state: Dict) -> None:
+        state = dict(state)
+        self._n_fills = state.pop("n_fills", self._n_fills)
+        super().restore_state(state)
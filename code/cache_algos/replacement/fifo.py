@@ -0,0 +1,40 @@
+from typing import List, Dict, Tuple, Iterable, Optional
+from collections import OrderedDict
+
+
+# First in, first out. The ways of every set are kept in an ordered dictionary, in the order in which their
+# lines were added, and accessing a line doesn't change anything. The order is kept instead of a round robin
+# pointer, so that a way whose line was removed can be moved to the front, and is the next one to be filled
+class Replacement_policy:
+    def __init__(self, size: int, ways: int) -> None:
+        self._name: str = "FIFO"
+        self._size: int = size
+        self._ways: int = ways
+        self._no_rows: int = size//ways
+        self._order: List[OrderedDict] = [OrderedDict.fromkeys(range(self._ways))
+                                          for _ in range(self._no_rows)]
+
+    def evict_index(self, index: int) -> int:
+        return next(iter(self._order[index]))
+
+    def on_hit(self, index: int, way: int) -> None:
+        pass
+
+    def on_fill(self, index: int, way: int) -> None:
+        self._order[index].move_to_end(way)
+
+    def on_invalidate(self, index: int, way: int) -> None:
+        self._order[index].move_to_end(way, last=False)
+
+    def save_state(self, indices: Optional[Iterable[int]] = None) -> Dict[int, Tuple]:
+        if indices is None:
+            indices = range(self._no_rows)
+
+        return {index: tuple(self._order[index]) for index in indices}
+
+    def restore_state(self, state: Dict[int, Tuple]) -> None:
+        for index, order in state.items():
+            self._order[index] = OrderedDict.fromkeys(order)
+
+    def __str__(self) -> str:
+        return self._name
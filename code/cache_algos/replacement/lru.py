@@ -1,29 +1,43 @@
-from typing import List
+from typing import List, Dict, Tuple, Iterable, Optional
+from collections import OrderedDict
 
 
-# if more the lru number, least it is accessed
+# True LRU. The ways of every set are kept in an ordered dictionary, from the least recently used to the
+# most recently used, so that both finding the victim and updating the order on an access are O(1)
 class Replacement_policy:
     def __init__(self, size: int, ways: int) -> None:
         self._name: str = "LRU"
         self._size: int = size
         self._ways: int = ways
         self._no_rows: int = size//ways
-        self._lru_number: List[List[int]] = [[i for i in range(self._ways)] for _ in range(
-            self._size//self._ways)]
+        self._order: List[OrderedDict] = [OrderedDict.fromkeys(reversed(range(self._ways)))
+                                          for _ in range(self._no_rows)]
 
-    def evict_index(self, addr: int) -> int:
-        index: int = addr % self._no_rows
-        return self._lru_number[index].index(max(self._lru_number[index]))
+    # Function to get the way to be evicted from the set at index
+    def evict_index(self, index: int) -> int:
+        return next(iter(self._order[index]))
 
-    def update_lru(self, column_no: int, addr: int) -> None:
-        index: int = addr % self._no_rows
-        previous_lru_value: int = self._lru_number[index][column_no]
+    # Function to update the order, when a way is read/written
+    def on_hit(self, index: int, way: int) -> None:
+        self._order[index].move_to_end(way)
 
-        for i in range(self._ways):
-            if self._lru_number[index][i] < previous_lru_value:
-                self._lru_number[index][i] = self._lru_number[index][i] + 1
+    # Function to update the order, when a new line is added into a way
+    def on_fill(self, index: int, way: int) -> None:
+        self._order[index].move_to_end(way)
 
-        self._lru_number[index][column_no] = 0
+    # Function to update the order, when the line in a way is removed. The way becomes the least recently used
+    def on_invalidate(self, index: int, way: int) -> None:
+        self._order[index].move_to_end(way, last=False)
+
+    def save_state(self, indices: Optional[Iterable[int]] = None) -> Dict[int, Tuple]:
+        if indices is None:
+            indices = range(self._no_rows)
+
+        return {index: tuple(self._order[index]) for index in indices}
+
+    def restore_state(self, state: Dict[int, Tuple]) -> None:
+        for index, order in state.items():
+            self._order[index] = OrderedDict.fromkeys(order)
 
     def __str__(self) -> str:
         return self._name
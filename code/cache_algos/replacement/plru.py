@@ -0,0 +1,75 @@
+from typing import List, Dict, Iterable, Optional
+
+
+# Tree pseudo-LRU. Every set has a binary tree of ways-1 bits, stored as a bitmask with the root at bit 1
+# and the children of node n at 2n and 2n+1. Each bit points towards the half of the subtree that was
+# used less recently(0 for left, 1 for right). The number of ways must be a power of 2
+class Replacement_policy:
+    def __init__(self, size: int, ways: int) -> None:
+        if ways & (ways - 1):
+            raise ValueError(f"Tree-PLRU needs the number of ways to be a power of 2, got {ways}")
+
+        self._name: str = "Tree-PLRU"
+        self._size: int = size
+        self._ways: int = ways
+        self._no_rows: int = size//ways
+        self._bits: List[int] = [0 for _ in range(self._no_rows)]
+
+    # Function to get the way to be evicted, by following the bits from the root
+    def evict_index(self, index: int) -> int:
+        bits: int = self._bits[index]
+        node: int = 1
+        while node < self._ways:
+            node = 2*node + ((bits >> node) & 1)
+
+        return node - self._ways
+
+    # Function to make all the bits on the path to the way point away from it
+    def __touch(self, index: int, way: int) -> None:
+        bits: int = self._bits[index]
+        node: int = way + self._ways
+        while node > 1:
+            parent: int = node // 2
+            if node & 1:
+                bits &= ~(1 << parent)
+            else:
+                bits |= 1 << parent
+            node = parent
+
+        self._bits[index] = bits
+
+    # Function to make all the bits on the path to the way point towards it, so that it is the next victim
+    def __point(self, index: int, way: int) -> None:
+        bits: int = self._bits[index]
+        node: int = way + self._ways
+        while node > 1:
+            parent: int = node // 2
+            if node & 1:
+                bits |= 1 << parent
+            else:
+                bits &= ~(1 << parent)
+            node = parent
+
+        self._bits[index] = bits
+
+    def on_hit(self, index: int, way: int) -> None:
+        self.__touch(index, way)
+
+    def on_fill(self, index: int, way: int) -> None:
+        self.__touch(index, way)
+
+    def on_invalidate(self, index: int, way: int) -> None:
+        self.__point(index, way)
+
+    def save_state(self, indices: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        if indices is None:
+            indices = range(self._no_rows)
+
+        return {index: self._bits[index] for index in indices}
+
+    def restore_state(self, state: Dict[int, int]) -> None:
+        for index, bits in state.items():
+            self._bits[index] = bits
+
+    def __str__(self) -> str:
+        return self._name
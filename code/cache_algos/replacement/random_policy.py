@@ -0,0 +1,39 @@
+import random
+from typing import Dict, Iterable, Optional
+
+
+# Random replacement. The random number generator is seeded, so that the simulation can be repeated
+class Replacement_policy:
+    def __init__(self, size: int, ways: int, seed: int = 0) -> None:
+        self._name: str = "Random"
+        self._size: int = size
+        self._ways: int = ways
+        self._no_rows: int = size//ways
+        self._random = random.Random(seed)
+
+    def evict_index(self, index: int) -> int:
+        return self._random.randrange(self._ways)
+
+    def on_hit(self, index: int, way: int) -> None:
+        pass
+
+    def on_fill(self, index: int, way: int) -> None:
+        pass
+
+    def on_invalidate(self, index: int, way: int) -> None:
+        pass
+
+    # The only state is the state of the random number generator. It is only drawn from when a line is
+    # evicted, which changes a set, so it is left out when no set changed
+    def save_state(self, indices: Optional[Iterable[int]] = None) -> Dict:
+        if indices is not None and not indices:
+            return {}
+
+        return {"random": self._random.getstate()}
+
+    def restore_state(self, state: Dict) -> None:
+        if "random" in state:
+            self._random.setstate(state["random"])
+
+    def __str__(self) -> str:
+        return self._name
@@ -0,0 +1,56 @@
+from typing import List, Dict, Tuple, Iterable, Optional
+
+
+# Static re-reference interval prediction(SRRIP, Jaleel et al., ISCA 2010)
+# Every line has an M bit re-reference prediction value(RRPV). Lines are added with a long re-reference
+# interval(2^M - 2), and predicted to be re-referenced immediately(0) on a hit. The victim is the first
+# way with a distant re-reference interval(2^M - 1). If there is none, all the RRPVs of the set are aged
+class Replacement_policy:
+    def __init__(self, size: int, ways: int, rrpv_bits: int = 2) -> None:
+        self._name: str = "SRRIP"
+        self._size: int = size
+        self._ways: int = ways
+        self._no_rows: int = size//ways
+        self._max_rrpv: int = (1 << rrpv_bits) - 1
+        self._rrpv: List[List[int]] = [[self._max_rrpv for _ in range(self._ways)]
+                                       for _ in range(self._no_rows)]
+
+    # Function to get the way to be evicted. Ageing all the ways until one of them reaches the maximum
+    # RRPV is done in a single step, by adding the difference to all of them
+    def evict_index(self, index: int) -> int:
+        rrpv: List[int] = self._rrpv[index]
+        oldest: int = max(rrpv)
+
+        if oldest < self._max_rrpv:
+            age: int = self._max_rrpv - oldest
+            for way in range(self._ways):
+                rrpv[way] += age
+
+        return rrpv.index(self._max_rrpv)
+
+    def on_hit(self, index: int, way: int) -> None:
+        self._rrpv[index][way] = 0
+
+    # Function to get the RRPV of a newly added line
+    def insertion_rrpv(self) -> int:
+        return self._max_rrpv - 1
+
+    def on_fill(self, index: int, way: int) -> None:
+        self._rrpv[index][way] = self.insertion_rrpv()
+
+    # A removed line is never going to be re-referenced, so it gets a distant re-reference interval
+    def on_invalidate(self, index: int, way: int) -> None:
+        self._rrpv[index][way] = self._max_rrpv
+
+    def save_state(self, indices: Optional[Iterable[int]] = None) -> Dict[int, Tuple]:
+        if indices is None:
+            indices = range(self._no_rows)
+
+        return {index: tuple(self._rrpv[index]) for index in indices}
+
+    def restore_state(self, state: Dict[int, Tuple]) -> None:
+        for index, rrpv in state.items():
+            self._rrpv[index] = list(rrpv)
+
+    def __str__(self) -> str:
+        return self._name
@@ -0,0 +1,341 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the description of the machine, and the cache hierarchy used by the memory controller.
+
+The hierarchy is a list of cache levels, from the one closest to the processor(L1D) to the one closest
+to the memory, followed by the latency of the memory itself. It can be read from a JSON, TOML or YAML file:
+
+    {
+        "memory_latency": 10,
+        "levels": [
+            {"name": "L1D", "size": 2, "ways": 2, "line_size": 1, "latency": 1, "replacement": "lru"},
+            {"name": "L2D", "size": 4, "ways": 2, "line_size": 1, "latency": 5, "replacement": "lru",
+             "inclusion": "nine", "prefetcher": {"name": "next_line", "degree": 1, "distance": 1}}
+        ]
+    }
+
+The inclusion policy of a level decides how it relates to the levels above it:
+    nine        - non-inclusive non-exclusive, lines are filled into every level on the way up
+    inclusive   - evicting a line from this level also invalidates it in the levels above
+    exclusive   - lines are not filled into this level on the way up, it only holds lines evicted from the
+                  level above, and a hit moves the line up out of this level
+
+The hierarchy is part of the config of the whole machine(MachineConfig), which also holds the initial ARF values,
+the sizes of the ROB, reservation stations and load store buffer, the select policy used by the reservation
+stations, the width of each stage of the pipeline, the cycles taken by each instruction, and the functional
+units of each class of instructions(ALU, MUL, DIV and MEM).
+It is read from the same formats, with the hierarchy under its own key:
+
+    {
+        "rob_size": 16,
+        "dispatch_width": 2,
+        "num_cycles": {"MUL": 5},
+        "functional_units": {"DIV": {"count": 2, "pipelined": false}},
+        "hierarchy": {"memory_latency": 20, "levels": [...]}
+    }
+
+Anything missing from the file is taken from the constants.
+'''
+
+import os
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+import constants
+from cache_algos.prefetcher import PREFETCHERS
+from cache_algos.replacement import POLICIES
+from functional_units import OP_CLASSES
+from select_policy import SELECT_POLICIES
+
+INCLUSION_POLICIES = ["nine", "inclusive", "exclusive"]
+
+
+# Function to read a config file into a dictionary, the format is chosen using its extension
+def read_config_file(filename):
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension == ".json":
+        with open(filename, 'r') as configFile:
+            return json.load(configFile)
+    elif extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+
+        with open(filename, 'rb') as configFile:
+            return tomllib.load(configFile)
+    elif extension in [".yaml", ".yml"]:
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is needed to read YAML configs, install it with: pip install pyyaml")
+
+        with open(filename, 'r') as configFile:
+            return yaml.safe_load(configFile)
+
+    raise ValueError(f"Unknown config format: {filename}, expected a .json, .toml or .yaml file")
+
+
+# Prefetcher attached to a cache level. Prefetched lines are brought from the memory into that level
+@dataclass
+class PrefetcherConfig:
+    name: str = constants.PREFETCHER
+    degree: int = constants.PREFETCH_DEGREE
+    distance: int = constants.PREFETCH_DISTANCE
+
+    @classmethod
+    def from_dict(cls, params):
+        if isinstance(params, str):
+            params = {"name": params}
+
+        prefetcher = cls(**params)
+        if prefetcher.name not in PREFETCHERS:
+            raise ValueError(f"Unknown prefetcher: {prefetcher.name}, expected one of {list(PREFETCHERS)}")
+
+        if prefetcher.degree < 1 or prefetcher.distance < 1:
+            raise ValueError(f"Prefetch degree and distance must be at least 1, got {prefetcher}")
+
+        return prefetcher
+
+
+# Geometry and behaviour of a single level of the cache hierarchy
+# size is the number of lines in the cache, and line_size is the number of words in each line
+@dataclass
+class CacheLevelConfig:
+    name: str
+    size: int
+    ways: int
+    latency: int
+    line_size: int = 1
+    inclusion: str = "nine"
+    replacement: str = "lru"
+    prefetcher: Optional[PrefetcherConfig] = None
+
+    @classmethod
+    def from_dict(cls, params):
+        params = dict(params)
+        prefetcher = params.pop("prefetcher", None)
+        if prefetcher is not None and prefetcher != "none":
+            params["prefetcher"] = PrefetcherConfig.from_dict(prefetcher)
+
+        level = cls(**params)
+        level.validate()
+        return level
+
+    # Function to check that the level can be built, raises a ValueError otherwise
+    def validate(self):
+        if self.size < 1 or self.ways < 1 or self.size % self.ways:
+            raise ValueError(f"{self.name}: size({self.size}) must be a positive multiple of ways({self.ways})")
+
+        if self.line_size < 1:
+            raise ValueError(f"{self.name}: line_size must be at least 1 word")
+
+        if self.latency < 0:
+            raise ValueError(f"{self.name}: latency can't be negative")
+
+        if self.inclusion not in INCLUSION_POLICIES:
+            raise ValueError(f"{self.name}: unknown inclusion policy {self.inclusion}, "
+                             f"expected one of {INCLUSION_POLICIES}")
+
+        if self.replacement not in POLICIES:
+            raise ValueError(f"{self.name}: unknown replacement policy {self.replacement}, "
+                             f"expected one of {list(POLICIES)}")
+
+
+# The entire cache hierarchy, from L1D down to the memory
+@dataclass
+class HierarchyConfig:
+    levels: List[CacheLevelConfig] = field(default_factory=list)
+    memory_latency: int = constants.MEMORY_LATENCY
+
+    @classmethod
+    def from_dict(cls, params):
+        hierarchy = cls([CacheLevelConfig.from_dict(level) for level in params.get("levels", [])],
+                        params.get("memory_latency", constants.MEMORY_LATENCY))
+        hierarchy.validate()
+        return hierarchy
+
+    # Function to read the hierarchy from a config file, the format is chosen using its extension
+    @classmethod
+    def from_file(cls, filename):
+        return cls.from_dict(read_config_file(filename))
+
+    # Function to check that the hierarchy can be built, raises a ValueError otherwise
+    def validate(self):
+        if not self.levels:
+            raise ValueError("The cache hierarchy needs at least one level")
+
+        names = [level.name for level in self.levels]
+        if len(set(names)) != len(names):
+            raise ValueError(f"The names of the cache levels must be unique, got {names}")
+
+        line_sizes = {level.line_size for level in self.levels}
+        if len(line_sizes) != 1:
+            raise ValueError(f"All the cache levels must have the same line size, got {sorted(line_sizes)}")
+
+        if self.levels[0].inclusion == "exclusive":
+            raise ValueError(f"{names[0]}: the first level can't be exclusive, there is nothing above it")
+
+        if self.memory_latency < 0:
+            raise ValueError("Memory latency can't be negative")
+
+    # Function to get the hierarchy in the same form as the config files
+    def to_dict(self):
+        return {
+            "memory_latency": self.memory_latency,
+            "levels": [{key: value for key, value in asdict(level).items() if value is not None}
+                       for level in self.levels]
+        }
+
+
+# Function to get the hierarchy described in the constants, which is the L1D and L2D caches with the
+# prefetcher bringing lines into L2D
+def default_hierarchy():
+    prefetcher = None
+    if constants.PREFETCHER_ON and constants.PREFETCHER != "none":
+        prefetcher = PrefetcherConfig(constants.PREFETCHER, constants.PREFETCH_DEGREE, constants.PREFETCH_DISTANCE)
+
+    return HierarchyConfig([
+        CacheLevelConfig("L1D", constants.L1D_CACHE_SIZE, constants.L1D_WAYS, constants.L1D_CACHE_LATENCY,
+                         constants.CACHE_LINE_SIZE, replacement=constants.L1D_REPLACEMENT_POLICY),
+        CacheLevelConfig("L2D", constants.L2D_CACHE_SIZE, constants.L2D_WAYS, constants.L2D_CACHE_LATENCY,
+                         constants.CACHE_LINE_SIZE, replacement=constants.L2D_REPLACEMENT_POLICY,
+                         prefetcher=prefetcher)
+    ], constants.MEMORY_LATENCY)
+
+
+# The functional units of a single class of instructions
+# latency replaces the cycles taken by the instructions of the class in num_cycles, unless it is None
+@dataclass
+class FunctionalUnitConfig:
+    count: int = 1
+    latency: Optional[int] = None
+    initiation_interval: int = 1
+    pipelined: bool = True
+
+    # Function to check that the units can be built, raises a ValueError otherwise
+    def validate(self, name):
+        if self.count < 1:
+            raise ValueError(f"{name} needs at least one functional unit, got {self.count}")
+
+        if self.latency is not None and self.latency < 1:
+            raise ValueError(f"{name} latency must be at least 1 cycle, got {self.latency}")
+
+        if self.initiation_interval < 1:
+            raise ValueError(f"{name} initiation interval must be at least 1 cycle, got {self.initiation_interval}")
+
+
+# Function to get the functional units described in the constants
+def default_functional_units():
+    return {name: FunctionalUnitConfig(**params) for name, params in constants.FUNCTIONAL_UNITS.items()}
+
+
+# Everything that describes a single Tomasulo machine. Every machine reads its parameters from its own
+# config instead of the constants, so machines with different configs can run side by side in one process.
+# The defaults are taken from the constants when the config is created
+@dataclass
+class MachineConfig:
+    arf_init: List[int] = field(default_factory=lambda: list(constants.ARF_INIT))
+    rob_size: int = field(default_factory=lambda: constants.ROB_SIZE)
+    add_rs_size: int = field(default_factory=lambda: constants.ADD_SUB_RS_SIZE)
+    mul_rs_size: int = field(default_factory=lambda: constants.MUL_DIV_RS_SIZE)
+    lsq_size: int = field(default_factory=lambda: constants.LSQ_SIZE)
+    select_policy: str = field(default_factory=lambda: constants.SELECT_POLICY)
+    dispatch_width: int = field(default_factory=lambda: constants.DISPATCH_WIDTH)
+    issue_width: int = field(default_factory=lambda: constants.ISSUE_WIDTH)
+    cdb_width: int = field(default_factory=lambda: constants.CDB_WIDTH)
+    commit_width: int = field(default_factory=lambda: constants.COMMIT_WIDTH)
+    num_cycles: Dict[str, int] = field(default_factory=lambda: dict(constants.NumCycles))
+    functional_units: Dict[str, FunctionalUnitConfig] = field(default_factory=default_functional_units)
+    hierarchy: HierarchyConfig = field(default_factory=default_hierarchy)
+    flush_interval: int = field(default_factory=lambda: constants.MEMORY_FLUSH_INTERVAL)
+    debug: bool = field(default_factory=lambda: constants.DEBUG)
+
+    # The instructions missing from num_cycles, the fields missing from each class of functional units,
+    # and the hierarchy if it is missing, are taken from the constants
+    @classmethod
+    def from_dict(cls, params):
+        params = dict(params)
+
+        num_cycles = dict(constants.NumCycles)
+        num_cycles.update(params.pop("num_cycles", {}))
+
+        functional_units = default_functional_units()
+        for name, unit in params.pop("functional_units", {}).items():
+            if name not in functional_units:
+                raise ValueError(f"Unknown functional unit class: {name}, expected one of {list(functional_units)}")
+            functional_units[name] = FunctionalUnitConfig(**{**asdict(functional_units[name]), **unit})
+
+        hierarchy = params.pop("hierarchy", None)
+        hierarchy = default_hierarchy() if hierarchy is None else HierarchyConfig.from_dict(hierarchy)
+
+        config = cls(num_cycles=num_cycles, functional_units=functional_units, hierarchy=hierarchy, **params)
+        config.validate()
+        return config
+
+    # Function to read the machine from a config file, the format is chosen using its extension
+    @classmethod
+    def from_file(cls, filename):
+        return cls.from_dict(read_config_file(filename))
+
+    # Function to check that the machine can be built, raises a ValueError otherwise
+    def validate(self):
+        if not self.arf_init:
+            raise ValueError("The ARF needs at least one register")
+
+        for name in ["rob_size", "add_rs_size", "mul_rs_size", "lsq_size",
+                     "dispatch_width", "issue_width", "cdb_width", "commit_width"]:
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1, got {getattr(self, name)}")
+
+        if self.select_policy.lower() not in SELECT_POLICIES:
+            raise ValueError(f"Unknown select policy: {self.select_policy}, expected one of {list(SELECT_POLICIES)}")
+
+        unknown = set(self.num_cycles) - set(constants.NumCycles)
+        if unknown:
+            raise ValueError(f"Unknown instructions in num_cycles: {sorted(unknown)}, "
+                             f"expected some of {list(constants.NumCycles)}")
+
+        missing = set(constants.NumCycles) - set(self.num_cycles)
+        if missing:
+            raise ValueError(f"Missing instructions in num_cycles: {sorted(missing)}")
+
+        for instruction, cycles in self.num_cycles.items():
+            if cycles < 1:
+                raise ValueError(f"{instruction} must take at least 1 cycle, got {cycles}")
+
+        classes = set(OP_CLASSES.values())
+        if set(self.functional_units) != classes:
+            raise ValueError(f"Functional units must be given for exactly the classes {sorted(classes)}, "
+                             f"got {sorted(self.functional_units)}")
+
+        for name, unit in self.functional_units.items():
+            unit.validate(name)
+
+        if self.flush_interval < 0:
+            raise ValueError("flush_interval can't be negative")
+
+        for level in self.hierarchy.levels:
+            level.validate()
+        self.hierarchy.validate()
+
+    # Function to get the number of cycles taken by an instruction to execute, from the functional
+    # units of its class if they set a latency
+    def get_latency(self, instruction):
+        latency = self.functional_units[OP_CLASSES[instruction]].latency
+        return self.num_cycles[instruction] if latency is None else latency
+
+    # Function to get the number of cycles taken by every instruction to execute
+    def get_num_cycles(self):
+        return {instruction: self.get_latency(instruction) for instruction in self.num_cycles}
+
+    # Function to get the machine in the same form as the config files
+    def to_dict(self):
+        params = {key: value for key, value in asdict(self).items() if key != "hierarchy"}
+        params["hierarchy"] = self.hierarchy.to_dict()
+        return params
@@ -25,6 +25,10 @@ else:
 # Increase this value(in milliseconds) to make each cycle last longer in the simulation
 CYCLE_DURATION = 200    # in ms
 
+# The history buffer stores a full copy of the machine once every HISTORY_KEYFRAME_INTERVAL cycles,
+# and only the changes in between. Smaller values make rewinding faster, but use more memory
+HISTORY_KEYFRAME_INTERVAL = 50
+
 # Bit width of the data used by the processor
 WORD_SIZE = 32
 
@@ -36,14 +40,33 @@ L2D_CACHE_SIZE = 4
 L1D_WAYS = 2
 L2D_WAYS = 2
 
+# Number of words in every line of the caches. The lines are filled and written back as a whole
+CACHE_LINE_SIZE = 1
+
+# Replacement policy used by each level of the cache
+# One of: lru, plru(tree pseudo-LRU), fifo, random, srrip, brrip
+L1D_REPLACEMENT_POLICY = "lru"
+L2D_REPLACEMENT_POLICY = "lru"
+
 # Latencies for accessing various levels of the cache
 L1D_CACHE_LATENCY = 1
 L2D_CACHE_LATENCY = 5
 MEMORY_LATENCY = 10
 
+# Dirty lines evicted from the L2D cache are written back to the memory array. The memory file is only
+# rewritten once every MEMORY_FLUSH_INTERVAL write-backs, and when the program completes.
+# Set to 0 to only write the file when the program completes
+MEMORY_FLUSH_INTERVAL = 0
+
 # Prefetcher
 PREFETCHER_ON = True
 
+# The prefetcher to use, one of: next_line, stride(PC indexed), stream, none
+# Degree is the number of lines prefetched on every load, and distance is how far ahead the first one is
+PREFETCHER = "next_line"
+PREFETCH_DEGREE = 1
+PREFETCH_DISTANCE = 1
+
 # The number of cycles taken by each supported instruction to execute
 NumCycles = {
     "ADD": 1,
@@ -57,6 +80,17 @@ NumCycles = {
     "BEQ": 1,
 }
 
+# The functional units of each class of instructions: ALU(ADD, ADDI, SUB, BEQ, BNE), MUL, DIV and MEM(LW, SW)
+# count is the number of units in the class. A pipelined unit can start a new instruction every initiation_interval
+# cycles, otherwise it is busy until the instruction completes. If latency is not None, it replaces the cycles in
+# NumCycles for the instructions of the class. Loads still take as long as their memory access
+FUNCTIONAL_UNITS = {
+    "ALU": {"count": 1, "latency": None, "initiation_interval": 1, "pipelined": True},
+    "MUL": {"count": 1, "latency": None, "initiation_interval": 1, "pipelined": True},
+    "DIV": {"count": 1, "latency": None, "initiation_interval": 1, "pipelined": True},
+    "MEM": {"count": 1, "latency": None, "initiation_interval": 1, "pipelined": True},
+}
+
 # This class is NOT to be modified. Represents the execution states of each instruction
 
 
@@ -70,9 +104,38 @@ class RunState:
     MEM_WRITE = "MEM_WRITE"
 
 
+# The ways in which the machine can record its cycle-by-cycle history
+# OFF records nothing, KEYFRAMES only records a full copy every HISTORY_KEYFRAME_INTERVAL cycles
+# and FULL also records the changes in between, so that every cycle can be rewound to
+class HistoryMode:
+    OFF = "off"
+    KEYFRAMES = "keyframes"
+    FULL = "full"
+
+
 # Stores the number of ARF registers to generate and display(RISC-V has 32)
 LIMIT = 10
 
+# Initial values of the ARF registers
+ARF_INIT = [0, 1, 4, 5, 3, 4, 1, 2, 2, 3]
+
+# Number of entries in the ROB, each reservation station group and the load store buffer
+ROB_SIZE = 8
+ADD_SUB_RS_SIZE = 3
+MUL_DIV_RS_SIZE = 2
+LSQ_SIZE = 3
+
+# Number of instructions that can be dispatched, start executing(from each reservation station group and the
+# load store buffer), be written on the CDB(the number of buses) and be committed in every cycle
+DISPATCH_WIDTH = 1
+ISSUE_WIDTH = 1
+CDB_WIDTH = 1
+COMMIT_WIDTH = 1
+
+# The policy used by the reservation stations and the load store buffer to choose which of their ready
+# entries starts executing. One of: oldest_first, longest_latency_first
+SELECT_POLICY = "oldest_first"
+
 # The name of the different reservation station groups
 ADD_SUB = "ADD/SUB"
 MUL_DIV = "MUL/DIV"
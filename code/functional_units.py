@@ -0,0 +1,154 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the data structures used to represent the functional units of the machine.
+
+The instructions are grouped into classes of operations, and every class has a pool of identical units.
+An entry of a RS can only start executing when a unit of its class is free. A pipelined unit can start a
+new instruction every initiation_interval cycles, while a unit that isn't pipelined is busy until the
+instruction it is executing completes. The pools decide what starts executing, whichever RS the entries
+are in, and at most issue_width instructions of a class start in a cycle
+'''
+
+# The class of operations that each instruction belongs to
+OP_CLASSES = {
+    "ADD": "ALU",
+    "ADDI": "ALU",
+    "SUB": "ALU",
+    "BEQ": "ALU",
+    "BNE": "ALU",
+    "MUL": "MUL",
+    "DIV": "DIV",
+    "LW": "MEM",
+    "SW": "MEM",
+}
+
+
+# Data structure to represent the pool of units of a single class
+# Every unit stores the cycle from which it can start a new instruction
+class FunctionalUnitPool:
+    def __init__(self, name, count=1, initiation_interval=1, pipelined=True, issue_width=None):
+        self._name = name
+        self._count = count
+        self._initiation_interval = initiation_interval
+        self._pipelined = pipelined
+        self._free_from = [0 for _ in range(count)]
+
+        # Number of instructions started in the last cycle that any were, None means there is no limit
+        self._issue_width = issue_width
+        self._issue_cycle = -1
+        self._n_issued = 0
+
+        # Stats
+        self._n_started = 0
+        self._n_stalls = 0
+        self._busy_cycles = 0
+
+    # Function to find a unit that can start an instruction in the given cycle, None if all of them are busy
+    def __get_free_unit(self, cycle):
+        for unit, free_from in enumerate(self._free_from):
+            if free_from <= cycle:
+                return unit
+
+        return None
+
+    # Function to tell if an instruction can start executing on this pool in the given cycle
+    def is_free(self, cycle):
+        if self._issue_width is not None and self._issue_cycle == cycle and self._n_issued == self._issue_width:
+            return False
+
+        return self.__get_free_unit(cycle) is not None
+
+    # Function to start an instruction on a free unit, which executes for n_cycles
+    def start(self, cycle, n_cycles):
+        unit = self.__get_free_unit(cycle)
+        if unit is None:
+            return False
+
+        if self._pipelined:
+            busy_for = self._initiation_interval
+        else:
+            busy_for = n_cycles
+
+        self._free_from[unit] = cycle + busy_for
+        self._n_started += 1
+
+        if self._issue_cycle != cycle:
+            self._issue_cycle = cycle
+            self._n_issued = 0
+        self._n_issued += 1
+        self._busy_cycles += busy_for
+
+        return True
+
+    # Function to count a ready instruction that couldn't start, because every unit was busy(or the class
+    # already started issue_width instructions in the cycle)
+    def stall(self):
+        self._n_stalls += 1
+
+    # Function to get the name of the class of operations handled by the pool
+    def get_name(self):
+        return self._name
+
+    # Function to get the stats of the pool, after n_cycles of execution
+    # The utilization is the fraction of the cycles in which the units couldn't start a new instruction
+    def get_stats(self, n_cycles):
+        utilization = 0
+        if n_cycles:
+            unit_cycles = self._count*n_cycles
+            utilization = round(min(self._busy_cycles, unit_cycles)/unit_cycles, 4)
+
+        return {
+            f"{self._name}_started": self._n_started,
+            f"{self._name}_stalls": self._n_stalls,
+            f"{self._name}_utilization": utilization
+        }
+
+    # Function to get the state of the pool, for the history buffer
+    def save_state(self):
+        return (tuple(self._free_from), self._n_started, self._n_stalls, self._busy_cycles,
+                self._issue_cycle, self._n_issued)
+
+    # Function to restore the state of the pool
+    def restore_state(self, state):
+        free_from, self._n_started, self._n_stalls, self._busy_cycles, self._issue_cycle, self._n_issued = state
+        self._free_from = list(free_from)
+
+    def __str__(self):
+        return f"<Functional units {self._name}: {self._count}>"
+
+
+# Data structure to represent all the functional units of the machine, built from its config
+# issue_width of the config limits the instructions of each class that start in a cycle
+class FunctionalUnits:
+    def __init__(self, config):
+        self._pools = {
+            name: FunctionalUnitPool(name, unit.count, unit.initiation_interval, unit.pipelined, config.issue_width)
+            for name, unit in config.functional_units.items()
+        }
+
+    # Function to get the pool of units that executes a particular instruction
+    def get_pool(self, opcode):
+        return self._pools[OP_CLASSES[opcode.name]]
+
+    # Function to get the stats of all the pools, after n_cycles of execution
+    def get_stats(self, n_cycles):
+        stats = {}
+        for pool in self._pools.values():
+            stats.update(pool.get_stats(n_cycles))
+
+        return stats
+
+    # Function to get the state of all the pools, for the history buffer
+    def save_state(self):
+        return {name: pool.save_state() for name, pool in self._pools.items()}
+
+    # Function to restore the state of the pools. Pools missing in the state are left untouched
+    def restore_state(self, state):
+        for name, pool_state in state.items():
+            self._pools[name].restore_state(pool_state)
+
+    def __str__(self):
+        return f"<Functional units: {', '.join(str(pool) for pool in self._pools.values())}>"
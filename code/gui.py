@@ -9,16 +9,22 @@ except main.py, which calls appropriate functions in the main event loop
 
 import PySimpleGUI as sg
 
-from constants import LIMIT, NumCycles, VERSION, GUI_FONTSIZE
-from constants import L1D_CACHE_LATENCY, L2D_CACHE_LATENCY, MEMORY_LATENCY
-from constants import L1D_CACHE_SIZE, L2D_CACHE_SIZE, L1D_WAYS, L2D_WAYS
+from constants import LIMIT, VERSION, GUI_FONTSIZE
+from config import MachineConfig
 
 
 # Class to encapsulate the entire behaviour of the GUI interface
 # The entire state of the GUI is stored in '_machine_state'
+# The config of the machine gives the number of cycles of each instruction and the caches, of which the first
+# two levels are displayed. The default config is used if none is given
 class Graphics():
-    def __init__(self, machineState=None):
+    def __init__(self, machineState=None, config=None):
         self._font_size = GUI_FONTSIZE
+        if config is None:
+            config = MachineConfig()
+        self._num_cycles = config.get_num_cycles()
+        self._cache_levels = config.hierarchy.levels[:2]
+
         if machineState:
             self._machine_state = machineState
         else:
@@ -46,17 +52,37 @@ class Graphics():
                 },
                 "caches": {
                     "L1": {
-                        "contents": [[str(i % L1D_WAYS + 1)] + ["" for col in range(6)] for i in range(L1D_CACHE_SIZE)]
+                        "contents": self.__empty_cache(0)
                     },
                     "L2": {
-                        "contents": [[str(i % L2D_WAYS + 1)] + ["" for col in range(6)] for i in range(L2D_CACHE_SIZE)]
+                        "contents": self.__empty_cache(1)
                     },
                     "stats": {
-                        "contents": [["", ""] for _ in range(8)]
+                        "contents": [["", ""] for _ in range(self.__n_stats())]
                     }
                 }
             }
 
+    # Function to get the empty rows of a displayed cache level, before the machine starts
+    def __empty_cache(self, level):
+        if level >= len(self._cache_levels):
+            return []
+
+        ways = self._cache_levels[level].ways
+        return [[str(i % ways + 1)] + ["" for col in range(6)] for i in range(self._cache_levels[level].size)]
+
+    # Function to get the number of rows in the cache stats table
+    # Every displayed level has its read stats, the first one has the write stats, followed by the prefetch stats
+    def __n_stats(self):
+        return 2*len(self._cache_levels) + 2 + 5
+
+    # Function to get the title of the table of a displayed cache level
+    def __cache_title(self, level):
+        if level >= len(self._cache_levels):
+            return "-"
+
+        return f"{self._cache_levels[level].name} cache"
+
     # Function to generate a table, given the data and other hyperparameters
     def __generate_table(self, title, data, headings, n_rows=5, key="table"):
         row_contents = data["contents"]
@@ -123,7 +149,7 @@ class Graphics():
         ROB = self._machine_state["ROB"]
         ARF = self._machine_state["ARF"]
         nCycles = {
-            "contents": [[inst, cycles] for inst, cycles in NumCycles.items()],
+            "contents": [[inst, cycles] for inst, cycles in self._num_cycles.items()],
         }
         L1_cache = self._machine_state["caches"]["L1"]
         L2_cache = self._machine_state["caches"]["L2"]
@@ -207,27 +233,27 @@ class Graphics():
             "No. of Cycles",
             nCycles,
             cycleHeading,
-            n_rows=len(NumCycles),
+            n_rows=len(self._num_cycles),
             key="num_cycles"
         )
-        L1_cache_table = self.__generate_table("L1 cache",
+        L1_cache_table = self.__generate_table(self.__cache_title(0),
                                                L1_cache,
                                                l1CacheHeading,
                                                n_rows=min(LIMIT,
-                                                          L1D_CACHE_SIZE + 1),
+                                                          len(L1_cache["contents"]) + 1),
                                                key="l1_cache_table"
                                                )
-        L2_cache_table = self.__generate_table("L2 cache",
+        L2_cache_table = self.__generate_table(self.__cache_title(1),
                                                L2_cache,
                                                l2CacheHeading,
                                                n_rows=min(LIMIT,
-                                                          L2D_CACHE_SIZE + 1),
+                                                          len(L2_cache["contents"]) + 1),
                                                key="l2_cache_table"
                                                )
         cache_stats_table = self.__generate_table("Cache stats",
                                                   cache_stats,
                                                   cacheStatsHeading,
-                                                  n_rows=8,
+                                                  n_rows=self.__n_stats(),
                                                   key="cache_stats_table"
                                                   )
 
@@ -498,7 +524,8 @@ class Graphics():
     def __convertMemCtl(self, controller):
         mem = []
         caches = [[], []]
-        row_sizes = [L1D_CACHE_SIZE//L1D_WAYS, L2D_CACHE_SIZE//L2D_WAYS]
+        row_sizes = [level.size//level.ways for level in self._cache_levels]
+        line_sizes = [level.line_size for level in self._cache_levels]
 
         # Update the memory
         for addr, mem_row in enumerate(controller.get_memory()):
@@ -511,42 +538,46 @@ class Graphics():
             mem.append(data)
 
         # Update the caches
-        for i, cache in enumerate([controller.get_l1_cache(), controller.get_l2_cache()]):
+        for i, cache in enumerate([controller.get_cache(level) for level in range(len(self._cache_levels))]):
             for index, row in enumerate(cache):
-                for way, entry in row.items():
+                for way, (tag, value, valid_bit, dirty_bit, busy_bit) in enumerate(row):
                     data = []
-                    way = way.split(" ")[-1]
                     addr = "-"
-                    data.append(way)
-                    if entry.get_tag() < 0:
+                    data.append(str(way + 1))
+                    if tag < 0:
                         data.append(addr)
                         data.append("-")
                         data.append("-")
                     else:
-                        addr = entry.get_tag() * row_sizes[i] + index
+                        addr = (tag * row_sizes[i] + index) * line_sizes[i]
                         data.append(addr)
-                        data.append(entry.get_tag())
-                        temp = entry.get_cache_value()
-                        if isinstance(temp, list):
-                            data.append(temp[-1])
+                        data.append(tag)
+                        if len(value) == 1:
+                            data.append(value[0])
                         else:
-                            data.append(temp)
-                    data.append(str(entry.get_dirty_bit())[0])
-                    data.append(str(entry.get_valid_bit())[0])
-                    data.append(str(entry.get_busy_bit())[0])
+                            data.append(" ".join(str(word) for word in value))
+                    data.append(str(dirty_bit)[0])
+                    data.append(str(valid_bit)[0])
+                    data.append(str(busy_bit)[0])
 
                     caches[i].append(data)
 
         # Update the cache stats
-        stats = [
-            ["L1 read hits", controller.get_L1D_read_hits()],
-            ["L1 read misses", controller.get_L1D_read_miss()],
-            ["L1 write hits", controller.get_L1D_write_hits()],
-            ["L1 write misses", controller.get_L1D_write_miss()],
-            ["L2 read hits", controller.get_L2D_read_hits()],
-            ["L2 read misses", controller.get_L2D_read_miss()],
+        stats = []
+        for level, cache_level in enumerate(self._cache_levels):
+            stats.append([f"{cache_level.name} read hits", controller.get_read_hits(level)])
+            stats.append([f"{cache_level.name} read misses", controller.get_read_miss(level)])
+
+            if level == 0:
+                stats.append([f"{cache_level.name} write hits", controller.get_write_hits()])
+                stats.append([f"{cache_level.name} write misses", controller.get_write_miss()])
+
+        stats += [
             ["Prefetch hits", controller.get_prefetch_hits()],
-            ["Prefetcher accuracy", controller.get_prefetch_accuracy()]
+            ["Prefetcher accuracy", controller.get_prefetch_accuracy()],
+            ["Prefetcher coverage", controller.get_prefetch_coverage()],
+            ["Late prefetches", controller.get_late_prefetches()],
+            ["Prefetch pollution", controller.get_prefetch_pollution()]
         ]
 
         self._machine_state["metadata"]["data-mem"]["contents"] = mem
@@ -627,13 +658,13 @@ class Graphics():
             },
             "caches": {
                 "L1": {
-                    "contents": [[str(i % L1D_WAYS + 1)] + ["" for col in range(6)] for i in range(L1D_CACHE_SIZE)]
+                    "contents": self.__empty_cache(0)
                 },
                 "L2": {
-                    "contents": [[str(i % L2D_WAYS + 1)] + ["" for col in range(6)] for i in range(L2D_CACHE_SIZE)]
+                    "contents": self.__empty_cache(1)
                 },
                 "stats": {
-                    "contents": [["", ""] for _ in range(8)]
+                    "contents": [["", ""] for _ in range(self.__n_stats())]
                 }
             }
         }
@@ -0,0 +1,109 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains a headless runner for the Tomasulo machine. It runs a program to completion
+as fast as possible, without ever importing the GUI, and reports the final state of the machine
+as JSON. It can be used from the command line, or from Python through run_simulation()
+'''
+
+import sys
+import json
+import argparse
+
+from main import Tomasulo
+from config import HierarchyConfig, MachineConfig
+from constants import HistoryMode
+
+
+# Function to convert the instruction table into plain rows of the cycle numbers of each stage
+def get_timing_table(machine):
+    rows = []
+    for entry in machine.get_instruction_table().get_entries():
+        rows.append({
+            "instruction": entry.get_inst().str_disassemble(),
+            "issue": str(entry._rs_issue_cycle),
+            "ex_start": str(entry._exec_start),
+            "ex_end": str(entry._exec_complete),
+            "cdb_write": str(entry._cdb_write),
+            "commit": str(entry._commit)
+        })
+
+    return rows
+
+
+# Function to collect the final state of the machine into a JSON serializable dictionary
+def get_results(machine):
+    mem_ctl = machine.get_mem_ctl()
+
+    return {
+        "cycles": machine.get_cpu_clock(),
+        "completed": machine.is_complete(),
+        "instructions": machine.get_num_instructions(),
+        "instructions_completed": machine.get_num_completed(),
+        "ARF": {name: register.get_value() for name, register in machine.get_arf().get_entries().items()},
+        "memory": mem_ctl.read_memory(),
+        "cache_stats": mem_ctl.get_stats(),
+        "functional_unit_stats": machine.get_functional_units().get_stats(machine.get_cpu_clock()),
+        "instruction_table": get_timing_table(machine)
+    }
+
+
+# Function to run a program to completion, without the GUI
+# The run is stopped after max_cycles, which defaults to the cycle limit of the machine
+# Nothing is rewound here, so the history is not recorded unless asked for. Without the history,
+# the machine skips over the idle cycles in which only the execution/memory counters change
+# The data memory file is left untouched, unless save_memory is set
+# config is the MachineConfig describing the machine, the one built from the constants is used if it is None
+def run_simulation(program_src, data_mem_src, max_cycles=None, record_history=HistoryMode.OFF,
+                   save_memory=False, config=None):
+    machine = Tomasulo(program_src, data_mem_src,
+                       record_history, event_driven=True, save_memory=save_memory, config=config)
+
+    if max_cycles is None:
+        max_cycles = machine.get_cycle_limit()
+
+    while not machine.is_complete() and machine.get_cpu_clock() < max_cycles:
+        machine.logic_loop(max_cycles)
+
+    results = get_results(machine)
+    results["program"] = program_src
+    results["data_memory"] = data_mem_src
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a program on the Tomasulo machine without the GUI, and print the final state as JSON")
+    parser.add_argument("program", help="assembled program(.bin format)")
+    parser.add_argument("data_memory", nargs="?", default="memory/data_memory.dat",
+                        help="data memory file(.dat format)")
+    parser.add_argument("--max-cycles", type=int, default=None,
+                        help="stop the simulation after this many cycles")
+    parser.add_argument("--save-memory", action="store_true",
+                        help="write the final data memory back into the data memory file")
+    parser.add_argument("--config", default=None,
+                        help="machine config(.json/.toml/.yaml), instead of the one in constants.py")
+    parser.add_argument("--cache-config", default=None,
+                        help="cache hierarchy config(.json/.toml/.yaml), replacing the one in the machine config")
+    parser.add_argument("-o", "--output", default=None,
+                        help="write the JSON to this file instead of stdout")
+    parser.add_argument("--indent", type=int, default=None,
+                        help="indentation of the JSON output")
+    args = parser.parse_args()
+
+    config = MachineConfig.from_file(args.config) if args.config else MachineConfig()
+    if args.cache_config:
+        config.hierarchy = HierarchyConfig.from_file(args.cache_config)
+
+    results = run_simulation(args.program, args.data_memory, args.max_cycles,
+                             save_memory=args.save_memory, config=config)
+
+    if args.output:
+        with open(args.output, 'w') as outFile:
+            json.dump(results, outFile, indent=args.indent)
+    else:
+        json.dump(results, sys.stdout, indent=args.indent)
+        sys.stdout.write("\n")
@@ -9,27 +9,40 @@ This file contains some helper functions which are used in various places
 
 # Zero pad the binary numbers appropriately
 def pad(number: str, n: int) -> str:
-    number = number[2:]
-    while len(number) < n:
-        number = "0" + number
-    return number
-
-# Function to convert integers to binary - using 2's complement
+    return number[2:].zfill(n)
 
 
+# Function to convert integers to binary - using 2's complement
 def dec2bin(number: int, n_bits: int = 32) -> str:
-    bin_number = '0'
-    if(number < 0):
-        bin_number = '1'
-        number = 2**(n_bits-1)+number
-    bin_number = bin_number + pad(bin(number), n_bits-1)
-    return bin_number
+    if number < 0:
+        return "1" + format(number + (1 << (n_bits-1)), f"0{n_bits-1}b")
+    return "0" + format(number, f"0{n_bits-1}b")
 
 
 # Function to convert binary to integer - using 2's complement
 def bin2dec(number: str) -> int:
-    no_bits = len(number)
-    return -int(number[0])*2**(no_bits-1) + int(number[1:no_bits], 2)
+    value = int(number, 2)
+    if number[0] == "1":
+        value -= 1 << len(number)
+    return value
+
+
+# Function to interpret the lowest n_bits of an integer as a 2's complement number
+def sign_extend(value: int, n_bits: int = 32) -> int:
+    value &= (1 << n_bits) - 1
+    if value >> (n_bits-1):
+        value -= 1 << n_bits
+    return value
+
+
+# Function to get the unsigned n_bits wide representation of a 2's complement number
+def to_unsigned(value: int, n_bits: int = 32) -> int:
+    return value & ((1 << n_bits) - 1)
+
+
+# Function to extract the bits high:low(both inclusive) of an integer word
+def get_bits(word: int, high: int, low: int) -> int:
+    return (word >> low) & ((1 << (high-low+1)) - 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the data structure used to record the cycle-by-cycle history of the machine.
+
+Instead of copying the whole machine every cycle, a full copy(keyframe) is only taken once every
+few cycles. For every cycle, only the parts of the state that changed since the previous cycle(delta)
+are stored. Every component exposes its state through save_state(), as a flat dictionary of small,
+comparable values, and can be restored using restore_state(). The large components keep track of what
+changed in them, and also expose save_changes(), which only gives the keys that changed since it was
+last called, so that the cost of recording a cycle doesn't grow with the size of the program and memory.
+A key that is no longer in the state of a component is recorded in the delta as DELETED, and is passed
+to restore_state() that way.
+
+To rebuild the machine at some cycle, the nearest keyframe before it is copied, and all the deltas
+recorded after the keyframe are applied on top of it. When only keyframes are recorded, the machine
+can only be rebuilt at the keyframes.
+'''
+
+import copy
+
+from constants import HISTORY_KEYFRAME_INTERVAL, HistoryMode
+
+
+# Marker recorded in a delta for a key that was removed from the state of a component
+DELETED = object()
+
+
+class HistoryBuffer:
+    def __init__(self, mode=HistoryMode.FULL, keyframe_interval=HISTORY_KEYFRAME_INTERVAL):
+        if mode not in [HistoryMode.KEYFRAMES, HistoryMode.FULL]:
+            raise ValueError(f"Invalid history recording mode: {mode}")
+
+        self._mode = mode
+        self._keyframe_interval = max(1, keyframe_interval)
+        self._keyframes = {}
+        self._deltas = []
+        self._next_event = []
+
+        # The last recorded value of every key, for each component
+        self._last_state = {}
+
+    # Function to get the keys of all the components that changed since the last record, in a single dictionary
+    # The components that track their changes only give the changed keys. For the rest, the whole state is
+    # compared with the last one, and the keys missing from it are deleted
+    def __get_delta(self, components):
+        delta = {}
+        for name, component in components.items():
+            last_state = self._last_state.setdefault(name, {})
+
+            if hasattr(component, "save_changes"):
+                state = component.save_changes()
+            else:
+                state = component.save_state()
+                state.update({key: DELETED for key in last_state.keys() - state.keys()})
+
+            for key, value in state.items():
+                if key not in last_state or last_state[key] != value:
+                    delta[(name, key)] = value
+
+                if value is DELETED:
+                    last_state.pop(key, None)
+                else:
+                    last_state[key] = value
+
+        return delta
+
+    # Function to record the state of the machine at the end of a cycle
+    # The components are a dictionary of the functional blocks, which is copied for keyframes
+    def record(self, components, next_event):
+        index = len(self._deltas)
+
+        if self._mode == HistoryMode.KEYFRAMES:
+            if index % self._keyframe_interval == 0:
+                self._keyframes[index] = copy.deepcopy(components)
+
+            self._deltas.append(None)
+            self._next_event.append(next_event)
+            return
+
+        # The delta is worked out even at a keyframe, so that the next one is relative to it
+        delta = self.__get_delta(components)
+
+        if index % self._keyframe_interval == 0:
+            self._keyframes[index] = copy.deepcopy(components)
+            delta = {}
+
+        self._deltas.append(delta)
+        self._next_event.append(next_event)
+
+    # Function to rebuild the components, as they were at the end of the cycle at index
+    # The changes are grouped by component, and need to be applied using restore_state()
+    # The keys deleted since the keyframe are given as DELETED
+    # Returns None if there is no history for that index
+    def get(self, index):
+        if not self.is_available(index):
+            return None
+
+        keyframe_index = index - index % self._keyframe_interval
+        components = copy.deepcopy(self._keyframes[keyframe_index])
+
+        changes = {}
+        for delta in self._deltas[keyframe_index + 1:index + 1]:
+            changes.update(delta)
+
+        grouped_changes = {name: {} for name in components}
+        for (name, key), value in changes.items():
+            grouped_changes[name][key] = value
+
+        return components, grouped_changes, self._next_event[index]
+
+    # Function to check if the machine can be rebuilt at index
+    def is_available(self, index):
+        if index < 0 or index >= len(self._deltas):
+            return False
+
+        if self._mode == HistoryMode.KEYFRAMES:
+            return index in self._keyframes
+
+        return True
+
+    # Function to get the recording mode of the history buffer
+    def get_mode(self):
+        return self._mode
+
+    def __len__(self):
+        return len(self._deltas)
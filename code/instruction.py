@@ -1,5 +1,7 @@
+from enum import IntEnum
+
 from register_bank import Register
-from helpers import bin2dec, dec2bin
+from helpers import get_bits, sign_extend
 
 # RISC-V opcodes repo license
 '''
@@ -66,117 +68,204 @@ Note: RISC-V and its repos have their own license and are NOT are a part of the
 are licensed under.
 '''
 
+
+# Integer codes of the supported instructions, used instead of comparing the command strings
+# INVALID is used for the encodings that can't be disassembled
+class Opcode(IntEnum):
+    INVALID = 0
+    ADD = 1
+    SUB = 2
+    MUL = 3
+    DIV = 4
+    ADDI = 5
+    LW = 6
+    SW = 7
+    BEQ = 8
+    BNE = 9
+
+
+# Immutable record of a decoded instruction. The registers are stored as their integer indices,
+# and the offset/immediate as a signed integer. Fields that the instruction doesn't have are None
+class DecodedInstruction:
+    __slots__ = ("opcode", "rd", "rs1", "rs2", "imm", "is_NOP")
+
+    def __init__(self, opcode, rd=None, rs1=None, rs2=None, imm=None):
+        object.__setattr__(self, "opcode", opcode)
+        object.__setattr__(self, "rd", rd)
+        object.__setattr__(self, "rs1", rs1)
+        object.__setattr__(self, "rs2", rs2)
+        object.__setattr__(self, "imm", imm)
+        object.__setattr__(self, "is_NOP", opcode == Opcode.ADDI and rd == 0 and rs1 == 0 and imm == 0)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DecodedInstruction is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("DecodedInstruction is immutable")
+
+    def __repr__(self):
+        return f"DecodedInstruction({self.opcode.name}, rd={self.rd}, rs1={self.rs1}, rs2={self.rs2}, imm={self.imm})"
+
+
 # Instruction data structure that stores all the necessary information that an instruction carries
+# The instruction is decoded once when it is created, from its 32 bit word using shifts and masks.
+# The decoded record is cached, so the instruction must not be modified afterwards
 
 
 class Instruction:
     def __init__(self, PC=-1, funct7="0000000", rs2="00000", rs1="00000",
                  rd="00000", funct3="000", opcode="0000000", hasOffset=False):
 
+        # The register fields can either be register names, or binary(when they hold a part of the offset)
+        def reg_field(field):
+            return int(field[1:]) if field.startswith("x") else int(field, 2)
+
+        word = (int(funct7, 2) << 25) | (reg_field(rs2) << 20) | (reg_field(rs1) << 15) | \
+            (int(funct3, 2) << 12) | (reg_field(rd) << 7) | int(opcode, 2)
+
+        self.__decode(word, PC, hasOffset)
+
+    # Function to split the word into its fields, and decode the instruction
+    def __decode(self, word, PC, hasOffset):
         if PC > 0:
             self.PC = PC
 
+        self._word = word
+        self.hasOffset = hasOffset
+
+        self._opcode = get_bits(word, 6, 0)
+        self._funct3 = get_bits(word, 14, 12)
+        self._funct7 = get_bits(word, 31, 25)
+        rd = get_bits(word, 11, 7)
+        rs1 = get_bits(word, 19, 15)
+        rs2 = get_bits(word, 24, 20)
+
+        self.rs1 = f"x{rs1}"
+        self.rd = None
         self.rs2 = None
-        self.offset = None
-        self.funct7 = None
+        self._offset = None
+
+        opcode = Opcode.INVALID
+        decoded_rd, decoded_rs2 = None, None
 
         # To differentiate between instructions with offset(LW, SW) and other instructions(ADD, SUB etc)
         if hasOffset:
-            if opcode == "0000011" and funct3 == "010":    # LW
-                self.rd = rd
-                self.offset = funct7 + rs2
-            elif opcode == "0100011" and funct3 == "010":  # SW
-                self.rs2 = rs2
-                self.offset = funct7 + rd
-            elif opcode == "0010011" and funct3 == "000":  # ADDI, similar to LW
-                self.rd = rd
-                self.offset = funct7 + rs2
-            elif opcode == "1100011":   # Branches
-                self.rs2 = rs2
-                self.offset = (funct7[0] + rd[-1] + funct7[1:] + rd[0:-1])
+            if self._opcode == 0b0000011 and self._funct3 == 0b010:      # LW
+                opcode = Opcode.LW
+                self.rd, decoded_rd = f"x{rd}", rd
+                self._offset = get_bits(word, 31, 20)
+            elif self._opcode == 0b0100011 and self._funct3 == 0b010:    # SW
+                opcode = Opcode.SW
+                self.rs2, decoded_rs2 = f"x{rs2}", rs2
+                self._offset = (self._funct7 << 5) | rd
+            elif self._opcode == 0b0010011:                              # ADDI, similar to LW
+                if self._funct3 == 0b000:
+                    opcode = Opcode.ADDI
+                self.rd, decoded_rd = f"x{rd}", rd
+                self._offset = get_bits(word, 31, 20)
+            elif self._opcode == 0b1100011:                              # Branches
+                if self._funct3 == 0b000:
+                    opcode = Opcode.BEQ
+                elif self._funct3 == 0b001:
+                    opcode = Opcode.BNE
+                self.rs2, decoded_rs2 = f"x{rs2}", rs2
+                # os[12|10:5] - os[4:1|11], stored in the order 12, 11, 10:5, 4:1
+                self._offset = (get_bits(word, 31, 31) << 11) | (get_bits(word, 7, 7) << 10) | \
+                    (get_bits(word, 30, 25) << 4) | get_bits(word, 11, 8)
         else:
-            self.rd = rd
-            self.rs2 = rs2
-            self.funct7 = funct7
+            self.rd, decoded_rd = f"x{rd}", rd
+            self.rs2, decoded_rs2 = f"x{rs2}", rs2
 
-        self.rs1 = rs1
-        self.funct3 = funct3
-        self.opcode = opcode
-        self.hasOffset = hasOffset
+            if self._opcode == 0b0110011:
+                if self._funct3 == 0b000:
+                    opcode = {0b0000000: Opcode.ADD, 0b0100000: Opcode.SUB,
+                              0b0000001: Opcode.MUL}.get(self._funct7, Opcode.INVALID)
+                elif self._funct3 == 0b100 and self._funct7 == 0b0000001:
+                    opcode = Opcode.DIV
+
+        imm = None if self._offset is None else sign_extend(self._offset, 12)
+        self.decoded = DecodedInstruction(opcode, rd=decoded_rd, rs1=rs1, rs2=decoded_rs2, imm=imm)
+
+        self._disassembly = None
+        self._str_disassembly = None
+
+    # The binary fields of the instruction, as strings. These are only needed for displaying
+    @property
+    def opcode(self):
+        return format(self._opcode, "07b")
+
+    @property
+    def funct3(self):
+        return format(self._funct3, "03b")
+
+    @property
+    def funct7(self):
+        return None if self.hasOffset else format(self._funct7, "07b")
+
+    @property
+    def offset(self):
+        return None if self._offset is None else format(self._offset, "012b")
 
     # Function to convert binary to English for decision making and displaying
     # Returns a struct which contains all the individual segments of the instruction, depending on their type
+    # The struct is built once, and shared between all the callers. It must not be modified
     def disassemble(self):
-        command = ""
+        if self._disassembly is None:
+            self._disassembly = self.__disassemble()
 
-        if self.hasOffset:
-            offset = bin2dec(self.offset)
+        return self._disassembly
 
-            if self.opcode == "0000011" and self.funct3 == "010":
-                command = "LW"
+    # Function to get the integer code of the instruction
+    def get_opcode(self):
+        return self.decoded.opcode
 
+    # Function to build the disassembled struct from the decoded instruction
+    def __disassemble(self):
+        decoded = self.decoded
+        command = "" if decoded.opcode == Opcode.INVALID else decoded.opcode.name
+
+        if self.hasOffset:
+            if self._opcode == 0b0000011 and self._funct3 == 0b010:
                 return {
                     "command": command,
                     "rd": self.rd,
                     "rs1": self.rs1,
-                    "offset": offset
+                    "offset": decoded.imm
                 }
 
-            elif self.opcode == "0100011" and self.funct3 == "010":
-                command = "SW"
-
+            elif self._opcode == 0b0100011 and self._funct3 == 0b010:
                 return {
                     "command": command,
                     "rs1": self.rs1,
                     "rs2": self.rs2,
-                    "offset": offset
+                    "offset": decoded.imm
                 }
 
             # Immediate instructions
-            elif self.opcode == "0010011":
-                if self.funct3 == "000":
-                    command = "ADDI"
-
+            elif self._opcode == 0b0010011:
                 return {
                     "command": command,
                     "rs1": self.rs1,
                     "rd": self.rd,
-                    "offset": offset
+                    "offset": decoded.imm
                 }
 
             # Branch instructions
-            elif self.opcode == "1100011":
-                if self.funct3 == "000":
-                    command = "BEQ"
-                elif self.funct3 == "001":
-                    command = "BNE"
-
+            elif self._opcode == 0b1100011:
                 return {
                     "command": command,
                     "rs1": self.rs1,
                     "rs2": self.rs2,
-                    "offset": offset
+                    "offset": decoded.imm
                 }
 
             else:
                 return -1
 
         else:
-            if self.opcode == "0110011":
-                if self.funct3 == "000":
-                    if self.funct7 == "0000000":
-                        command = "ADD"
-                    elif self.funct7 == "0100000":
-                        command = "SUB"
-                    elif self.funct7 == "0000001":
-                        command = "MUL"
-                    else:
-                        return -1
-                elif self.funct3 == "100":
-                    if self.funct7 == "0000001":
-                        command = "DIV"
-                    else:
-                        return -1
+            # Unsupported R-type instructions
+            if self._opcode == 0b0110011 and self._funct3 in (0b000, 0b100) and decoded.opcode == Opcode.INVALID:
+                return -1
 
             return {
                 "command": command,
@@ -187,6 +276,12 @@ class Instruction:
 
     # Function to convert the binary to a English string for displaying purposes only
     def str_disassemble(self):
+        if self._str_disassembly is None:
+            self._str_disassembly = self.__str_disassemble()
+
+        return self._str_disassembly
+
+    def __str_disassemble(self):
         instruction = self.disassemble()
 
         rs1 = instruction["rs1"]
@@ -219,109 +314,38 @@ class Instruction:
             return f"{instruction['command']} {rd}, {rs1}, {instruction['rs2']}"
 
     def is_NOP(self):
-        instruction = self.disassemble()
+        return self.decoded.is_NOP
 
-        rd = instruction.get("rd")
-        if rd is None:
-            return False
+    # Globally accessible class method to create an Instruction from a 32 bit integer word
+    # Returns None for LW/SW type encodings(funct3 = 010) that are neither LW nor SW
+    @classmethod
+    def from_word(cls, word, PC=-1):
+        opcode = get_bits(word, 6, 0)
+        funct3 = get_bits(word, 14, 12)
 
-        rs1 = instruction["rs1"]
+        if funct3 == 0b010:
+            if opcode not in (0b0000011, 0b0100011):
+                return None
+            hasOffset = True
+
+        # Branch and immediate instructions
+        else:
+            hasOffset = (opcode == 0b1100011 and funct3 in (0b000, 0b001)) or \
+                (opcode == 0b0010011 and funct3 == 0b000)
 
-        return instruction["command"] == "ADDI" and rd == "x0" and rs1 == "x0" and instruction['offset'] == 0
+        instruction = cls.__new__(cls)
+        instruction.__decode(word, PC, hasOffset)
+        return instruction
 
     # Globally accessible class method to create an Instruction from a binary input
     # This function is capable of removing spaces, which can be added to improve readability
     @classmethod
-    def segment(self, instruction, PC=-1):
+    def segment(cls, instruction, PC=-1):
         instruction = instruction.replace(" ", "")
         if len(instruction) != 32:
             return -1
 
-        funct7 = instruction[0:7]
-        rs2 = f"x{bin2dec(instruction[7:12])}"
-        rs1 = f"x{bin2dec(instruction[12:17])}"
-        funct3 = instruction[17:20]
-        rd = f"x{bin2dec(instruction[20:25])}"
-        opcode = instruction[25:32]
-        hasOffset = False
-
-        # If we encounter a load word
-        if funct3 == "010":
-            hasOffset = True
-
-            # LW instruction
-            if opcode == "0000011":
-                rs2 = instruction[7:12]
-
-                return Instruction(
-                    PC=PC,
-                    funct7=funct7,
-                    rs2=rs2,
-                    rs1=rs1,
-                    rd=rd,
-                    funct3=funct3,
-                    opcode=opcode,
-                    hasOffset=hasOffset
-                )
-
-            # SW instruction
-            elif opcode == "0100011":
-                rd = instruction[20:25]
-
-                return Instruction(
-                    PC=PC,
-                    funct7=funct7,
-                    rs2=rs2,
-                    rs1=rs1,
-                    rd=rd,
-                    funct3=funct3,
-                    opcode=opcode,
-                    hasOffset=hasOffset
-                )
-
-        # Branch instructions
-        elif opcode == "1100011" and funct3 in ["000", "001"]:
-            hasOffset = True
-            rd = instruction[20:25]
-
-            return Instruction(
-                PC=PC,
-                funct7=funct7,
-                rs2=rs2,
-                rs1=rs1,
-                rd=rd,
-                funct3=funct3,
-                opcode=opcode,
-                hasOffset=hasOffset
-            )
-
-        # Immediate instructions
-        elif opcode == "0010011" and funct3 in ["000"]:
-            hasOffset = True
-            rs2 = instruction[7:12]
-
-            return Instruction(
-                PC=PC,
-                funct7=funct7,
-                rs2=rs2,
-                rs1=rs1,
-                rd=rd,
-                funct3=funct3,
-                opcode=opcode,
-                hasOffset=hasOffset
-            )
-
-        else:
-            return Instruction(
-                PC=PC,
-                funct7=funct7,
-                rs2=rs2,
-                rs1=rs1,
-                rd=rd,
-                funct3=funct3,
-                opcode=opcode,
-                hasOffset=hasOffset
-            )
+        return cls.from_word(int(instruction, 2), PC)
 
     def __str__(self):
         if self.hasOffset:
@@ -334,6 +358,13 @@ class Instruction:
         else:
             return f"<[PC={self.PC}] funct7:{self.funct7} rs2:{self.rs2} rs1:{self.rs1} funct3:{self.funct3} rd:{self.rd} opcode:{self.opcode}>"
 
+    # Instructions are never modified after being decoded, so copies can share the same object
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __eq__(self, other):
         return self.PC == other.PC
 
@@ -13,16 +13,24 @@ but I am cheating here. The result is calculated by the reservation station.
 This is by far the most important class, in terms of maintaining execution order
 '''
 
-from constants import DEBUG, NumCycles, RunState
-from instruction import Instruction
+from bisect import bisect_left, insort
+
+from constants import RunState
+from config import MachineConfig
+from instruction import Instruction, Opcode
 from helpers import pad
 
 
 # Data structure to represent each row of the instruction table
 # Stores execution state information of the entire program
+# The number of cycles taken by each type of instruction to execute is read from the config of the machine
 class InstructionTableEntry:
-    def __init__(self, instruction):
+    def __init__(self, instruction, table=None, config=None):
+        if config is None:
+            config = MachineConfig()
+
         self._instruction = instruction
+        self._table = table
         self._state = RunState.NOT_STARTED
         self._rs_issue_cycle = ""
         self._exec_start = ""
@@ -32,27 +40,47 @@ class InstructionTableEntry:
         self._counter = 0
         self._value = None
 
+        # The slot of the ROB entry made for the instruction when it is dispatched
+        self._rob_slot = None
+
         # This needs to be varied for memory accesses
-        self._max_ticks = NumCycles[instruction.disassemble()["command"]]
+        self._max_ticks = config.get_latency(instruction.get_opcode().name)
+
+    # Function to change the state of the instruction, and let the table re-index the entry
+    def __set_state(self, new_state):
+        old_state = self._state
+        self._state = new_state
+
+        if self._table is not None:
+            self._table.update_state(self, old_state)
+
+        self.__changed()
+
+    # Function to let the table know that the entry changed, so that only the changed entries are recorded
+    # in the history
+    def __changed(self):
+        if self._table is not None:
+            self._table.mark_changed(self)
 
     # Provision to vary the number of cycles needed to perform memory accesses
     # Might be useful later for branch instructions
     def set_max_tick(self, n_ticks):
-        if self._instruction.disassemble()["command"] not in ["LW", "SW"]:
+        if self._instruction.get_opcode() not in (Opcode.LW, Opcode.SW):
             return False
 
         self._counter = 0
         self._max_ticks = n_ticks
+        self.__changed()
         return True
 
     # Function to record the issue of an instruction into the RS
     def rs_issue(self, cycle):
-        self._state = RunState.RS
+        self.__set_state(RunState.RS)
         self._rs_issue_cycle = cycle
 
     # Function to record the start of execution of the instruction
     def ex_start(self, cycle):
-        self._state = RunState.EX_START
+        self.__set_state(RunState.EX_START)
         self._exec_start = cycle
         self.ex_tick(cycle)
 
@@ -60,25 +88,39 @@ class InstructionTableEntry:
     def ex_tick(self, cycle):
         if self._counter == self._max_ticks:
             self._exec_complete = cycle
-            self._state = RunState.EX_END
+            self.__set_state(RunState.EX_END)
         else:
             self._counter += 1
+            self.__changed()
 
     # Function to record the cycle in which the CDB broadcast is done for the instruction
     def cdb_write(self, cycle):
-        self._state = RunState.CDB
+        self.__set_state(RunState.CDB)
         self._cdb_write = cycle
 
     # Function to record the cycle in which the instruction is committed back to the ARF
     def commit(self, cycle):
-        self._state = RunState.COMMIT
+        self.__set_state(RunState.COMMIT)
         self._commit = cycle
 
+    # Function to get the number of ticks(cycles) after which the counter reaches its maximum
+    # Used to skip idle cycles. Returns None if the counter can never reach its maximum
+    def get_remaining_ticks(self):
+        if self._counter > self._max_ticks:
+            return None
+
+        return self._max_ticks - self._counter + 1
+
+    # Function to count up on multiple idle cycles at once
+    def skip_ticks(self, n_ticks):
+        self._counter += n_ticks
+        self.__changed()
+
     # SW memory access needs extra action to happen after commit, hence these function
     # Start accessing the memory
 
     def mem_access(self):
-        self._state = RunState.MEM_WRITE
+        self.__set_state(RunState.MEM_WRITE)
 
     # Function to count up on the number of cycles the SW instruction has executed for
     def mem_tick(self):
@@ -86,16 +128,27 @@ class InstructionTableEntry:
             return True
         else:
             self._counter += 1
+            self.__changed()
             return False
 
     # SW is successfully complete. Stop forever
     def mem_commit(self, cycle):
-        self._state = RunState.COMMIT
+        self.__set_state(RunState.COMMIT)
         self._commit = f"{self._commit}/{cycle}"
 
     # Function to update the result of the instruction, once it completes instruction
     def update_result(self, new_value):
         self._value = new_value
+        self.__changed()
+
+    # Function to store the slot of the ROB entry of the instruction, when it is dispatched
+    def set_rob_slot(self, slot):
+        self._rob_slot = slot
+        self.__changed()
+
+    # Function to get the slot of the ROB entry of the instruction, so that it can be indexed directly
+    def get_rob_slot(self):
+        return self._rob_slot
 
     # Function to get the current state of the instruction
     # Legal values include the members of the RunState class in constants.py
@@ -110,6 +163,18 @@ class InstructionTableEntry:
     def get_result(self):
         return self._value
 
+    # Function to get the execution state of the entry, as recorded by the history buffer
+    def save_state(self):
+        return (self._state, self._rs_issue_cycle, self._exec_start, self._exec_complete,
+                self._cdb_write, self._commit, self._counter, self._max_ticks, self._value,
+                self._rob_slot)
+
+    # Function to restore the execution state of the entry, from the history buffer
+    def restore_state(self, state):
+        (self._state, self._rs_issue_cycle, self._exec_start, self._exec_complete,
+         self._cdb_write, self._commit, self._counter, self._max_ticks, self._value,
+         self._rob_slot) = state
+
     def __str__(self):
         return f"{self._instruction.str_disassemble()}\t\t{self._rs_issue_cycle} {self._exec_start}\
          {self._exec_complete} {self._cdb_write} {self._commit}"
@@ -117,25 +182,123 @@ class InstructionTableEntry:
 
 # Data structure to represent the instruction table.
 # The table consists of an array of InstructionTableEntry elements
+# The entries are also indexed by their PC, and bucketed by their state(as a sorted list of PCs),
+# so that each pipeline stage only looks at the instructions it cares about
 class InstructionTable:
-    def __init__(self, size):
+    # States of the in-flight instructions, which are kept in buckets
+    # Committed instructions are never looked at again, so they are not bucketed
+    BUCKETED_STATES = [RunState.RS, RunState.EX_START,
+                       RunState.EX_END, RunState.CDB, RunState.MEM_WRITE]
+
+    def __init__(self, size, config=None, track_changes=True):
+        if config is None:
+            config = MachineConfig()
+
         self._size = size
+        self._config = config
         self._index = 0
         self._entries = [None for _ in range(size)]
 
+        self._by_pc = {}
+        self._buckets = {state: [] for state in self.BUCKETED_STATES}
+
+        # Index of every entry in the table, and the PCs of the entries that changed since the history
+        # buffer last recorded them. The changes are only tracked if track_changes is set, when the history
+        # buffer records every cycle
+        self._positions = {}
+        self._track_changes = track_changes
+        self._changed = set()
+
+        # The not started instructions are dispatched (mostly) in order, so they are kept in
+        # program order, with the position of the first one that might not have started yet
+        self._not_started = []
+        self._not_started_head = 0
+
     # Function to add an entry to the instruction table
     # The index maintains the index of the next insertion as the size of the table is a constant
+    # The instructions are expected to be added in program order
     def add_entry(self, instruction):
-        self._entries[self._index] = InstructionTableEntry(instruction)
+        entry = InstructionTableEntry(instruction, table=self, config=self._config)
+        self._entries[self._index] = entry
+        self._positions[instruction.PC] = self._index
         self._index += 1
 
+        self._by_pc[instruction.PC] = entry
+        self._not_started.append(instruction.PC)
+        if self._track_changes:
+            self._changed.add(instruction.PC)
+
+    # Function to move an entry to the bucket of its new state. Called by the entry itself
+    def update_state(self, entry, old_state):
+        PC = entry.get_inst().PC
+
+        if old_state in self._buckets:
+            bucket = self._buckets[old_state]
+            del bucket[bisect_left(bucket, PC)]
+
+        if entry.get_state() in self._buckets:
+            insort(self._buckets[entry.get_state()], PC)
+
+    # Function to mark an entry as changed. Called by the entry itself
+    def mark_changed(self, entry):
+        if self._track_changes:
+            self._changed.add(entry.get_inst().PC)
+
+    # Function to rebuild the PC index and the buckets from scratch
+    def __build_index(self):
+        self._by_pc = {}
+        self._buckets = {state: [] for state in self.BUCKETED_STATES}
+        self._not_started = []
+        self._not_started_head = 0
+
+        for entry in self.get_entries():
+            PC = entry.get_inst().PC
+            self._by_pc[PC] = entry
+
+            if entry.get_state() == RunState.NOT_STARTED:
+                self._not_started.append(PC)
+            elif entry.get_state() in self._buckets:
+                self._buckets[entry.get_state()].append(PC)
+
+        self._not_started.sort()
+        for bucket in self._buckets.values():
+            bucket.sort()
+
+    # Function to lazily go over the not started instructions, in program order
+    def __get_not_started(self):
+        while self._not_started_head < len(self._not_started):
+            PC = self._not_started[self._not_started_head]
+            if self._by_pc[PC].get_state() != RunState.NOT_STARTED:
+                self._not_started_head += 1
+            else:
+                break
+
+        # Going by index, since a slice would copy the rest of the program on every call
+        for index in range(self._not_started_head, len(self._not_started)):
+            entry = self._by_pc[self._not_started[index]]
+            if entry.get_state() == RunState.NOT_STARTED:
+                yield entry
+
     # Function to get a particular entry, depending on the PC of the stored instruction
     # The entry is recognized using the instruction that it stores
     def get_entry(self, index):
         if isinstance(index, Instruction):
-            for entry in self._entries:
-                if entry.get_inst() == index:
-                    return entry
+            return self._by_pc.get(index.PC)
+
+    # Function to get the entries in any of the given states, in program order
+    # Not started entries are generated lazily, since there can be a lot of them
+    def get_entries_by_state(self, *states):
+        if states == (RunState.NOT_STARTED,):
+            return self.__get_not_started()
+
+        PCs = []
+        for state in states:
+            PCs.extend(self._buckets[state])
+
+        if len(states) > 1:
+            PCs.sort()
+
+        return [self._by_pc[PC] for PC in PCs]
 
     # Function to get all the entries stored in the table
     # This function is used for checking and updating the states of all the instructions
@@ -143,6 +306,25 @@ class InstructionTable:
     def get_entries(self):
         return list(filter(None, self._entries))
 
+    # Function to get the state of every entry, keyed by the index of the entry
+    def save_state(self):
+        return {index: entry.save_state() for index, entry in enumerate(self._entries) if entry}
+
+    # Function to get the state of only the entries that changed since the last call, for the history buffer
+    # Most of the program is either waiting to start or already committed, so this is much smaller than the
+    # state of the whole table
+    def save_changes(self):
+        changes = {self._positions[PC]: self._by_pc[PC].save_state() for PC in self._changed}
+        self._changed = set()
+        return changes
+
+    # Function to restore the state of the entries. Entries missing in the state are left untouched
+    def restore_state(self, state):
+        for index, entry_state in state.items():
+            self._entries[index].restore_state(entry_state)
+
+        self.__build_index()
+
     def __str__(self):
         display = "Instruction\t\t\t\t\t\t\tRS Start Exec Start Exec End CDB Write commit\n"
         for entry in self._entries:
@@ -6,36 +6,44 @@ Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-O
 This file contains the data structure used to represent the load sture table and every entry in it.
 
 In this implementaito, the LoadStoreBuffer also contains the memory that is used to load in the variables.
-This is essentially a counterpart of the RS, for LW/SW instructions
+This is essentially a counterpart of the RS, for LW/SW instructions. Like the RS, the entries that have
+their operands are kept in a ready queue, in program order
 '''
 
-from constants import DEBUG
-from instruction import Instruction
-from helpers import bin2dec
+from collections import defaultdict
+
+from config import MachineConfig
+from instruction import Instruction, Opcode
+from select_policy import get_select_policy
 
 
 # Data structure to represent every entry in the load/store buffer
+# Sources waiting on a ROB entry that was written on the CDB in an earlier cycle take its value from the ROB,
+# the entries being broadcast in this cycle reach the buffer through update_rs_entries
 class LoadStoreBufferEntry:
-    def __init__(self, instr, ARFTable):
+    def __init__(self, instr, ARFTable, ROBTable=None, broadcasts=()):
         self._busy = True
         self._instruction = instr
-        self._offset = bin2dec(instr.offset)
+        self._offset = instr.decoded.imm
         self._base = ARFTable.get_register(instr.rs1)
-        self._is_store = instr.disassemble()["command"] == "SW"
+        self._is_store = instr.get_opcode() == Opcode.SW
 
-        self._base_val = self.__get_reg_val(self._base)
+        self._base_val = self.__get_reg_val(self._base, ROBTable, broadcasts)
         self._data_src = None
 
         if self._is_store:
             self._data_src = ARFTable.get_register(instr.rs2)
-            self._data_src_val = self.__get_reg_val(self._data_src)
+            self._data_src_val = self.__get_reg_val(self._data_src, ROBTable, broadcasts)
             self._dest = "memory"
         else:
             self._dest = ARFTable.get_register(instr.rd)
 
-    def __get_reg_val(self, reg):
+    def __get_reg_val(self, reg, ROBTable=None, broadcasts=()):
         if reg.is_busy():
-            return reg.get_link()
+            link = reg.get_link()
+            if ROBTable and link not in broadcasts and ROBTable.has_value(link):
+                return ROBTable.get_value(link)
+            return link
         else:
             return reg.get_value()
 
@@ -56,6 +64,10 @@ class LoadStoreBufferEntry:
     def get_inst(self):
         return self._instruction
 
+    # Function to get the address accessed by the instruction, once its base is known
+    def get_address(self):
+        return self._base_val + self._offset
+
     # Function to get the result of the operation, when requested for
     # This function is capable of handling extra spaces, which can be added
     # to improve readability
@@ -73,25 +85,70 @@ class LoadStoreBufferEntry:
             addr = self._base_val + self._offset
 
             # Handing over all memory accesses to the memory controller
-            data = memCtl.get_memory_entry(addr)
+            data = memCtl.get_memory_entry(addr, self._instruction.PC)
             if data:
                 self._busy = False
                 data.append(addr)
 
             return data
 
+    # Function to get the state of the entry, for the history buffer
+    # The registers are not stored, since they can be found again using the instruction
+    def save_state(self):
+        return (self._instruction, self._busy, self._base_val, self._data_src_val if self._is_store else None)
+
+    # Function to restore the state of the entry
+    # The ARF is needed to link the entry back to its source and destination Registers
+    def restore_state(self, state, ARFTable):
+        self._instruction, self._busy, self._base_val, data_src_val = state
+
+        instr = self._instruction
+        self._offset = instr.decoded.imm
+        self._base = ARFTable.get_register(instr.rs1)
+        self._is_store = instr.get_opcode() == Opcode.SW
+        self._data_src = None
+
+        if self._is_store:
+            self._data_src = ARFTable.get_register(instr.rs2)
+            self._data_src_val = data_src_val
+            self._dest = "memory"
+        else:
+            self._dest = ARFTable.get_register(instr.rd)
+
+    # Function to recreate an entry from its recorded state
+    @classmethod
+    def from_state(cls, state, ARFTable):
+        entry = cls.__new__(cls)
+        entry.restore_state(state, ARFTable)
+        return entry
+
     def __str__(self):
         return f"<LW/SW buffer entry: {self._instruction.disassemble()}, {self._busy}>"
 
 
 # Data structure to represent the load/store buffer
+# The config of the machine gives the select policy and the debug output, the default one is used if it isn't given
 class LoadStoreBuffer:
-    def __init__(self, size, memoryFile):
+    def __init__(self, size, memoryFile, config=None):
+        if config is None:
+            config = MachineConfig()
+
         self._size = size
+        self._debug = config.debug
+        self._select = get_select_policy(config.select_policy)
+        self._num_cycles = config.get_num_cycles()
         self._buffer = [None for _ in range(size)]
         self._is_full = False
         self._index = 0
 
+        # Entries that are waiting for their base or data, indexed by the ROB tag they are waiting on
+        # The entries are registered when they are added, so that a CDB broadcast only looks at its dependents
+        self._waiting = defaultdict(list)
+
+        # Entries that can start executing, in program order. Unlike the RS, an entry woken up by a CDB
+        # broadcast can start executing in the same cycle
+        self._ready = []
+
     # Function to find the next free index to make an entry.
     # Could have simply ripped of a circular buffer, but meh
     def __update_free_index(self, update=False):
@@ -114,17 +171,21 @@ class LoadStoreBuffer:
             self._is_full = False
 
     # Function to add an entry to the LW/SW buffer
-    def add_entry(self, instr, ARFTable):
+    def add_entry(self, instr, ARFTable, ROBTable=None, broadcasts=()):
         if self._is_full:
-            if DEBUG:
+            if self._debug:
                 print("Entry Failed. Load store station is full")
             return False
 
         if isinstance(instr, Instruction):
-            entry = LoadStoreBufferEntry(instr, ARFTable)
+            entry = LoadStoreBufferEntry(instr, ARFTable, ROBTable, broadcasts)
 
         self._buffer[self._index] = entry
-        if DEBUG:
+        if entry.is_executeable():
+            self.__add_ready(entry)
+        else:
+            self.__register(entry)
+        if self._debug:
             print(f"Added at LS buffer: {self._index + 1}")
 
         self.__update_free_index()
@@ -147,22 +208,68 @@ class LoadStoreBuffer:
             self._buffer[location] = None
             self.__update_free_index(update=True)
 
-            if DEBUG:
+            if entry in self._ready:
+                self._ready.remove(entry)
+
+            if self._debug:
                 print(f"Removed from RS{location + 1}")
 
             return True
         else:
             return False
 
+    # Function to register an entry against the ROB tags it is waiting on
+    # A source that is still waiting holds the name of the ROB entry instead of its value
+    def __register(self, entry):
+        tags = {entry._base_val}
+        if entry._data_src:
+            tags.add(entry._data_src_val)
+
+        for tag in tags:
+            if isinstance(tag, str):
+                self._waiting[tag].append(entry)
+
+    # Function to add an entry into the ready queue, keeping it in program order
+    # Entries are mostly added in order, so the search starts from the youngest one
+    def __add_ready(self, entry):
+        index = len(self._ready)
+        while index > 0 and entry.get_inst() < self._ready[index - 1].get_inst():
+            index -= 1
+
+        self._ready.insert(index, entry)
+
+    # Function to update the values of the entries on a CDB broadcast
+    # Only the entries waiting on the broadcast ROB entry are looked at
     def update_rs_entries(self, rob_entry):
-        for entry in self._buffer:
-            if entry and rob_entry:
-                if entry._base_val == rob_entry.get_name():
-                    entry._base_val = rob_entry.get_value()
+        if not rob_entry:
+            return
 
-                if entry._data_src:
-                    if entry._data_src_val == rob_entry.get_name():
-                        entry._data_src_val = rob_entry.get_value()
+        name = rob_entry.get_name()
+        for entry in self._waiting.pop(name, []):
+            if entry._base_val == name:
+                entry._base_val = rob_entry.get_value()
+
+            if entry._data_src:
+                if entry._data_src_val == name:
+                    entry._data_src_val = rob_entry.get_value()
+
+            if entry.is_executeable():
+                self.__add_ready(entry)
+
+    # Function to get the ready entries, in the order in which the select policy wants them to be tried
+    # A copy of the queue is given, since the entries that start executing are removed from it
+    def get_ready_entries(self):
+        return self._select(list(self._ready), self._num_cycles)
+
+    # Function to update the ready queue at the end of the select, kept so that the LSQ can be used like an RS
+    # Nothing is deferred here: update_rs_entries wakes the entries straight into the ready queue, unlike the RS
+    def update_ready_queue(self):
+        pass
+
+    # Function to tell if any entry can start executing
+    # Loads that can't access memory stay in the ready queue, and keep retrying
+    def has_ready(self):
+        return bool(self._ready)
 
     # Function to tell if the buffer is full and can't accept more dispatches
     def is_busy(self):
@@ -172,5 +279,33 @@ class LoadStoreBuffer:
     def get_entries(self):
         return sorted(filter(None,self._buffer),key=lambda x:x.get_inst())
 
+    # Function to get the state of the buffer, for the history buffer
+    def save_state(self):
+        state = {"index": self._index, "is_full": self._is_full}
+        for slot, entry in enumerate(self._buffer):
+            state[slot] = entry.save_state() if entry else None
+
+        return state
+
+    # Function to restore the state of the buffer
+    # The ARF is needed to link the entries back to their Registers
+    def restore_state(self, state, ARFTable):
+        for key, value in state.items():
+            if key == "index":
+                self._index = value
+            elif key == "is_full":
+                self._is_full = value
+            else:
+                self._buffer[key] = LoadStoreBufferEntry.from_state(
+                    value, ARFTable) if value else None
+
+        self._waiting = defaultdict(list)
+        self._ready = []
+        for entry in sorted(filter(None, self._buffer), key=lambda x: x.get_inst()):
+            if entry.is_executeable():
+                self._ready.append(entry)
+            else:
+                self.__register(entry)
+
     def __str__(self):
         return f"<LW/SW Buffer>"
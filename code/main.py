@@ -8,58 +8,92 @@ This file contains the main logic, that combines individual blocks into a cohesi
 
 import os
 import sys
-import copy
-import PySimpleGUI as sg
 
 # Import all the functional components
 from register_bank import RegisterBank as ARF
 from memory_controller import MemoryController
 
-from instruction import Instruction
+from instruction import Instruction, Opcode
 from reservation_station import ReservationStation, ReservationStationEntry
 from instruction_table import InstructionTable, InstructionTableEntry
 from ls_buffer import LoadStoreBuffer
 from rob import ROBTable
+from functional_units import FunctionalUnits
+from history import HistoryBuffer
+from config import MachineConfig
+import memory_image
 
 # Import the other custom components
 import constants
-from gui import Graphics
 
 
 class Tomasulo:
-    def __init__(self, program_src, data_mem):
+    # config is the MachineConfig describing this machine(the sizes of the ROB, reservation stations and load
+    # store buffer, the number of cycles taken by each instruction, the caches, ...). The default one, built from
+    # the constants, is used if it isn't given
+    def __init__(self, program_src, data_mem, record_history=constants.HistoryMode.FULL, event_driven=False,
+                 save_memory=True, config=None):
+        if config is None:
+            config = MachineConfig()
+        config.validate()
+
         # Global variables that are needed throughout here
+        self._config = config
+        self._debug = config.debug
+
+        # Number of instructions handled by each stage in a cycle. issue_width is applied by the functional units
+        self._dispatch_width = config.dispatch_width
+        self._cdb_width = config.cdb_width
+        self._commit_width = config.commit_width
         self._instructions = []
-        self._history_buffer = []
+        self._history_mode = record_history
+        self._event_driven = event_driven
+        self._history_buffer = None
         self._clock_cycle = 0
         self._next_event = False
         self._n_complete = 0
         self._data_mem_src = data_mem
 
+        # Runs that never rewind can skip recording the history completely
+        if record_history != constants.HistoryMode.OFF:
+            self._history_buffer = HistoryBuffer(record_history)
+
+        # The components only keep track of what changed in them for the deltas, which are only recorded
+        # when the history of every cycle is
+        track_changes = record_history == constants.HistoryMode.FULL
+
         # Creating objects related to the memory
-        self._memory_controller = MemoryController(data_mem, True, True)
+        # The data memory file is only written to when the memory is flushed, if save_memory is set
+        self._memory_controller = MemoryController(
+            data_mem, config, save_to_file=save_memory, track_changes=track_changes)
 
         # Creating objects of the functional components
-        self._ARF = ARF(size=10, init=[0, 1, 4, 5, 3, 4, 1, 2, 2, 3])
+        self._ARF = ARF(size=len(config.arf_init), init=config.arf_init)
 
-        self._ADD_RS = ReservationStation(constants.ADD_SUB, size=3)
-        self._MUL_RS = ReservationStation(constants.MUL_DIV, size=2)
+        self._ADD_RS = ReservationStation(constants.ADD_SUB, size=config.add_rs_size, config=config)
+        self._MUL_RS = ReservationStation(constants.MUL_DIV, size=config.mul_rs_size, config=config)
 
-        self._LSQ = LoadStoreBuffer(size=3, memoryFile=data_mem)
-        self._ROB = ROBTable(size=8)
+        self._LSQ = LoadStoreBuffer(size=config.lsq_size, memoryFile=data_mem, config=config)
+        self._ROB = ROBTable(size=config.rob_size, debug=config.debug)
+        self._functional_units = FunctionalUnits(config)
 
         # Load in the program and create the instruction table accordingly
         # The instruction table is NOT a functional component of the Tomasulo machine
-        with open(program_src) as binary:
-            program = binary.readlines()
-            program = [inst.strip() for inst in program]
-
-            for local_PC, inst in enumerate(program):
+        if memory_image.is_packed(program_src):
+            for local_PC, word in enumerate(memory_image.read_packed(program_src)):
                 self._instructions.append(
-                    Instruction.segment(inst, PC=local_PC+1))
+                    Instruction.from_word(word, PC=local_PC+1))
+        else:
+            with open(program_src) as binary:
+                program = binary.readlines()
+                program = [inst.strip() for inst in program]
+
+                for local_PC, inst in enumerate(program):
+                    self._instructions.append(
+                        Instruction.segment(inst, PC=local_PC+1))
 
         self._instructionTable = InstructionTable(
-            size=len(self._instructions))
+            size=len(self._instructions), config=config, track_changes=track_changes)
 
         for instruction in self._instructions:
             self._instructionTable.add_entry(instruction)
@@ -68,125 +102,189 @@ class Tomasulo:
     # Functions to implement each stage of the pipeline
     # ------------------------------------------------------------------------------- #
 
-    # Function to try and dispatch next instruction if corresponding RS is free
-    # Updates all relevant source mappings too
-    def try_dispatch(self, rob_entry):
-        for it_entry in self._instructionTable.get_entries():
-            if it_entry.get_state() == constants.RunState.NOT_STARTED:
-                instruction = it_entry.get_inst()
-
-                # If current instruction is a NOP, stall for a cycle essentially
-                # This stall in dispatch will propagate throughout the other stages
-                if instruction.is_NOP():
-                    it_entry.rs_issue("-")
-                    it_entry.ex_start("-")
-                    # Just in case ADDI takes longer
-                    it_entry.set_max_tick(1)
-                    it_entry.ex_tick("-")
-                    it_entry.cdb_write("-")
-                    it_entry.commit("-")
-                    self._n_complete += 1
-                    break
-
-                instruction_type = instruction.disassemble()["command"]
+    # Function to get the RS that handles a particular type of instruction, if any
+    def __get_rs(self, opcode):
+        if opcode in (Opcode.ADD, Opcode.SUB, Opcode.ADDI):
+            return self._ADD_RS
+        elif opcode in (Opcode.MUL, Opcode.DIV):
+            return self._MUL_RS
+        elif opcode in (Opcode.LW, Opcode.SW):
+            return self._LSQ
 
-                RS = None
+        return None
 
-                if instruction_type in ["ADD", "SUB", "ADDI"]:
-                    RS = self._ADD_RS
-                elif instruction_type in ["MUL", "DIV"]:
-                    RS = self._MUL_RS
-                elif instruction_type in ["LW", "SW"]:
-                    RS = self._LSQ
-
-                if RS:
-                    if not RS.is_busy() and not self._ROB.is_full():
-                        if RS.add_entry(instruction, self._ARF):
-                            # Store word instructions have no destination register
-                            # We still need to make a ROB entry for in-order commit
-                            if instruction_type in ["SW"]:
-                                self._ROB.add_entry(instruction, None)
-                            else:
-                                destination = self._ARF.get_register(
-                                    instruction.rd)
-
-                                destination.set_link(self._ROB.add_entry(
-                                    instruction, destination))
-
-                            it_entry.rs_issue(self._clock_cycle)
-                            self._next_event = True
+    # Function to try and dispatch the next instructions in order, as long as their RS is free
+    # Up to dispatch_width instructions are dispatched in a cycle
+    # rob_entries are the ROB entries that were written on the CDB in this cycle
+    # Updates all relevant source mappings too
+    def try_dispatch(self, rob_entries):
+        n_dispatched = 0
+        broadcasts = {rob_entry.get_name() for rob_entry in rob_entries}
+
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.NOT_STARTED):
+            instruction = it_entry.get_inst()
+
+            # If current instruction is a NOP, stall for a cycle essentially
+            # This stall in dispatch will propagate throughout the other stages
+            if instruction.is_NOP():
+                it_entry.rs_issue("-")
+                it_entry.ex_start("-")
+                # Just in case ADDI takes longer
+                it_entry.set_max_tick(1)
+                it_entry.ex_tick("-")
+                it_entry.cdb_write("-")
+                it_entry.commit("-")
+                self._n_complete += 1
+                break
 
+            opcode = instruction.get_opcode()
+
+            RS = self.__get_rs(opcode)
+
+            if RS:
+                if not RS.is_busy() and not self._ROB.is_full():
+                    # Sources that were written on the CDB in an earlier cycle, but not committed yet, are
+                    # read from the ROB. Without this they would wait for a broadcast that never comes
+                    if RS.add_entry(instruction, self._ARF, self._ROB, broadcasts):
+                        # Store word instructions have no destination register
+                        # We still need to make a ROB entry for in-order commit
+                        # x0 is hardwired to 0, so it is never renamed and writes to it are dropped at commit
+                        if opcode == Opcode.SW or instruction.rd == "x0":
+                            it_entry.set_rob_slot(self._ROB.add_entry(instruction, None))
+                        else:
+                            destination = self._ARF.get_register(
+                                instruction.rd)
+
+                            it_entry.set_rob_slot(self._ROB.add_entry(
+                                instruction, destination))
+                            destination.set_link(self._ROB.get_tag(it_entry.get_rob_slot()))
+
+                        it_entry.rs_issue(self._clock_cycle)
+                        self._next_event = True
+
+                        n_dispatched += 1
+                        if n_dispatched == self._dispatch_width:
                             break
-                    else:
-                        return False
+                else:
+                    break
 
-        if rob_entry:
+        for rob_entry in rob_entries:
             for RS in [self._LSQ, self._ADD_RS, self._MUL_RS]:
                 RS.update_rs_entries(rob_entry)
 
-                if constants.DEBUG:
+                if self._debug:
                     print("Updating using: ", rob_entry.get_name())
 
     # Function to simulate the execution of the process. This includes dispatching
     # self._instructions and handling their execution steps
+    # Only the ready entries of each RS are looked at, in the order given by the select policy
+    # The functional units decide which entries start executing, each needs a free unit of its class, and at most
+    # issue_width instructions of a class start in a cycle, whichever RS they are in
     def try_execute(self):
         for RS in [self._LSQ, self._ADD_RS, self._MUL_RS]:
-            for rs_entry in RS.get_entries():
-                if rs_entry:
-                    it_entry = self._instructionTable.get_entry(
-                        rs_entry._instruction)
-
-                    if it_entry.get_state() == constants.RunState.RS and rs_entry.is_executeable():
-                        data = rs_entry.get_result(self._memory_controller)
-                        if data:
-                            it_entry.ex_start(self._clock_cycle)
-
-                            # Separate handling of memory accesses, where the number of clock
-                            # cycles needed might vary
-                            if isinstance(data, list) and len(data) > 0:
-                                data, n_cycles_needed,addr = data
-                                it_entry.set_max_tick(n_cycles_needed)
-                                self._memory_controller.update_busy_bit(addr,value=True)
-                                data = [data,addr]
-
-                            it_entry.update_result(data)
-                            RS.remove_entry(rs_entry.get_inst())
-
-                            self._next_event = True
-                            break
+            for rs_entry in RS.get_ready_entries():
+                it_entry = self._instructionTable.get_entry(
+                    rs_entry._instruction)
+
+                if it_entry.get_state() == constants.RunState.RS:
+                    # The entry waits if its class can't start another instruction, and the next ready entry is tried
+                    pool = self._functional_units.get_pool(rs_entry._instruction.get_opcode())
+                    if not pool.is_free(self._clock_cycle):
+                        pool.stall()
+                        continue
 
-        for it_entry in self._instructionTable.get_entries():
-            if it_entry.get_state() == constants.RunState.EX_START:
-                it_entry.ex_tick(self._clock_cycle)
+                    if RS is self._LSQ and self.__waits_for_store(rs_entry):
+                        continue
+
+                    # A result of 0 is valid, only False means the entry couldn't start(memory busy)
+                    data = rs_entry.get_result(self._memory_controller)
+                    if data is not False:
+                        it_entry.ex_start(self._clock_cycle)
+
+                        # Separate handling of memory accesses, where the number of clock
+                        # cycles needed might vary
+                        if isinstance(data, list) and len(data) > 0:
+                            data, n_cycles_needed,addr = data
+                            it_entry.set_max_tick(n_cycles_needed)
+                            self._memory_controller.update_busy_bit(addr,value=True)
+                            data = [data,addr]
+
+                        it_entry.update_result(data)
+                        RS.remove_entry(rs_entry)
+                        pool.start(self._clock_cycle, it_entry.get_remaining_ticks())
+
+                        self._next_event = True
+
+            RS.update_ready_queue()
+
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.EX_START):
+            it_entry.ex_tick(self._clock_cycle)
+
+    # Function to tell if a load has to wait for an older store, which hasn't been written to the memory yet
+    # There is no store to load forwarding, so a load can only read an address once every older store to it
+    # is written. A store that hasn't started executing yet could be writing to any address
+    def __waits_for_store(self, ls_entry):
+        instruction = ls_entry.get_inst()
+        if instruction.get_opcode() != Opcode.LW:
+            return False
+
+        addr = ls_entry.get_address()
+        for it_entry in self._instructionTable.get_entries_by_state(
+                constants.RunState.RS, constants.RunState.EX_START, constants.RunState.EX_END,
+                constants.RunState.CDB, constants.RunState.MEM_WRITE):
+            if not it_entry.get_inst() < instruction:
+                break
+
+            if it_entry.get_inst().get_opcode() != Opcode.SW:
+                continue
+
+            if it_entry.get_state() == constants.RunState.RS or it_entry.get_result()[0] == addr:
+                return True
+
+        return False
 
     # Function to perform the CDB broadcast, when an instruction has completed executing
+    # There are cdb_width buses, which are given to the completed instructions in program order. The rest
+    # wait for a bus in the next cycle. Stores don't write anything on the CDB, so they don't need a bus
+    # Returns the ROB entries that were written in this cycle
     def try_CDB_broadcast(self):
-        for it_entry in self._instructionTable.get_entries():
-            if it_entry.get_state() == constants.RunState.EX_END:
-                inst = it_entry.get_inst().disassemble()["command"]
-                if inst in ["SW"]:
-                    it_entry.cdb_write("-")
-                else:
-                    it_entry.cdb_write(self._clock_cycle)
+        rob_entries = []
 
-                    value = it_entry.get_result()
-                    if inst in ["LW"]:
-                        value,addr = value
-                        self._memory_controller.update_busy_bit(addr,value=False)
-                    rob_entry = self._ROB.update_value(
-                        it_entry.get_inst(), value)
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.EX_END):
+            opcode = it_entry.get_inst().get_opcode()
+            if opcode == Opcode.SW:
+                it_entry.cdb_write("-")
+            else:
+                it_entry.cdb_write(self._clock_cycle)
 
-                    if rob_entry:
-                        for RS in [self._ADD_RS, self._MUL_RS, self._LSQ]:
-                            RS.update_rs_entries(rob_entry)
+                value = it_entry.get_result()
+                if opcode == Opcode.LW:
+                    value,addr = value
+                    self._memory_controller.update_busy_bit(addr,value=False)
+                rob_entry = self._ROB.update_value(
+                    it_entry.get_rob_slot(), value)
 
-                    self._next_event = True
-                    return rob_entry
+                if rob_entry:
+                    for RS in [self._ADD_RS, self._MUL_RS, self._LSQ]:
+                        RS.update_rs_entries(rob_entry)
+
+                    rob_entries.append(rob_entry)
+
+                self._next_event = True
+
+                if len(rob_entries) == self._cdb_width:
+                    break
+
+        return rob_entries
 
     # Function to commit the result of an instruction, if it has completed CDB broadcast
     # and is at the tail of the self._ROB
+    # Only the entries writing to memory or waiting to commit are looked at, in program order
+    # Up to commit_width entries are committed in a cycle
     def try_commit(self):
-        for it_entry in self._instructionTable.get_entries():
+        n_committed = 0
+
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.MEM_WRITE, constants.RunState.CDB):
             if it_entry.get_state() == constants.RunState.MEM_WRITE:
                 if it_entry.mem_tick():
                     it_entry.mem_commit(self._clock_cycle)
@@ -195,7 +293,7 @@ class Tomasulo:
                     self._memory_controller.mem_write(addr, data)
                     self._memory_controller.update_busy_bit(addr, value=False)
 
-                    if constants.DEBUG:
+                    if self._debug:
                         print(f"Mem write @ addr: {addr} with data: {data}")
 
                     self._n_complete += 1
@@ -209,11 +307,17 @@ class Tomasulo:
                     if it_entry.get_inst() != self._ROB.get_tail_inst():
                         continue
 
+                # A store can't start writing to an address that an older store is still writing to, since
+                # it might finish first
+                if it_entry.get_inst().get_opcode() == Opcode.SW:
+                    if self.__is_being_written(it_entry.get_result()[0]):
+                        break
+
                 rob_entry = self._ROB.remove_entry()
                 if rob_entry:
                     it_entry.commit(self._clock_cycle)
 
-                    if it_entry.get_inst().disassemble()["command"] not in ["SW"]:
+                    if it_entry.get_inst().get_opcode() != Opcode.SW:
                         self._ARF.update_register(rob_entry)
                         self._n_complete += 1
                     else:
@@ -229,44 +333,133 @@ class Tomasulo:
                         it_entry.set_max_tick(latency-1)
 
                     self._next_event = True
+
+                n_committed += 1
+                if n_committed == self._commit_width:
+                    break
+
+    # Function to tell if a store that has committed is still writing to an address
+    def __is_being_written(self, addr):
+        return any(it_entry.get_result()[0] == addr
+                   for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.MEM_WRITE))
+
+    # Function to find the number of cycles until some state changes, apart from the counters
+    # of instructions that are executing or writing to memory, and of the prefetcher queue
+    # Returns 0 if anything else can change in the next cycle, and None if nothing ever will
+    def __cycles_to_next_event(self):
+        # Loads that can't access memory keep retrying(and updating the cache stats), and entries
+        # that just got updated from the CDB, or are ready to start executing
+        for RS in [self._LSQ, self._ADD_RS, self._MUL_RS]:
+            if RS.has_ready():
+                return 0
+
+        if self._instructionTable.get_entries_by_state(constants.RunState.EX_END):
+            return 0
+
+        tail_inst = self._ROB.get_tail_inst()
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.CDB):
+            if tail_inst is None or it_entry.get_inst() == tail_inst:
+                return 0
+
+        # Dispatch is in-order, so only the first instruction that has a RS matters
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.NOT_STARTED):
+            instruction = it_entry.get_inst()
+            if instruction.is_NOP():
+                return 0
+
+            RS = self.__get_rs(instruction.get_opcode())
+            if RS:
+                if not RS.is_busy() and not self._ROB.is_full():
+                    return 0
                 break
 
+        next_event = self._memory_controller.cycles_to_next_prefetch()
+
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.EX_START, constants.RunState.MEM_WRITE):
+            remaining = it_entry.get_remaining_ticks()
+            if remaining is not None and (next_event is None or remaining < next_event):
+                next_event = remaining
+
+        return next_event
+
+    # Function to jump over the cycles in which only the counters change, without going past max_cycle
+    def __skip_idle_cycles(self, max_cycle):
+        next_event = self.__cycles_to_next_event()
+
+        # Nothing will ever change, so the machine can go straight to the end
+        if next_event is None:
+            n_cycles = max_cycle - self._clock_cycle - 1
+        else:
+            n_cycles = min(next_event - 1, max_cycle - self._clock_cycle - 1)
+
+        if n_cycles <= 0:
+            return
+
+        for it_entry in self._instructionTable.get_entries_by_state(constants.RunState.EX_START, constants.RunState.MEM_WRITE):
+            it_entry.skip_ticks(n_cycles)
+
+        self._memory_controller.skip_prefetch_cycles(n_cycles)
+        self._clock_cycle += n_cycles
+
     # Function to call all the above function, while updating the program counter
-    def logic_loop(self):
-        if self._n_complete == len(self._instructions):
+    # When event driven, the idle cycles before the next change are skipped first, without letting
+    # the clock go past max_cycle(the cycle limit by default). This is only done when the history is
+    # not recorded, since the GUI steps and rewinds one cycle at a time
+    def logic_loop(self, max_cycle=None):
+        if self.is_complete():
             return
 
+        if self._event_driven and self._history_buffer is None:
+            if max_cycle is None:
+                max_cycle = self.get_cycle_limit() + 1
+
+            self.__skip_idle_cycles(max_cycle)
+
         self._clock_cycle += 1
 
         self.reset_next_event()
 
-        if constants.DEBUG:
+        if self._debug:
             print(self._clock_cycle)
 
         # Execute each of the steps in reverse-pipeline order
         # The reverse order is to make sure that the previous instruction completes its stages
         self.try_commit()
-        rob_entry = self.try_CDB_broadcast()
+        rob_entries = self.try_CDB_broadcast()
         self._memory_controller.prefetch_tick()
         self.try_execute()
 
         # This is needed because I am dispatching after broadcasting.
         # This is a race condition effectively
-        self.try_dispatch(rob_entry)
+        self.try_dispatch(rob_entries)
+
+        # The dirty lines are written back and the memory is saved into the file once the program completes
+        if self.is_complete():
+            self.flush_memory()
 
         # Update the changes into the history buffer
-        self._history_buffer.append({
-            "instruction_table": copy.deepcopy(self._instructionTable),
-            "ROB": copy.deepcopy(self._ROB),
-            "RS": {
-                constants.ADD_SUB: copy.deepcopy(self._ADD_RS),
-                constants.MUL_DIV: copy.deepcopy(self._MUL_RS)
-            },
-            "ARF": copy.deepcopy(self._ARF),
-            "LSQ": copy.deepcopy(self._LSQ),
-            "next_event": copy.deepcopy(self._next_event),
-            "memory_controller": copy.deepcopy(self._memory_controller)
-        })
+        if self._history_buffer is not None:
+            self._history_buffer.record(
+                self.__get_components(), self._next_event)
+
+    # Function to save the data memory into the data memory file
+    # The dirty lines still in the caches are written back first, so that no store is left out
+    def flush_memory(self):
+        self._memory_controller.write_back_all()
+        return self._memory_controller.flush()
+
+    # Function to get all the components whose state is recorded in the history buffer
+    def __get_components(self):
+        return {
+            "instruction_table": self._instructionTable,
+            "ROB": self._ROB,
+            constants.ADD_SUB: self._ADD_RS,
+            constants.MUL_DIV: self._MUL_RS,
+            "ARF": self._ARF,
+            "LSQ": self._LSQ,
+            "memory_controller": self._memory_controller,
+            "functional_units": self._functional_units
+        }
 
     # Reset the flag variable that indicates a change in machine state
     def reset_next_event(self):
@@ -275,25 +468,78 @@ class Tomasulo:
     # Return the flag that indicates that the machine state has changed
     def next_event_occured(self):
         # Cap the longest search for the next event
-        if self._clock_cycle > 55*len(self._instructions):
+        if self._clock_cycle > self.get_cycle_limit():
             return "completed"
 
-        if self._n_complete == len(self._instructions):
+        if self.is_complete():
             return "completed"
 
         return self._next_event
 
+    # Check if every instruction in the program has completed
+    def is_complete(self):
+        return self._n_complete == len(self._instructions)
+
+    # Upper bound on the number of cycles, used to stop programs that never complete
+    def get_cycle_limit(self):
+        return 55*len(self._instructions)
+
     # Get the cycle-by-cycle execution history of the machine
+    # The components are rebuilt from the nearest keyframe and the changes recorded after it
+    # Returns None if the history of that cycle was not recorded, see has_history()
     def get_history(self, index):
-        if index > len(self._history_buffer):
+        if not self.has_history(index):
             return None
 
-        return self._history_buffer[index]
+        history = self._history_buffer.get(index)
+
+        components, changes, next_event = history
+        ARF = components["ARF"]
+
+        for name, state in changes.items():
+            if name in ["ROB", "LSQ"]:
+                components[name].restore_state(state, ARF)
+            else:
+                components[name].restore_state(state)
+
+        return {
+            "instruction_table": components["instruction_table"],
+            "ROB": components["ROB"],
+            "RS": {
+                constants.ADD_SUB: components[constants.ADD_SUB],
+                constants.MUL_DIV: components[constants.MUL_DIV]
+            },
+            "ARF": ARF,
+            "LSQ": components["LSQ"],
+            "next_event": next_event,
+            "memory_controller": components["memory_controller"],
+            "functional_units": components["functional_units"]
+        }
+
+    # Check if the history of a particular cycle is available
+    # This is never the case when recording is off, and only at keyframes in keyframes-only mode
+    def has_history(self, index):
+        if self._history_buffer is None:
+            return False
+
+        return self._history_buffer.is_available(index)
+
+    # Get the history recording mode of the machine
+    def get_history_mode(self):
+        return self._history_mode
 
     # Get the CPU clock cycle
     def get_cpu_clock(self):
         return self._clock_cycle
 
+    # Get the number of instructions in the loaded program
+    def get_num_instructions(self):
+        return len(self._instructions)
+
+    # Get the number of instructions that have completed
+    def get_num_completed(self):
+        return self._n_complete
+
     # Get the instruction table object
     def get_instruction_table(self):
         return self._instructionTable
@@ -321,8 +567,20 @@ class Tomasulo:
     def get_mem_ctl(self):
         return self._memory_controller
 
+    # Get the functional units object
+    def get_functional_units(self):
+        return self._functional_units
+
+    # Get the config the machine was built from
+    def get_config(self):
+        return self._config
+
 
 if __name__ == "__main__":
+    # The GUI is only needed when running interactively
+    import PySimpleGUI as sg
+    from gui import Graphics
+
     # Load in the program, if no program file is provided
     if len(sys.argv) < 2 or not os.path.exists(sys.argv[1]):
         program_src = "../build/riscv_program.bin"
@@ -346,7 +604,7 @@ if __name__ == "__main__":
     backwards = 0
     frameDuration = constants.CYCLE_DURATION
 
-    GUI = Graphics()
+    GUI = Graphics(config=machine.get_config())
     window = GUI.generate_window()
 
     # Main event loop
@@ -371,15 +629,15 @@ if __name__ == "__main__":
         elif event in ["Load new program", "Load new data memory"] and not RUN:
             if event == "Load new program":
                 filename = GUI.generateFileLoader(
-                    "Enter program file(.bin format only)")
+                    "Enter program file(.bin/.pbin format only)")
             else:
                 filename = GUI.generateFileLoader(
-                    "Enter program file(.dat format only)")
+                    "Enter program file(.dat/.pdat format only)")
 
             if filename:
-                if event == "Load new program" and filename.split('.')[-1] != "bin":
+                if event == "Load new program" and filename.split('.')[-1] not in ["bin", memory_image.PACKED_PROGRAM_EXT]:
                     sg.popup_error("Invalid file format!")
-                elif event == "Load new data memory" and filename.split('.')[-1] != "dat":
+                elif event == "Load new data memory" and filename.split('.')[-1] not in ["dat", memory_image.PACKED_MEMORY_EXT]:
                     sg.popup_error("Invalid file format!")
 
                 else:
@@ -388,7 +646,8 @@ if __name__ == "__main__":
                     else:
                         data_mem_src = filename
 
-                    machine = Tomasulo(program_src, data_mem_src)
+                    machine.flush_memory()
+                    machine = Tomasulo(program_src, data_mem_src, config=machine.get_config())
                     backwards = 0
 
                     GUI.reset_state()
@@ -476,4 +735,5 @@ if __name__ == "__main__":
                     machine.get_mem_ctl()
                 )
 
+    machine.flush_memory()
     window.close()
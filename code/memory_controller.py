@@ -1,40 +1,71 @@
 import os
+import heapq
 from helpers import pad, dec2bin
 
-from constants import WORD_SIZE, L1D_CACHE_LATENCY, L2D_CACHE_LATENCY, MEMORY_LATENCY, DEBUG
-from constants import L1D_CACHE_SIZE, L2D_CACHE_SIZE, L1D_WAYS, L2D_WAYS
-from constants import PREFETCHER_ON
+from constants import WORD_SIZE
 
+import memory_image
 from cache import Cache
-from cache_algos.prefetcher.next_line import Prefetcher
-from cache_algos.replacement.lru import Replacement_policy
+from config import MachineConfig
+from prefetch_tracker import PrefetchTracker
+from cache_algos.prefetcher import get_prefetcher
+from cache_algos.replacement import get_policy
 
 
+# The memory controller owns the data memory and the hierarchy of caches in front of it
+# The levels are numbered from 0(L1D, closest to the processor) to the one closest to the memory
 class MemoryController:
-    def __init__(self, mem_file, enable_L1=True, enable_L2=True):
-        self._L1D = None
-        self._L2D = None
+    def __init__(self, mem_file, config=None, save_to_file=True, track_changes=True):
+        # The caches are built from the hierarchy in the config of the machine, the default one is used if
+        # it isn't given
+        if config is None:
+            config = MachineConfig()
+
+        hierarchy = config.hierarchy
+        self._hierarchy = hierarchy
+        self._debug = config.debug
 
         self._mem_file = mem_file
         self._memory = []
         self._mem_busy_bit = []
         self._size = 0
 
-        self.load_memory()
+        # Addresses whose word or busy bit changed since the history buffer last recorded them, and whether
+        # the prefetchers or their trackers changed since then. The addresses(and the rows of the caches) are
+        # only tracked if track_changes is set, when the history buffer records every cycle
+        self._track_changes = track_changes
+        self._changed_addresses = set()
+        self._prefetch_changed = False
+
+        # The write-backs only go to the memory array, until it is flushed into the file
+        # The file is never touched if save_to_file is False
+        self._save_to_file = save_to_file
+        self._flush_interval = config.flush_interval
+        self._n_write_backs = 0
+        self._dirty = False
+
+        # Number of lines read from and written back to the memory
+        self._memory_reads = 0
+        self._memory_writes = 0
 
-        # checking for whether L1 cache is enabled or not.
-        # If enabled then creating L1D cache with given cache size and number of ways, and replacement policy it uses
+        self.load_memory()
 
-        if enable_L1:
-            self._L1D = Cache(L1D_CACHE_SIZE, "L1D", L1D_WAYS, True, Replacement_policy(
-                L1D_CACHE_SIZE, L1D_WAYS))  # have to update
+        # Creating every level of the cache with its size, number of ways and the replacement policy it uses
+        # All the levels have the same line size, so the lines move between them as a whole
+        self._levels = [Cache(level.size, level.name, level.ways, True,
+                              get_policy(level.replacement, level.size, level.ways), level.line_size,
+                              config.debug, track_changes)
+                        for level in hierarchy.levels]
+        self._line_size = hierarchy.levels[0].line_size
+        self._n_levels = len(self._levels)
+        self._inclusion = [level.inclusion for level in hierarchy.levels]
 
-        # checking for whether L1 cache is enabled or not.
-        # If enabled then creating L1D cache with given cache size and number of ways, and replacement policy it uses
+        # Latency of a hit at each level, counting the levels above it, and of going all the way to the memory
+        self._hit_latency = []
+        for level in hierarchy.levels:
+            self._hit_latency.append(level.latency + (self._hit_latency[-1] if self._hit_latency else 0))
 
-        if enable_L2:
-            self._L2D = Cache(L2D_CACHE_SIZE, "L2D", L2D_WAYS,
-                              True, Replacement_policy(L2D_CACHE_SIZE, L2D_WAYS))
+        self._miss_latency = self._hit_latency[-1] + hierarchy.memory_latency
 
         # Getting memory for memory accesses
         if os.path.exists(mem_file):
@@ -43,219 +74,533 @@ class MemoryController:
             print("Memory file not found")
             return
 
-        self._prefetcher = None
-
-        # Checking for prefetcher is enabled or not.
-        # If enabled, we are intializing the prefetcher - Here using
-        if PREFETCHER_ON:
-            self._prefetcher = Prefetcher(self._size)
-
-        # list of dictionary({"address":prefetch_address,"value":mem_value,"count":MEMORY_LATENCY})
-            self._prefetcher_queue = []
-
-        # caching stats
-        self._L1D_read_hits = 0
-        self._L2D_read_hits = 0
-        self._L1D_read_miss = 0
-        self._L2D_read_miss = 0
-        self._L1D_write_hits = 0
-        self._L1D_write_miss = 0
-
-        # prefeteching stats
-        if PREFETCHER_ON:
-            self._prefetched_addresses = []
-            self._prefetch_hits = 0
-            self._total_prefetches = 0
+        # Initializing the prefetcher of every level that has one, along with a tracker that measures
+        # how useful its prefetches are. The prefetchers work on line addresses(addr // line_size)
+        self._prefetchers = [None] * self._n_levels
+        self._trackers = [None] * self._n_levels
+        n_lines = -(-self._size // self._line_size)
+        for i, level in enumerate(hierarchy.levels):
+            if level.prefetcher is not None:
+                self._prefetchers[i] = get_prefetcher(level.prefetcher.name, n_lines,
+                                                      level.prefetcher.degree, level.prefetcher.distance)
+                self._trackers[i] = PrefetchTracker()
+
+        self._prefetch_levels = [i for i in range(self._n_levels) if self._prefetchers[i] is not None]
+
+        # Min-heap of (arrival cycle, sequence number, level, address) of the prefetches in flight, along with
+        # the set of their (level, address) pairs, so that a line is only prefetched once at a time into a level.
+        # The sequence number keeps the prefetches arriving in the same cycle in the order they were issued
+        self._prefetcher_queue = []
+        self._prefetches_in_flight = set()
+        self._prefetch_cycle = 0
+        self._prefetch_seq = 0
+
+        # caching stats, the writes only ever look up the first level
+        self._read_hits = [0] * self._n_levels
+        self._read_miss = [0] * self._n_levels
+        self._write_hits = 0
+        self._write_miss = 0
 
     # Loading data memory here
 
     def load_memory(self):
-        with open(self._mem_file, 'r') as dataMemory:
-            self._memory = dataMemory.readlines()
+        if memory_image.is_packed(self._mem_file):
+            self._memory = memory_image.read_packed(self._mem_file).tolist()
+        else:
+            with open(self._mem_file, 'r') as dataMemory:
+                self._memory = dataMemory.readlines()
 
-        self._memory = [line.replace(" ", "").strip() for line in self._memory]
-        self._memory = [int(line, 2) for line in self._memory]
+            self._memory = [line.replace(" ", "").strip() for line in self._memory]
+            self._memory = [int(line, 2) for line in self._memory]
 
         self._size = len(self._memory)
         self._mem_busy_bit = [False for _ in range(self._size)]
-        if DEBUG:
+        if self._debug:
             print("Memory loaded of size: ", self._size)
 
     # Use to save the data in memory file
     def save_memory(self):
+        if len(self._memory) != self._size:
+            return False
+
+        if memory_image.is_packed(self._mem_file):
+            memory_image.write_packed(self._mem_file, self._memory)
+            return True
+
         write_buffer = [dec2bin(line, WORD_SIZE) +
                         "\n" for line in self._memory]
-        if len(write_buffer) != self._size:
-            return False
 
         with open(self._mem_file, 'w') as dataMemory:
             dataMemory.writelines(write_buffer)
 
         return True
 
+    # Function to save the memory into the file, if it was written to since the last flush
+    def flush(self):
+        if not self._save_to_file or not self._dirty:
+            return False
+
+        if self.save_memory():
+            self._dirty = False
+            return True
+
+        return False
+
+    # Function to read the words of the line starting at addr from the memory
+    # The words past the end of the memory are read as 0
+    def __read_line(self, addr):
+        self._memory_reads += 1
+
+        words = self._memory[addr:addr + self._line_size]
+        return words + [0] * (self._line_size - len(words))
+
+    # Function to write back a dirty line evicted from the last level of the cache into the memory
+    # The file is only updated once every flush_interval write-backs
+    def __write_back(self, addr, words):
+        n_words = min(self._line_size, self._size - addr)
+        self._memory[addr:addr + n_words] = words[:n_words]
+        if self._track_changes:
+            self._changed_addresses.update(range(addr, addr + n_words))
+        self._memory_writes += 1
+        self._dirty = True
+        self._n_write_backs += 1
+
+        if self._flush_interval and self._n_write_backs % self._flush_interval == 0:
+            self.flush()
+
     # if busy bit is set if that address line in memory is being used currently for lw sw operation.
     # if busy bit is 0 then we can access the address line in memory
     def mem_busy_bit_update(self, addr, busy_bit):
         self._mem_busy_bit[addr] = busy_bit
+        if self._track_changes:
+            self._changed_addresses.add(addr)
 
     # mem write function is used sw word instruction, basically write to memory instructions
     def mem_write(self, addr, data):
-        if addr > self._size:
+        if addr >= self._size:
             return False
 
-        if self._L1D.set_entry(addr, data):
-            self._L1D_write_hits = self._L1D_write_hits + 1
-            self._L2D.update_busy_bit(addr, True)
-            self._mem_busy_bit[addr] = True
+        if self._levels[0].set_entry(addr, data):
+            self._write_hits = self._write_hits + 1
+            for cache in self._levels[1:]:
+                cache.update_busy_bit(addr, True)
+            self.mem_busy_bit_update(addr, True)
             return data
         else:
-            self._L1D_write_miss = self._L1D_write_miss + 1
-            write_back = self._L1D.add_entry(data, addr, True, True)
-            if(write_back):
-                if(self._L2D.has_entry(addr)):
-                    self._L2D.set_entry(write_back[0], write_back[1])
-                else:
-                    write_back2 = self._L2D.add_entry(
-                        write_back[1], write_back[0], True, True)
-                    if(write_back2):
-                        self._memory[write_back2[0]] = write_back2[1]
-                        self.save_memory()
+            # The rest of the line has to be brought in, before the word can be written into it
+            self._write_miss = self._write_miss + 1
+            words = self.__take_line(addr)
+            words[addr % self._line_size] = data
+
+            self.__fill(0, words, addr, True, True)
             return data
 
-    # if busy bit is set if that address line in L1D and L2D caches is being used currently for lw sw operation.
-    # if busy bit is 0 then we can access the address line in L1D and L2D caches
+    # Function to get the newest copy of the line holding addr, from the levels below the first one,
+    # or the memory if none of them have it. The exclusive levels give up their copy, since the line
+    # is moving up into the first level
+    def __take_line(self, addr):
+        words = None
+        for level in range(1, self._n_levels):
+            if self._inclusion[level] == "exclusive":
+                line = self._levels[level].invalidate(addr)
+                line = line.value if line is not None else None
+            else:
+                line = self._levels[level].get_line(addr)
+
+            if words is None:
+                words = line
+
+        if words is None:
+            # A single word line is overwritten completely, so there is nothing to bring in
+            if self._line_size == 1:
+                return [0]
+
+            words = self.__read_line(addr - addr % self._line_size)
+
+        return list(words)
+
+    # Function to add the line holding addr into a level, and record it with the prefetch tracker of that level
+    # An inclusive level also removes the line it evicts from the levels above it. If one of them has
+    # a dirty copy of that line, the newest one is returned as the Victim, so that it isn't lost
+    def __add_entry(self, level, data, addr, dirty_bit=False, busy_bit=False, prefetch=False):
+        cache = self._levels[level]
+        inserted = not cache.has_entry(addr)
+        victim = cache.add_entry(data, addr, dirty_bit, busy_bit)
+
+        if self._trackers[level] is not None:
+            self._prefetch_changed = True
+            self._trackers[level].record_fill(cache.get_line_address(addr), victim, prefetch, inserted)
+
+        if victim is not None and self._inclusion[level] == "inclusive":
+            for above in reversed(range(level)):
+                line = self._levels[above].invalidate(victim.addr)
+                if line is not None and line.dirty:
+                    victim = line
+
+        return victim
+
+    # Function to add a line into a level, passing the line that it evicts down the hierarchy
+    def __fill(self, level, data, addr, dirty_bit=False, busy_bit=False):
+        victim = self.__add_entry(level, data, addr, dirty_bit, busy_bit)
+        if victim is not None:
+            self.__evict(level, victim)
+
+    # Function to put a line evicted from a level into the level below it
+    # Dirty lines evicted from the last level are written back to the memory. An exclusive level takes in
+    # every line evicted from the level above it, the others only take in the dirty lines
+    # The line isn't marked busy in the level below, since no access is in flight on it there, and nothing
+    # would ever clear the busy bit
+    def __evict(self, level, victim):
+        below = level + 1
+        if below == self._n_levels:
+            if victim.dirty:
+                self.__write_back(victim.addr, victim.value)
+        elif self._inclusion[below] == "exclusive":
+            self.__fill(below, victim.value, victim.addr, victim.dirty)
+        elif victim.dirty:
+            if self._levels[below].has_entry(victim.addr):
+                self._levels[below].set_line(victim.addr, victim.value)
+            else:
+                self.__fill(below, victim.value, victim.addr, True)
+
+    # Function to bring a line into all the levels above the one it was found in(the memory is level n_levels)
+    # Exclusive levels are skipped, since they only hold the lines evicted from above
+    def __fill_above(self, level, data, addr, dirty_bit=False):
+        for above in reversed(range(level)):
+            if above > 0 and self._inclusion[above] == "exclusive":
+                continue
+
+            self.__fill(above, data, addr, dirty_bit)
+
+    # if busy bit is set if that address line in all the caches is being used currently for lw sw operation.
+    # if busy bit is 0 then we can access the address line in the caches
     def update_busy_bit(self, addr, value=False):
-        self._L1D.update_busy_bit(addr, value)
-        self._L2D.update_busy_bit(addr, value)
-        self.mem_busy_bit_update(addr, True)
+        for cache in self._levels:
+            cache.update_busy_bit(addr, value)
+        self.mem_busy_bit_update(addr, value)
 
     # returns the how many clock cycles are required that memory access.
-    # It varies if the entry is in L1D cache or L2D cahce or in memory
+    # It varies with the first level of the cache that has the entry, or the memory if none of them do
     def get_latency(self, addr):
-        if(self._L1D.has_entry(addr)):
-            return L1D_CACHE_LATENCY
-        elif(self._L2D.has_entry(addr)):
-            return L1D_CACHE_LATENCY+L2D_CACHE_LATENCY
-        else:
-            return L1D_CACHE_LATENCY+L2D_CACHE_LATENCY+MEMORY_LATENCY
+        for level, cache in enumerate(self._levels):
+            if cache.has_entry(addr):
+                return self._hit_latency[level]
+
+        return self._miss_latency
 
     # this functions checks whether the latency of the memory line is satisfied to be prefetched or not.
-    # If yes it prefetches the date and puts in L2D cache
+    # If yes it puts the prefetched data into the level that requested it
     def prefetch_tick(self):
-        pop_list = []
-        for i in range(len(self._prefetcher_queue)):
-            self._prefetcher_queue[i]['count'] = self._prefetcher_queue[i]['count'] - 1
-            if(self._prefetcher_queue[i]['count'] == 0):
-                self._L2D.add_entry(self._prefetcher_queue[i]['value'],self._prefetcher_queue[i]['address'])
-                self._prefetched_addresses.append(self._prefetcher_queue[i]['address'])
-                self._total_prefetches = self._total_prefetches + 1
-                pop_list.append(i)
-        for i in range(len(pop_list)):
-            self._prefetcher_queue.pop(pop_list[i]-i)
+        self._prefetch_cycle += 1
+
+        queue = self._prefetcher_queue
+        while queue and queue[0][0] <= self._prefetch_cycle:
+            _, _, level, address = heapq.heappop(queue)
+            self._prefetches_in_flight.discard((level, address))
+
+            # The line was brought into a level above while the prefetch was in flight, and may have been
+            # written to since. It isn't added, since a stale copy would be left behind in this level
+            if level > 0 and self.__is_cached(address, level - 1):
+                self._prefetch_changed = True
+                self._trackers[level].record_fill(address, prefetch=True, inserted=False)
+                continue
+
+            victim = self.__add_entry(level, self.__read_line(address), address, prefetch=True)
+            if victim is not None:
+                self.__evict(level, victim)
+
+    # Function to send a prefetch request for a level to the memory, unless the line is already in flight
+    # to that level. The request has to go through all the levels below the one it is meant for
+    def __issue_prefetch(self, level, address):
+        if (level, address) in self._prefetches_in_flight:
+            return
+
+        self._prefetch_seq += 1
+        latency = self._miss_latency - self._hit_latency[level]
+        heapq.heappush(self._prefetcher_queue, (self._prefetch_cycle + latency, self._prefetch_seq,
+                                                level, address))
+        self._prefetches_in_flight.add((level, address))
+
+    # Function to check if an address is in any level, up to and including the given one
+    def __is_cached(self, addr, level):
+        return any(self._levels[above].has_entry(addr) for above in range(level + 1))
+
+    # Function to get the number of cycles after which the next prefetch arrives in its cache
+    # Returns None if there are no prefetches in flight
+    def cycles_to_next_prefetch(self):
+        if not self._prefetcher_queue:
+            return None
+
+        return self._prefetcher_queue[0][0] - self._prefetch_cycle
+
+    # Function to count down the prefetches in flight over multiple idle cycles at once
+    # The caller must make sure that none of them arrive during these cycles
+    def skip_prefetch_cycles(self, n_cycles):
+        self._prefetch_cycle += n_cycles
 
     # mem write function is used lw word instruction, basically read from memory instructions
-    def get_memory_entry(self, addr):
-        if addr > self._size:
+    # pc is the PC of the load instruction, used by the PC indexed prefetchers
+    def get_memory_entry(self, addr, pc=None):
+        if addr >= self._size:
             return False
 
         # [data_at_location, n_cycles_needed_for_access]
 
+        line_size = self._line_size
+        line_addr = addr - addr % line_size
+
         # prefetching part
-        if PREFETCHER_ON:
-            prefetch_address = self._prefetcher.prefetch_address(addr)
-            if not self._L2D.has_entry(prefetch_address) and not self._L1D.has_entry(prefetch_address):
-                if not self._mem_busy_bit[prefetch_address]:
-                    mem_value = self._memory[prefetch_address]
-                    self._prefetcher_queue.append(
-                        {"address": prefetch_address, "value": mem_value, "count": MEMORY_LATENCY})
-
-        # accessing caches
-        value = self._L1D.get_memory_entry(addr)
-        if not value:
-            self._L1D_read_miss = self._L1D_read_miss + 1
-            value = self._L2D.get_memory_entry(addr)
-            if not value:
-                self._L2D_read_miss = self._L2D_read_miss + 1
-                if self._mem_busy_bit[addr]:
+        if self._prefetch_levels:
+            self._prefetch_changed = True
+
+        for level in self._prefetch_levels:
+            for prefetch_line in self._prefetchers[level].prefetch_addresses(addr // line_size, pc):
+                prefetch_address = prefetch_line * line_size
+                if not self.__is_cached(prefetch_address, level):
+                    if not any(self._mem_busy_bit[prefetch_address:prefetch_address + line_size]):
+                        self.__issue_prefetch(level, prefetch_address)
+
+        # accessing caches, from the first level downwards
+        # A line that is busy in a level is being written to, so the load has to wait for it. The levels below
+        # and the memory may only have an older copy of it
+        for level, cache in enumerate(self._levels):
+            value = cache.get_memory_entry(addr)
+            if value is None:
+                if cache.get_busy_bit(addr):
                     return False
-                else:
-                    mem_value = self._memory[addr]
-                    write_back = self._L2D.add_entry(mem_value, addr)
-                    if(write_back):
-                        self._memory[write_back[0]] = write_back[1]
-                        self.save_memory()
-
-                    write_back = self._L1D.add_entry(mem_value, addr)
-                    if(write_back):
-                        if(self._L2D.has_entry(addr)):
-                            self._L2D.set_entry(write_back[0], write_back[1])
-                        else:
-                            write_back2 = self._L2D.add_entry(
-                                write_back[1], write_back[0], True, True)
-                            if(write_back2):
-                                self._memory[write_back2[0]] = write_back2[1]
-                                self.save_memory()
-
-                    return [mem_value, L1D_CACHE_LATENCY+L2D_CACHE_LATENCY+MEMORY_LATENCY]
+
+                self._read_miss[level] = self._read_miss[level] + 1
+                continue
+
+            self._read_hits[level] = self._read_hits[level] + 1
+
+            for above in range(level):
+                if self._trackers[above] is not None:
+                    self._trackers[above].record_miss(line_addr, (above, line_addr) in self._prefetches_in_flight)
+
+            if self._trackers[level] is not None:
+                self._trackers[level].record_hit(line_addr)
+
+            # An exclusive level gives up the line, once it moves up
+            dirty_bit = False
+            if self._inclusion[level] == "exclusive":
+                line = cache.invalidate(addr)
+                words, dirty_bit = line.value, line.dirty
             else:
-                self._L2D_read_hits = self._L2D_read_hits + 1
-
-                # updating prefetcher stats
-                if addr in self._prefetched_addresses:
-                    print("Came inside checking prefetcher")
-                    self._prefetch_hits = self._prefetch_hits + 1
-                # end of stats update
-
-                write_back = self._L1D.add_entry(value, addr)
-                if(write_back):
-                    if(self._L2D.has_entry(addr)):
-                        self._L2D.set_entry(write_back[0], write_back[1])
-                    else:
-                        write_back2 = self._L2D.add_entry(
-                            write_back[1], write_back[0], True, True)
-                        if(write_back2):
-                            self._memory[write_back2[0]] = write_back2[1]
-                            self.save_memory()
-                return [value, L1D_CACHE_LATENCY+L2D_CACHE_LATENCY]
-        else:
-            self._L1D_read_hits = self._L1D_read_hits + 1
-            return [value, L1D_CACHE_LATENCY]
+                words = cache.get_line(addr)
+
+            self.__fill_above(level, words, addr, dirty_bit)
+            return [value, self._hit_latency[level]]
+
+        if self._mem_busy_bit[addr]:
+            return False
+
+        for level in self._prefetch_levels:
+            self._trackers[level].record_miss(line_addr, (level, line_addr) in self._prefetches_in_flight)
+
+        words = self.__read_line(line_addr)
+        self.__fill_above(self._n_levels, words, addr)
+
+        return [words[addr % line_size], self._miss_latency]
+
+    # Function to get the position of a level in the hierarchy, given either its position or its name
+    def __get_level(self, level):
+        if isinstance(level, str):
+            return [cache.get_name() for cache in self._levels].index(level)
+
+        return level
 
     # for stats
-    def get_L1D_read_hits(self):
-        return self._L1D_read_hits
+    def get_read_hits(self, level=0):
+        return self._read_hits[self.__get_level(level)]
+
+    def get_read_miss(self, level=0):
+        return self._read_miss[self.__get_level(level)]
 
-    def get_L2D_read_hits(self):
-        return self._L2D_read_hits
+    def get_write_hits(self):
+        return self._write_hits
 
-    def get_L1D_read_miss(self):
-        return self._L1D_read_miss
+    def get_write_miss(self):
+        return self._write_miss
 
-    def get_L2D_read_miss(self):
-        return self._L2D_read_miss
+    # Number of lines read from and written back to the memory, including the prefetches
+    def get_memory_reads(self):
+        return self._memory_reads
 
-    def get_L1D_write_hits(self):
-        return self._L1D_write_hits
+    def get_memory_writes(self):
+        return self._memory_writes
 
-    def get_L1D_write_miss(self):
-        return self._L1D_write_miss
+    # Function to get the trackers of all the levels that have a prefetcher
+    def __get_trackers(self):
+        return [self._trackers[level] for level in self._prefetch_levels]
 
+    # Number of prefetched lines that were used by a load
     def get_prefetch_hits(self):
-        return self._prefetch_hits
+        return sum(tracker.get_useful_prefetches() for tracker in self.__get_trackers())
 
+    def get_total_prefetches(self):
+        return sum(tracker.get_total_prefetches() for tracker in self.__get_trackers())
+
+    # Fraction of the prefetches that were used
     def get_prefetch_accuracy(self):
-        if self._total_prefetches == 0:
+        n_prefetches = self.get_total_prefetches()
+        if n_prefetches == 0:
             return 0
 
-        return round(self._prefetch_hits/self._total_prefetches,2)
+        return round(self.get_prefetch_hits()/n_prefetches, 2)
+
+    # Fraction of the misses in the prefetched levels that were removed by prefetching
+    def get_prefetch_coverage(self):
+        n_useful = self.get_prefetch_hits()
+        n_misses = sum(self._read_miss[level] for level in self._prefetch_levels)
+        if n_useful + n_misses == 0:
+            return 0
+
+        return round(n_useful/(n_useful + n_misses), 2)
+
+    def get_late_prefetches(self):
+        return sum(tracker.get_late_prefetches() for tracker in self.__get_trackers())
+
+    def get_useless_prefetches(self):
+        return sum(tracker.get_useless_prefetches() for tracker in self.__get_trackers())
+
+    def get_prefetch_pollution(self):
+        return sum(tracker.get_pollution() for tracker in self.__get_trackers())
+
+    # Get all the stats in one go, for reporting outside the GUI
+    def get_stats(self):
+        stats = {}
+        for level, cache in enumerate(self._levels):
+            stats[f"{cache.get_name()}_read_hits"] = self._read_hits[level]
+            stats[f"{cache.get_name()}_read_miss"] = self._read_miss[level]
+
+            if level == 0:
+                stats[f"{cache.get_name()}_write_hits"] = self._write_hits
+                stats[f"{cache.get_name()}_write_miss"] = self._write_miss
+
+        stats.update({
+            "memory_reads": self._memory_reads,
+            "memory_writes": self._memory_writes,
+            "prefetch_hits": self.get_prefetch_hits(),
+            "total_prefetches": self.get_total_prefetches(),
+            "prefetch_accuracy": self.get_prefetch_accuracy(),
+            "prefetch_coverage": self.get_prefetch_coverage(),
+            "late_prefetches": self.get_late_prefetches(),
+            "useless_prefetches": self.get_useless_prefetches(),
+            "prefetch_pollution": self.get_prefetch_pollution()
+        })
+
+        return stats
+
+    # Function to get the state of the memory, caches, prefetchers and stats, for the history buffer
+    # Every word of the memory is keyed by its address, along with its busy bit
+    def save_state(self):
+        state = self.__save_state()
+        for addr in range(self._size):
+            state[addr] = (self._memory[addr], self._mem_busy_bit[addr])
+
+        return state
+
+    # Function to get the state for the history buffer, with only the words of the memory and the rows of the
+    # caches that changed since the last call. The prefetchers are only given if they were used since then
+    def save_changes(self):
+        state = self.__save_state(changes=True)
+        for addr in self._changed_addresses:
+            state[addr] = (self._memory[addr], self._mem_busy_bit[addr])
+
+        self._changed_addresses = set()
+        return state
+
+    # Function to get the state of everything other than the memory
+    # Only the changes of the caches and prefetchers are given if changes is set
+    def __save_state(self, changes=False):
+        state = {
+            "stats": (tuple(self._read_hits), tuple(self._read_miss), self._write_hits, self._write_miss,
+                      self._memory_reads, self._memory_writes),
+            "prefetcher_queue": (self._prefetch_cycle, self._prefetch_seq, tuple(self._prefetcher_queue))
+        }
+
+        for cache in self._levels:
+            cache_state = cache.save_changes() if changes else cache.save_state()
+            for key, value in cache_state.items():
+                state[(cache.get_name(),) + key] = value
+
+        if self._prefetch_levels and (self._prefetch_changed or not changes):
+            state["prefetcher"] = tuple(self._prefetchers[level].save_state() for level in self._prefetch_levels)
+            state["prefetch_stats"] = tuple(tracker.save_state() for tracker in self.__get_trackers())
+
+        if changes:
+            self._prefetch_changed = False
+
+        return state
+
+    # Function to restore the state of the memory controller
+    def restore_state(self, state):
+        cache_state = {cache.get_name(): {} for cache in self._levels}
+
+        for key, value in state.items():
+            if isinstance(key, int):
+                self._memory[key], self._mem_busy_bit[key] = value
+            elif key == "stats":
+                (read_hits, read_miss, self._write_hits, self._write_miss,
+                 self._memory_reads, self._memory_writes) = value
+                self._read_hits = list(read_hits)
+                self._read_miss = list(read_miss)
+            elif key == "prefetcher_queue":
+                self._prefetch_cycle, self._prefetch_seq, queue = value
+                self._prefetcher_queue = list(queue)
+                self._prefetches_in_flight = {(entry[2], entry[3]) for entry in queue}
+            elif key == "prefetcher":
+                for level, prefetcher_state in zip(self._prefetch_levels, value):
+                    self._prefetchers[level].restore_state(prefetcher_state)
+            elif key == "prefetch_stats":
+                for tracker, tracker_state in zip(self.__get_trackers(), value):
+                    tracker.restore_state(tracker_state)
+            else:
+                cache_state[key[0]][key[1:]] = value
+
+        for cache in self._levels:
+            cache.restore_state(cache_state[cache.get_name()])
+
+    # Function to get the dirty lines of every level, along with the level holding them
+    # They are listed from the last level up to the first, since the levels closer to the processor
+    # hold the newer copies, which have to be written over the older ones
+    def __get_dirty_lines(self):
+        return [(cache, line) for cache in reversed(self._levels) for line in cache.get_lines() if line.dirty]
+
+    # Function to get the newest value of every word in the memory, without writing anything back
+    # The dirty lines still in the caches are read over the memory array
+    def read_memory(self):
+        memory = list(self._memory)
+        for _, line in self.__get_dirty_lines():
+            n_words = min(self._line_size, self._size - line.addr)
+            memory[line.addr:line.addr + n_words] = line.value[:n_words]
+
+        return memory
+
+    # Function to write the dirty lines of every level back into the memory, and mark them as clean
+    # The lines stay in the caches. This is done before the final flush, so that the memory file has
+    # the stores whose lines were never evicted
+    def write_back_all(self):
+        for cache, line in self.__get_dirty_lines():
+            n_words = min(self._line_size, self._size - line.addr)
+            self._memory[line.addr:line.addr + n_words] = line.value[:n_words]
+            if self._track_changes:
+                self._changed_addresses.update(range(line.addr, line.addr + n_words))
+            self._memory_writes += 1
+            self._dirty = True
+
+            cache.update_dirty_bit(line.addr, False)
 
     # Get the entire memory, for the GUI
 
     def get_memory(self):
         return [f"0b{dec2bin(line, WORD_SIZE)}" for line in self._memory]
 
-    def get_l1_cache(self):
-        return self._L1D.get_cache()
+    # Get the hierarchy that the caches were built from
+    def get_hierarchy(self):
+        return self._hierarchy
 
-    def get_l2_cache(self):
-        return self._L2D.get_cache()
+    # Get the contents of a level of the cache, given its position or name
+    def get_cache(self, level=0):
+        return self._levels[self.__get_level(level)].get_cache()
@@ -0,0 +1,124 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the functions to read and write the packed binary images of programs and data memory.
+
+The text formats(.bin programs and .dat data memory) store one 32 character binary string per line.
+The packed formats(.pbin programs and .pdat data memory) store the same words as raw little-endian
+32 bit unsigned integers, with no header. A packed file is read into an array of words in a single call,
+and can also be mmap-ed directly. Negative words are stored in 2's complement.
+
+The converter can be run from the command line, in either direction:
+    python memory_image.py ../build/<filename.bin> ../build/<filename.pbin>
+    python memory_image.py memory/data_memory.pdat memory/data_memory.dat
+'''
+
+import os
+import sys
+import argparse
+from array import array
+
+from constants import WORD_SIZE
+from helpers import to_unsigned
+
+# Extensions of the packed program and data memory images
+PACKED_PROGRAM_EXT = "pbin"
+PACKED_MEMORY_EXT = "pdat"
+
+# Number of bytes in a word
+WORD_BYTES = WORD_SIZE // 8
+
+
+# Function to get the type code of the unsigned integers of the size of a word
+# The size of the C types behind the type codes depends on the platform, so the first one that fits is used
+def get_word_typecode():
+    for typecode in ["I", "L"]:
+        if array(typecode).itemsize == WORD_BYTES:
+            return typecode
+
+    raise RuntimeError(f"No array type code holds a {WORD_SIZE} bit word on this platform")
+
+
+# Type code of the words in the packed images
+WORD_TYPECODE = get_word_typecode()
+
+
+# Function to check if a file is a packed image, using its extension
+def is_packed(filename):
+    return filename.split('.')[-1] in [PACKED_PROGRAM_EXT, PACKED_MEMORY_EXT]
+
+
+# Function to read all the words of a packed image into an array
+def read_packed(filename):
+    words = array(WORD_TYPECODE)
+
+    size = os.path.getsize(filename)
+    if size % WORD_BYTES:
+        raise ValueError(f"{filename} is not a packed image, its size is not a multiple of {WORD_BYTES} bytes")
+
+    with open(filename, 'rb') as image:
+        words.fromfile(image, size // WORD_BYTES)
+
+    if sys.byteorder != "little":
+        words.byteswap()
+
+    return words
+
+
+# Function to write the words into a packed image
+def write_packed(filename, words):
+    packed = array(WORD_TYPECODE, [to_unsigned(word, WORD_SIZE) for word in words])
+
+    if sys.byteorder != "little":
+        packed.byteswap()
+
+    with open(filename, 'wb') as image:
+        packed.tofile(image)
+
+
+# Function to read the words from the text format, which is capable of handling spaces
+def read_text(filename):
+    with open(filename, 'r') as textFile:
+        lines = [line.replace(" ", "").strip() for line in textFile.readlines()]
+
+    return [int(line, 2) for line in lines if line]
+
+
+# Function to write the words in the text format
+def write_text(filename, words):
+    with open(filename, 'w') as textFile:
+        textFile.writelines(
+            [format(to_unsigned(word, WORD_SIZE), f"0{WORD_SIZE}b") + "\n" for word in words])
+
+
+# Function to read the words of a program or data memory, in either format
+def read_words(filename):
+    if is_packed(filename):
+        return read_packed(filename)
+
+    return read_text(filename)
+
+
+# Function to convert an image from one format to the other, depending on the extensions
+def convert(src, dest):
+    words = read_words(src)
+
+    if is_packed(dest):
+        write_packed(dest, words)
+    else:
+        write_text(dest, words)
+
+    return len(words)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert programs and data memory between the text(.bin/.dat) and packed(.pbin/.pdat) formats")
+    parser.add_argument("src", help="file to convert")
+    parser.add_argument("dest", help="converted file, the format is chosen using its extension")
+    args = parser.parse_args()
+
+    n_words = convert(args.src, args.dest)
+    print(f"Converted {n_words} words from {args.src} to {args.dest}")
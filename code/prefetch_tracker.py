@@ -0,0 +1,112 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the data structure used to measure how useful the prefetches are.
+
+Every cache level with a prefetcher has its own tracker. Every line brought into that level by a prefetch is
+remembered until it is either used by a load(useful), or evicted without being used(useless). Loads that miss
+on a line that is still being prefetched are late prefetches, and loads that miss on a line that a prefetch
+evicted from the level are counted as pollution.
+All the lookups are done on sets, so the cost doesn't grow with the length of the program.
+'''
+
+
+class PrefetchTracker:
+    def __init__(self):
+        # Prefetched lines in the cache, that haven't been used yet
+        self._pending = set()
+
+        # Lines evicted from the cache to make space for a prefetch
+        self._evicted_by_prefetch = set()
+
+        self._n_prefetches = 0
+        self._n_useful = 0
+        self._n_useless = 0
+        self._n_late = 0
+        self._n_pollution = 0
+
+    # Function to record a line added into the cache, along with the Victim it evicted(if any)
+    # Only lines that weren't already in the cache are tracked as prefetched
+    def record_fill(self, addr, victim=None, prefetch=False, inserted=True):
+        if prefetch:
+            self._n_prefetches += 1
+
+        if victim is not None:
+            if victim.addr in self._pending:
+                self._pending.remove(victim.addr)
+                self._n_useless += 1
+
+            if prefetch:
+                self._evicted_by_prefetch.add(victim.addr)
+
+        if prefetch and inserted:
+            self._pending.add(addr)
+
+    # Function to record a load that hit in the cache
+    # Returns True if the line was brought in by a prefetch, and this is its first use
+    def record_hit(self, addr):
+        if addr in self._pending:
+            self._pending.remove(addr)
+            self._n_useful += 1
+            return True
+
+        return False
+
+    # Function to record a load that missed in the cache
+    # in_flight tells if the line was being prefetched at that time
+    def record_miss(self, addr, in_flight=False):
+        if in_flight:
+            self._n_late += 1
+
+        if addr in self._evicted_by_prefetch:
+            self._evicted_by_prefetch.remove(addr)
+            self._n_pollution += 1
+
+    # Function to get the number of prefetches that reached the cache
+    def get_total_prefetches(self):
+        return self._n_prefetches
+
+    # Function to get the number of prefetched lines that were used by a load
+    def get_useful_prefetches(self):
+        return self._n_useful
+
+    # Function to get the number of prefetched lines that were evicted without being used
+    def get_useless_prefetches(self):
+        return self._n_useless
+
+    # Function to get the number of loads that missed on a line which was still being prefetched
+    def get_late_prefetches(self):
+        return self._n_late
+
+    # Function to get the number of loads that missed because a prefetch evicted their line
+    def get_pollution(self):
+        return self._n_pollution
+
+    # Fraction of the prefetches that were used
+    def get_accuracy(self):
+        if self._n_prefetches == 0:
+            return 0
+
+        return round(self._n_useful/self._n_prefetches, 2)
+
+    # Fraction of the misses that were removed by prefetching, given the number of remaining misses
+    def get_coverage(self, n_misses):
+        if self._n_useful + n_misses == 0:
+            return 0
+
+        return round(self._n_useful/(self._n_useful + n_misses), 2)
+
+    # Function to get the state of the tracker, for the history buffer
+    def save_state(self):
+        return (frozenset(self._pending), frozenset(self._evicted_by_prefetch), self._n_prefetches,
+                self._n_useful, self._n_useless, self._n_late, self._n_pollution)
+
+    # Function to restore the state of the tracker
+    def restore_state(self, state):
+        (pending, evicted_by_prefetch, self._n_prefetches, self._n_useful,
+         self._n_useless, self._n_late, self._n_pollution) = state
+
+        self._pending = set(pending)
+        self._evicted_by_prefetch = set(evicted_by_prefetch)
@@ -10,7 +10,7 @@ not literally a register, but a row in the ARF(Architectural Register File)
 '''
 
 from random import randint
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 from collections import defaultdict
 
 
@@ -52,6 +52,14 @@ class Register:
         else:
             self._busy = False
 
+    # Function to get the value, busy bit and link of the register, for the history buffer
+    def save_state(self) -> Tuple:
+        return (self._value, self._busy, self._link)
+
+    # Function to restore the value, busy bit and link of the register
+    def restore_state(self, state: Tuple) -> None:
+        self._value, self._busy, self._link = state
+
     def __str__(self) -> str:
         return f"[{'BUSY' if self._busy else 'FREE'}] Register: {self._name}"
 
@@ -85,7 +93,11 @@ class RegisterBank:
 
     # Function to update the value of a particular ARF register
     # The input is a ROB entry, which contains the new value
+    # Entries without a destination(writes to x0) don't change the ARF
     def update_register(self, rob_entry: Any) -> None:
+        if rob_entry.get_destination() is None:
+            return
+
         name = rob_entry.get_destination().get_name()
         self._bank[name].set_value(rob_entry.get_value())
 
@@ -95,5 +107,14 @@ class RegisterBank:
         if self._bank[name].get_link() == rob_entry.get_name():
             self._bank[name].set_link(None)
 
+    # Function to get the state of every register, keyed by the register name
+    def save_state(self) -> Dict:
+        return {name: register.save_state() for name, register in self._bank.items()}
+
+    # Function to restore the state of the registers present in the state
+    def restore_state(self, state: Dict) -> None:
+        for name, register_state in state.items():
+            self._bank[name].restore_state(register_state)
+
     def __str__(self) -> str:
         return f"<Register Bank {self._name} of size: {len(self._bank)}>"
@@ -7,17 +7,37 @@ This file contains the data structure used to represent the reservation stations
 
 The RSes are used to keep track of the instructions and their source operands until
 they start executing. Once they start executing, they are removed from the corresponding RS.
+The entries that have both their operands are kept in a ready queue, in program order, from which
+the select policy of the machine chooses the entry to start executing
 '''
-from constants import DEBUG
-from helpers import bin2dec
-from instruction import Instruction
+from collections import defaultdict
 
+from config import MachineConfig
+from instruction import Instruction, Opcode
+from select_policy import get_select_policy
 
+
+# The operation performed by each instruction on its source values
+OPERATIONS = {
+    Opcode.ADD: lambda x, y: int(x+y),
+    Opcode.SUB: lambda x, y: int(x-y),
+    Opcode.MUL: lambda x, y: int(x*y),
+    Opcode.DIV: lambda x, y: int(x/y),
+    Opcode.ADDI: lambda x, y: int(x+y),
+    Opcode.BEQ: lambda x, y: 1 if x == y else 0,
+    Opcode.BNE: lambda x, y: 1 if x != y else 0,
+}
+
+
+# Sources waiting on a ROB entry that was written on the CDB in an earlier cycle take its value from the ROB,
+# the entries being broadcast in this cycle reach the RS through update_rs_entries
+# _rob_updated is set when the last operand of the entry comes from a CDB broadcast, until it enters the ready queue
 class ReservationStationEntry:
-    def __init__(self, instr, ARFTable, busy=True):
+    def __init__(self, instr, ARFTable, busy=True, ROBTable=None, broadcasts=()):
         self._instruction = instr
         self._busy = busy
-        if instr.disassemble()["command"].startswith("B"):
+        opcode = instr.get_opcode()
+        if opcode in (Opcode.BEQ, Opcode.BNE):
             self._dest = "-"
         else:
             self._dest = instr.rd
@@ -26,18 +46,21 @@ class ReservationStationEntry:
 
         # Check if the value is available, else get the tag
         self._src_val1, self._src_tag1 = self.__getSrcValTag(
-            ARFTable.get_register(instr.rs1))
+            ARFTable.get_register(instr.rs1), ROBTable, broadcasts)
 
-        if instr.disassemble()["command"].endswith("I"):
-            self._src_val2, self._src_tag2 = bin2dec(instr.offset), "-"
+        if opcode == Opcode.ADDI:
+            self._src_val2, self._src_tag2 = instr.decoded.imm, "-"
         else:
             self._src_val2, self._src_tag2 = self.__getSrcValTag(
-                ARFTable.get_register(instr.rs2))
+                ARFTable.get_register(instr.rs2), ROBTable, broadcasts)
 
     # Function to check if the ARF entry is valid, and get the value/tag accordingly
-    def __getSrcValTag(self, source):
+    def __getSrcValTag(self, source, ROBTable=None, broadcasts=()):
         if source.is_busy():
-            return "-", source.get_link()
+            link = source.get_link()
+            if ROBTable and link not in broadcasts and ROBTable.has_value(link):
+                return ROBTable.get_value(link), "-"
+            return "-", link
         else:
             return source.get_value(), "-"
 
@@ -45,37 +68,19 @@ class ReservationStationEntry:
     # This is done by checking both the operands are available and not waiting for
     # their value from the ROB tag
     def is_executeable(self):
-        if self._rob_updated:
-            self._rob_updated = False
-            return False
-        else:
-            condition = (self._src_val1 != "-") and (self._src_val2 != "-")
-            if condition:
-                self._value = self.__exec()
-
-            return condition
+        return (self._src_val1 != "-") and (self._src_val2 != "-")
 
     # Private function to get the calculated value of the instructions
     def __exec(self):
-        command = self._instruction.disassemble()["command"]
-        lookup = {
-            "ADD": lambda x, y: int(x+y),
-            "SUB": lambda x, y: int(x-y),
-            "MUL": lambda x, y: int(x*y),
-            "DIV": lambda x, y: int(x/y),
-            "ADDI": lambda x, y: int(x+y),
-            "BEQ": lambda x, y: 1 if x == y else 0,
-            "BNE": lambda x, y: 1 if x != y else 0,
-        }
-
         try:
-            return lookup.get(command)(self._src_val1, self._src_val2)
+            return OPERATIONS.get(self._instruction.get_opcode())(self._src_val1, self._src_val2)
         except ZeroDivisionError:
             print("Divisor is 0!: ", self._src_val1, self._src_val2)
             return 0
 
-    # Function to return the resultant value of the instruction
+    # Function to calculate and return the resultant value of the instruction, when it starts executing
     def get_result(self, args=None):
+        self._value = self.__exec()
         return self._value
 
     # Function to return the Instruction associated with this entry
@@ -86,6 +91,23 @@ class ReservationStationEntry:
     def get_destination(self):
         return self._dest
 
+    # Function to get the state of the entry, for the history buffer
+    def save_state(self):
+        return (self._instruction, self._busy, self._dest, self._rob_updated, self._value,
+                self._src_val1, self._src_tag1, self._src_val2, self._src_tag2)
+
+    # Function to restore the state of the entry
+    def restore_state(self, state):
+        (self._instruction, self._busy, self._dest, self._rob_updated, self._value,
+         self._src_val1, self._src_tag1, self._src_val2, self._src_tag2) = state
+
+    # Function to recreate an entry from its recorded state, without needing the ARF
+    @classmethod
+    def from_state(cls, state):
+        entry = cls.__new__(cls)
+        entry.restore_state(state)
+        return entry
+
     def __str__(self):
         return f"""ReservationStationEntry:
                     Instruction: {self._instruction.disassemble()}
@@ -100,13 +122,29 @@ class ReservationStationEntry:
 
 # Data structure to represent the RSes
 class ReservationStation:
-    def __init__(self, inst_type, size):
+    # The config of the machine gives the select policy and the debug output, the default one is used if it isn't given
+    def __init__(self, inst_type, size, config=None):
+        if config is None:
+            config = MachineConfig()
+
         self._type = inst_type
+        self._debug = config.debug
+        self._select = get_select_policy(config.select_policy)
+        self._num_cycles = config.get_num_cycles()
         self._is_full = False
         self._size = size
         self._buffer = [None for _ in range(size)]
         self._index = 0
 
+        # Entries that are waiting for a value, indexed by the ROB tag they are waiting on
+        # The entries are registered when they are added, so that a CDB broadcast only looks at its dependents
+        self._waiting = defaultdict(list)
+
+        # Entries that can start executing, in program order. Entries woken up by a CDB broadcast are held
+        # back until the end of the select in that cycle, so that they start executing in the next cycle
+        self._ready = []
+        self._woken = []
+
     # Function to find the next free index to make an entry.
     # Could have simply ripped of a circular buffer, but meh
     def __update_free_index(self, update=False):
@@ -130,38 +168,82 @@ class ReservationStation:
 
     # Function to add an entry into the RS
     # The ARF is needed to get the actual source Registers
-    def add_entry(self, instruction, ARFTable):
+    def add_entry(self, instruction, ARFTable, ROBTable=None, broadcasts=()):
         if self._is_full:
-            if DEBUG:
+            if self._debug:
                 print("Reservation station is full")
             return False
 
         if isinstance(instruction, Instruction):
-            entry = ReservationStationEntry(instruction, ARFTable)
+            entry = ReservationStationEntry(instruction, ARFTable, ROBTable=ROBTable, broadcasts=broadcasts)
 
         else:
             return False
 
         self._buffer[self._index] = entry
-        if DEBUG:
+        if entry.is_executeable():
+            self.__add_ready(entry)
+        else:
+            self.__register(entry)
+        if self._debug:
             print(f"Added at RS{self._index + 1}")
 
         self.__update_free_index()
         return True
 
+    # Function to register an entry against the ROB tags it is waiting on
+    def __register(self, entry):
+        for tag in {entry._src_tag1, entry._src_tag2}:
+            if tag != "-":
+                self._waiting[tag].append(entry)
+
+    # Function to add an entry into the ready queue, keeping it in program order
+    # Entries are mostly added in order, so the search starts from the youngest one
+    def __add_ready(self, entry):
+        index = len(self._ready)
+        while index > 0 and entry.get_inst() < self._ready[index - 1].get_inst():
+            index -= 1
+
+        self._ready.insert(index, entry)
+
     # Function to update the values of the RS entries on a CDB broadcast
+    # Only the entries waiting on the broadcast ROB entry are looked at
     def update_rs_entries(self, rob_entry):
-        for entry in self._buffer:
-            if entry and rob_entry:
-                if entry._src_tag1 == rob_entry.get_name():
-                    entry._src_val1 = rob_entry.get_value()
-                    entry._src_tag1 = "-"
-                    entry._rob_updated = True
-
-                if entry._src_tag2 == rob_entry.get_name():
-                    entry._src_val2 = rob_entry.get_value()
-                    entry._src_tag2 = "-"
-                    entry._rob_updated = True
+        if not rob_entry:
+            return
+
+        name = rob_entry.get_name()
+        for entry in self._waiting.pop(name, []):
+            if entry._src_tag1 == name:
+                entry._src_val1 = rob_entry.get_value()
+                entry._src_tag1 = "-"
+
+            if entry._src_tag2 == name:
+                entry._src_val2 = rob_entry.get_value()
+                entry._src_tag2 = "-"
+
+            # The entry is only woken up once both of its operands are available
+            if entry.is_executeable():
+                entry._rob_updated = True
+                self._woken.append(entry)
+
+    # Function to get the ready entries, in the order in which the select policy wants them to be tried
+    # A copy of the queue is given, since the entries that start executing are removed from it
+    def get_ready_entries(self):
+        return self._select(list(self._ready), self._num_cycles)
+
+    # Function to move the entries woken up by the CDB broadcast into the ready queue, once the select
+    # of the cycle is done
+    def update_ready_queue(self):
+        for entry in self._woken:
+            entry._rob_updated = False
+            self.__add_ready(entry)
+
+        self._woken = []
+
+    # Function to tell if any entry can start executing, now or after the next select
+    def has_ready(self):
+        return bool(self._ready or self._woken)
 
     # Function to remove an entry from the RS when it starts executing
     def remove_entry(self, entry):
@@ -180,7 +262,10 @@ class ReservationStation:
             self._buffer[location] = None
             self.__update_free_index(update=True)
 
-            if DEBUG:
+            if entry in self._ready:
+                self._ready.remove(entry)
+
+            if self._debug:
                 print(f"Removed from RS{location + 1}")
 
             return True
@@ -204,6 +289,38 @@ class ReservationStation:
     def get_entries(self):
         return sorted(filter(None,self._buffer),key=lambda x:x.get_inst())
 
+    # Function to get the state of the RS, for the history buffer
+    def save_state(self):
+        state = {"index": self._index, "is_full": self._is_full}
+        for slot, entry in enumerate(self._buffer):
+            state[slot] = entry.save_state() if entry else None
+
+        return state
+
+    # Function to restore the state of the RS
+    # The queues are rebuilt from the operands of the entries: the entries still waiting for an operand are
+    # registered again, and of the ones that have both, those woken up in the last cycle go back to _woken
+    def restore_state(self, state):
+        for key, value in state.items():
+            if key == "index":
+                self._index = value
+            elif key == "is_full":
+                self._is_full = value
+            else:
+                self._buffer[key] = ReservationStationEntry.from_state(
+                    value) if value else None
+
+        self._waiting = defaultdict(list)
+        self._ready = []
+        self._woken = []
+        for entry in sorted(filter(None, self._buffer), key=lambda x: x.get_inst()):
+            if not entry.is_executeable():
+                self.__register(entry)
+            elif entry._rob_updated:
+                self._woken.append(entry)
+            else:
+                self._ready.append(entry)
+
     def __str__(self):
         return f"""Reservation Station for {self._type}.
                     {self._buffer}
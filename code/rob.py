@@ -9,8 +9,6 @@ dependencies. It is also used for in-order writeback, which helps preserve the m
 state in case of faults/errors, leading to improved error handling
 '''
 
-from collections import defaultdict
-
 from constants import DEBUG
 
 
@@ -47,89 +45,143 @@ class rob_entry:
         return f"{self._name}, inst={self._inst}, val={self._value}, dest={self._dest}"
 
 
-# Data structure to represent the ROB table, a cicular buffer effectively
-# The rob_entry elements aer stored in a dictionary
+# Data structure to represent the ROB table, a circular buffer
+# The rob_entry elements are stored in a fixed size list. _head is the slot the next entry goes into, _tail is
+# the slot of the oldest entry, and _count is the number of entries in use. The in-flight instructions carry the
+# slot of their entry, so that it is indexed directly on the CDB broadcast. Every slot also has a fixed name(its
+# tag), which is what the registers are renamed to, and what the RS/LSQ entries wait on. Only the sources read
+# at dispatch need to find a slot from its tag
 class ROBTable:
-    def __init__(self, size=8):
+    def __init__(self, size=8, debug=DEBUG):
         self._size = size
-        self._tail = 1
-        self._head = 1
-        self._bank = defaultdict(None, {})
+        self._debug = debug
+        self._tail = 0
+        self._head = 0
+        self._count = 0
+        self._bank = [None] * size
 
-        for i in range(1, size+1):
-            self._bank.update({f"ROB{i}": None})
+        self._names = [f"ROB{i}" for i in range(1, size+1)]
+        self._slots = {name: slot for slot, name in enumerate(self._names)}
 
     def is_full(self):
-        return len(list(filter(None, self._bank.values()))) == self._size
+        return self._count == self._size
 
     # Function to add an entry to the head of the ROB, if possible
+    # Returns the slot of the new entry, or False if the ROB is full
     def add_entry(self, inst, dest=None):
         if self.is_full():
-            if DEBUG:
+            if self._debug:
                 print("ROB FULL")
             return False
 
-        name = f"ROB{self._head}"
+        slot = self._head
 
         new_entry = rob_entry(
             inst=inst,
             destination=dest,
             value="NA",
-            name=name
+            name=self._names[slot]
         )
 
-        self._bank[name] = new_entry
-        self._head += 1
-
-        if self._head > len(self._bank):
-            self._head = 1
+        self._bank[slot] = new_entry
+        self._head = (slot + 1) % self._size
+        self._count += 1
 
-        if DEBUG:
+        if self._debug:
             print(f"ADDED to ROB @ {new_entry}")
 
-        return name
+        return slot
+
+    # Function to get the tag of a slot, which the destination register is linked to
+    def get_tag(self, slot):
+        return self._names[slot]
 
-    # Function to update the value stored in the ROB
+    # Function to update the value stored in the ROB, given the slot of the entry
     # This is ONLY used after a CDB broadcast
-    def update_value(self, inst, value):
-        for entry in list(self._bank.values()):
-            if entry:
-                if entry.get_inst() == inst:
-                    entry.set_value(value)
-                    return entry
+    def update_value(self, slot, value):
+        entry = self._bank[slot]
+        if entry:
+            entry.set_value(value)
+
+        return entry
 
     # Function to remove and return the entry at the tail of the ROB
     def remove_entry(self):
-        if not self._bank[f"ROB{self._tail}"]:
-            if DEBUG:
+        if self._count == 0:
+            if self._debug:
                 print("ROB EMPTY")
             return False
 
-        removedValue = self._bank[f"ROB{self._tail}"]
-        self._bank[f"ROB{self._tail}"] = None
-        self._tail += 1
+        removedValue = self._bank[self._tail]
+        self._bank[self._tail] = None
+        self._tail = (self._tail + 1) % self._size
+        self._count -= 1
 
-        if self._tail > len(self._bank):
-            self._tail = 1
-
-        if DEBUG:
+        if self._debug:
             print(f"REMOVED from ROB @ {removedValue}")
 
         return removedValue
 
-    # Function to get the value stored in a particular rob_entry
+    # Function to get the value stored in a particular rob_entry, given its tag
     def get_value(self, entry):
         if entry:
-            return self._bank[entry].get_value()
+            return self._bank[self._slots[entry]].get_value()
         else:
             return False
 
-    # Function to return all the ROB entries, for displaying purposes only
+    # Function to check if a particular rob_entry has been written on the CDB
+    def has_value(self, entry):
+        if not entry:
+            return False
+
+        rob_entry = self._bank[self._slots[entry]]
+        return rob_entry is not None and rob_entry.get_value() != "NA"
+
+    # Function to return all the ROB entries by their tag, for displaying purposes only
     def get_entries(self):
-        return self._bank
+        return dict(zip(self._names, self._bank))
+
+    # Function to get the state of the ROB, for the history buffer
+    # The destination is stored using the register name, so that it can be restored into any ARF
+    def save_state(self):
+        state = {"head": self._head, "tail": self._tail, "count": self._count}
+        for slot, entry in enumerate(self._bank):
+            if entry:
+                destination = entry.get_destination()
+                if destination:
+                    destination = destination.get_name()
+                state[slot] = (entry.get_inst(), destination, entry.get_value())
+            else:
+                state[slot] = None
+
+        return state
+
+    # Function to restore the state of the ROB
+    # The ARF is needed to link the entries back to their destination Registers
+    def restore_state(self, state, ARFTable):
+        for key, entry_state in state.items():
+            if key == "head":
+                self._head = entry_state
+            elif key == "tail":
+                self._tail = entry_state
+            elif key == "count":
+                self._count = entry_state
+            elif entry_state is None:
+                self._bank[key] = None
+            else:
+                inst, destination, value = entry_state
+                if destination:
+                    destination = ARFTable.get_register(destination)
+
+                self._bank[key] = rob_entry(
+                    inst=inst,
+                    destination=destination,
+                    value=value,
+                    name=self._names[key]
+                )
 
     def get_tail_inst(self):
-        if self._bank[f"ROB{self._tail}"]:
-            return self._bank[f"ROB{self._tail}"].get_inst()
+        if self._bank[self._tail]:
+            return self._bank[self._tail].get_inst()
         else:
             return None
@@ -0,0 +1,35 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the select policies, used by the reservation stations and the load store buffer
+to choose which of their ready entries starts executing first. Every policy is a function that is given
+the ready entries in age(program) order and the number of cycles taken by each instruction, and returns
+the entries in the order in which they should be tried
+'''
+
+
+# Oldest first. The ready entries are tried in program order
+def oldest_first(ready, num_cycles):
+    return ready
+
+
+# Longest latency first. The entries that take the most cycles to execute are tried first, so that
+# long chains of MUL/DIV start as early as possible. Entries with the same latency are tried oldest first
+def longest_latency_first(ready, num_cycles):
+    return sorted(ready, key=lambda entry: -num_cycles[entry.get_inst().get_opcode().name])
+
+
+SELECT_POLICIES = {
+    "oldest_first": oldest_first,
+    "longest_latency_first": longest_latency_first,
+}
+
+
+# Function to get a select policy, given its name
+def get_select_policy(name):
+    if name.lower() not in SELECT_POLICIES:
+        raise ValueError(f"Unknown select policy: {name}. Available policies: {', '.join(SELECT_POLICIES)}")
+
+    return SELECT_POLICIES[name.lower()]
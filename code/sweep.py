@@ -0,0 +1,230 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains a driver to sweep the Tomasulo machine over a grid of microarchitecture parameters.
+Every point of the grid is run headless, in a pool of worker processes using all the cores, and one row
+of results(cycles, IPC and cache stats) is written per point into a CSV file, or a Parquet file if the
+output ends with .parquet(needs pandas, with pyarrow or fastparquet).
+
+The parameters that can be swept are:
+    rob_size, add_rs_size, mul_rs_size, lsq_size    - number of entries in the ROB, RS and LSQ
+    select_policy                                   - select policy of the RS and LSQ, eg: longest_latency_first
+    dispatch_width, issue_width, cdb_width,         - number of instructions handled by each stage in a cycle
+    commit_width                                      (issue_width is per functional unit class, cdb_width is the number of buses)
+    NumCycles.<instruction>                         - cycles taken to execute an instruction, eg: NumCycles.MUL
+    FU.<class>.<field>                              - a field of the functional units of a class(ALU, MUL, DIV, MEM),
+                                                      eg: FU.DIV.count, FU.MUL.pipelined, FU.DIV.initiation_interval
+    memory_latency                                  - latency of the memory
+    line_size                                       - number of words in the lines of every cache level
+    <level>.<field>                                 - a field of a cache level, eg: L1D.size, L2D.ways,
+                                                      L2D.replacement, L2D.prefetcher
+    <level>.prefetcher.<field>                      - a field of the prefetcher of a level, eg: L2D.prefetcher.degree
+
+Example:
+    python sweep.py ../build/full_test.bin ../build/lw_Sw_tester.bin -p rob_size=4,8,16 -p L1D.size=2,4,8 \\
+        -p NumCycles.MUL=5,10 -o sweep.csv
+'''
+
+import csv
+import copy
+import json
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from config import HierarchyConfig, MachineConfig, PrefetcherConfig
+from headless import run_simulation
+
+# The parameters that are set in the config of the machine as they are
+MACHINE_PARAMS = ["rob_size", "add_rs_size", "mul_rs_size", "lsq_size", "select_policy",
+                  "dispatch_width", "issue_width", "cdb_width", "commit_width"]
+
+
+# Function to get every combination of the values in the grid, in order
+# grid is a dictionary of parameter name -> list of values
+def expand_grid(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names])]
+
+
+# Function to set a field of the functional units of a class, given as FU.<class>.<field>
+def set_functional_unit_param(config, name, value):
+    parts = name.split(".")
+    if len(parts) != 3 or parts[1] not in config.functional_units or \
+            not hasattr(config.functional_units[parts[1]], parts[2]):
+        raise ValueError(f"Unknown parameter: {name}")
+
+    setattr(config.functional_units[parts[1]], parts[2], value)
+
+
+# Function to set a parameter of the cache hierarchy, given its name as described at the top of this file
+def set_hierarchy_param(hierarchy, name, value):
+    if name == "memory_latency":
+        hierarchy.memory_latency = value
+        return
+
+    if name == "line_size":
+        for level in hierarchy.levels:
+            level.line_size = value
+        return
+
+    parts = name.split(".")
+    levels = {level.name: level for level in hierarchy.levels}
+    if parts[0] not in levels or len(parts) not in [2, 3]:
+        raise ValueError(f"Unknown parameter: {name}")
+
+    level = levels[parts[0]]
+    if len(parts) == 3:
+        if parts[1] != "prefetcher" or not hasattr(PrefetcherConfig, parts[2]):
+            raise ValueError(f"Unknown parameter: {name}")
+        if level.prefetcher is None:
+            raise ValueError(f"{name}: {level.name} has no prefetcher")
+
+        setattr(level.prefetcher, parts[2], value)
+    elif parts[1] == "prefetcher":
+        level.prefetcher = None if value == "none" else PrefetcherConfig.from_dict(value)
+    elif parts[1] in ["size", "ways", "latency", "line_size", "inclusion", "replacement"]:
+        setattr(level, parts[1], value)
+    else:
+        raise ValueError(f"Unknown parameter: {name}")
+
+
+# Function to build the config of the machine at a point of the grid, starting from a copy of the base config
+# Raises a ValueError if the point doesn't describe a valid machine
+def build_config(point, base_config):
+    config = copy.deepcopy(base_config)
+
+    for name, value in point.items():
+        if name in MACHINE_PARAMS:
+            setattr(config, name, value)
+        elif name.startswith("FU."):
+            set_functional_unit_param(config, name, value)
+        elif name.startswith("NumCycles."):
+            instruction = name.split(".", 1)[1]
+            if instruction not in config.num_cycles:
+                raise ValueError(f"Unknown instruction: {instruction}, expected one of {list(config.num_cycles)}")
+            config.num_cycles[instruction] = value
+        else:
+            set_hierarchy_param(config.hierarchy, name, value)
+
+    config.validate()
+    return config
+
+
+# Function to run a single point of the sweep, in a worker process
+# Returns a flat row with the parameters of the point, followed by the results
+def run_point(job):
+    program_src, data_mem_src, point, config, max_cycles = job
+
+    results = run_simulation(program_src, data_mem_src, max_cycles, config=config)
+
+    row = {"program": program_src}
+    row.update(point)
+    row.update({
+        "cycles": results["cycles"],
+        "completed": results["completed"],
+        "instructions": results["instructions"],
+        "instructions_completed": results["instructions_completed"],
+        "IPC": round(results["instructions_completed"]/results["cycles"], 4) if results["cycles"] else 0
+    })
+    row.update(results["cache_stats"])
+    row.update(results["functional_unit_stats"])
+
+    return row
+
+
+# Function to run every program on every point of the grid
+# The points are checked before anything is run. The rows are returned in the order of the programs and
+# points, no matter which worker finished first. With workers=1 everything is run in this process
+def run_sweep(programs, data_mem_src, grid, config=None, workers=None, max_cycles=None):
+    if config is None:
+        config = MachineConfig()
+
+    points = expand_grid(grid)
+    configs = [build_config(point, config) for point in points]
+
+    jobs = [(program, data_mem_src, point, point_config, max_cycles)
+            for program in programs for point, point_config in zip(points, configs)]
+
+    if workers == 1:
+        return [run_point(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_point, jobs))
+
+
+# Function to write the rows into a CSV or Parquet file, depending on the extension
+# The columns are all the keys of the rows, in the order they first appear
+def write_results(rows, filename):
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+
+    if filename.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is needed to write Parquet files, install it with: pip install pandas pyarrow")
+
+        pd.DataFrame(rows, columns=columns).to_parquet(filename, index=False)
+        return
+
+    with open(filename, 'w', newline='') as outFile:
+        writer = csv.DictWriter(outFile, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# Function to convert a value given on the command line into a number or a boolean, if it is one
+def parse_value(value):
+    if value.lower() in ["true", "false"]:
+        return value.lower() == "true"
+
+    for convert in [int, float]:
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run programs on the Tomasulo machine over a grid of parameters, and write the results as a table")
+    parser.add_argument("programs", nargs="+", help="assembled programs(.bin/.pbin format)")
+    parser.add_argument("--data-memory", default="memory/data_memory.dat",
+                        help="data memory file(.dat/.pdat format), it is never written to")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="values of a parameter to sweep over, can be repeated")
+    parser.add_argument("--grid", default=None,
+                        help="JSON file with the grid, as a dictionary of parameter name -> list of values")
+    parser.add_argument("--config", default=None,
+                        help="machine config(.json/.toml/.yaml) that the points are based on")
+    parser.add_argument("--cache-config", default=None,
+                        help="cache hierarchy config(.json/.toml/.yaml), replacing the one in the machine config")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes, defaults to the number of cores")
+    parser.add_argument("--max-cycles", type=int, default=None,
+                        help="stop every simulation after this many cycles")
+    parser.add_argument("-o", "--output", default="sweep.csv",
+                        help="output file, .csv or .parquet")
+    args = parser.parse_args()
+
+    grid = {}
+    if args.grid:
+        with open(args.grid, 'r') as gridFile:
+            grid.update(json.load(gridFile))
+
+    for param in args.param:
+        name, values = param.split("=", 1)
+        grid[name] = [parse_value(value) for value in values.split(",")]
+
+    config = MachineConfig.from_file(args.config) if args.config else MachineConfig()
+    if args.cache_config:
+        config.hierarchy = HierarchyConfig.from_file(args.cache_config)
+
+    rows = run_sweep(args.programs, args.data_memory, grid, config, args.workers, args.max_cycles)
+    write_results(rows, args.output)
+
+    print(f"Wrote {len(rows)} results to {args.output}")
@@ -0,0 +1,34 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the shared fixtures of the tests. The modules of the machine live in code/, and are
+imported the same way main.py imports them, so code/ is put on the path here
+'''
+
+import os
+import sys
+import shutil
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_DIR = os.path.join(ROOT, "code")
+BUILD_DIR = os.path.join(ROOT, "build")
+DATA_MEMORY = os.path.join(CODE_DIR, "memory", "data_memory.dat")
+
+sys.path.insert(0, CODE_DIR)
+
+
+# Copy of the data memory, so that a test can never write into the one in the repo
+@pytest.fixture
+def data_memory(tmp_path):
+    path = tmp_path / "data_memory.dat"
+    shutil.copy(DATA_MEMORY, path)
+    return str(path)
+
+
+# Function to get the path of one of the assembled example programs
+def example_program(name):
+    return os.path.join(BUILD_DIR, f"{name}.bin")
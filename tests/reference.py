@@ -0,0 +1,77 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains an ISA level reference model of the machine, used by the tests. It runs the program
+one instruction at a time, in program order, straight on the registers and the memory. Whatever the
+pipeline, caches and widths are, the final registers and memory of the machine have to match it
+'''
+
+import random
+
+import memory_image
+from bench import encode_i, encode_r, encode_s
+from instruction import Instruction, Opcode
+from reservation_station import OPERATIONS
+
+
+# Function to run a program(a list of 32 bit words) on the reference model
+# Returns the final values of the registers and the memory, as lists
+def run_reference(words, memory, arf_init):
+    registers = list(arf_init)
+    memory = list(memory)
+
+    for word in words:
+        instruction = Instruction.from_word(word)
+        decoded = instruction.decoded
+        if decoded.is_NOP:
+            continue
+
+        if decoded.opcode == Opcode.LW:
+            value = memory[registers[decoded.rs1] + decoded.imm]
+        elif decoded.opcode == Opcode.SW:
+            memory[registers[decoded.rs1] + decoded.imm] = registers[decoded.rs2]
+            continue
+        elif decoded.opcode == Opcode.ADDI:
+            value = OPERATIONS[decoded.opcode](registers[decoded.rs1], decoded.imm)
+        elif decoded.opcode == Opcode.DIV and registers[decoded.rs2] == 0:
+            value = 0
+        elif decoded.opcode in (Opcode.ADD, Opcode.SUB, Opcode.MUL, Opcode.DIV):
+            value = OPERATIONS[decoded.opcode](registers[decoded.rs1], registers[decoded.rs2])
+        else:
+            raise ValueError(f"The reference model doesn't support {instruction.str_disassemble()}")
+
+        # x0 is hardwired to 0
+        if decoded.rd != 0:
+            registers[decoded.rd] = value
+
+    return registers, memory
+
+
+# Function to read the words of a program or data memory file, in either format
+def read_words(filename):
+    return memory_image.read_words(filename)
+
+
+# Function to generate a random program of stores and loads to a few addresses, mixed with ALU instructions
+# The addresses are picked from a small range, so that the lines keep moving between the levels of the caches
+def generate_memory_program(n_instructions, n_addresses, seed=0, registers=range(1, 10)):
+    rng = random.Random(seed)
+    registers = list(registers)
+    words = []
+
+    while len(words) < n_instructions:
+        kind = rng.choice(["store", "store", "load", "load", "alu", "addi"])
+        a, b, c = rng.sample(registers, 3)
+
+        if kind == "store":
+            words.append(encode_s("SW", a, 0, rng.randrange(n_addresses)))
+        elif kind == "load":
+            words.append(encode_i("LW", a, 0, rng.randrange(n_addresses)))
+        elif kind == "alu":
+            words.append(encode_r(rng.choice(["ADD", "SUB"]), c, a, b))
+        else:
+            words.append(encode_i("ADDI", a, b, rng.randint(-64, 64)))
+
+    return words
@@ -0,0 +1,138 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of a single set associative cache, with its lines stored in flat arrays
+'''
+
+from cache import Cache, Victim
+from cache_algos.replacement import get_policy
+
+
+# Function to create a cache with a replacement policy
+def make_cache(size=4, ways=2, line_size=1, replacement="lru"):
+    return Cache(size, "L1D", ways, True, get_policy(replacement, size, ways), line_size)
+
+
+def test_miss_and_hit():
+    cache = make_cache()
+    assert cache.get_memory_entry(3) is None
+
+    assert cache.add_entry([7], 3) is None
+    assert cache.has_entry(3)
+    assert cache.get_memory_entry(3) == 7
+
+
+def test_cached_zero_is_not_a_miss():
+    cache = make_cache()
+    cache.add_entry([0], 5)
+
+    assert cache.get_memory_entry(5) == 0
+
+
+def test_busy_line_reads_as_a_miss():
+    cache = make_cache()
+    cache.add_entry([9], 2, busy_bit=True)
+
+    assert cache.get_memory_entry(2) is None
+    assert cache.get_busy_bit(2)
+
+    cache.update_busy_bit(2, False)
+    assert cache.get_memory_entry(2) == 9
+
+
+def test_victim_is_the_least_recently_used_line():
+    cache = make_cache(size=2, ways=2)
+    cache.add_entry([1], 0)
+    cache.add_entry([2], 1, dirty_bit=True)
+    cache.get_memory_entry(0)
+
+    assert cache.add_entry([3], 2) == Victim(1, (2,), True)
+    assert not cache.has_entry(1)
+    assert cache.has_entry(0) and cache.has_entry(2)
+
+
+def test_adding_a_cached_line_evicts_nothing():
+    cache = make_cache()
+    cache.add_entry([1], 0)
+
+    assert cache.add_entry([2], 0) is None
+    assert cache.get_memory_entry(0) == 1
+
+
+def test_invalid_ways_are_filled_first():
+    cache = make_cache(size=2, ways=2, replacement="fifo")
+    cache.add_entry([1], 0)
+    cache.add_entry([2], 1)
+    cache.invalidate(0)
+
+    assert cache.add_entry([3], 2) is None
+    assert cache.has_entry(1) and cache.has_entry(2)
+
+
+def test_set_entry_and_set_line():
+    cache = make_cache(line_size=2)
+    assert not cache.set_entry(4, 1)
+
+    cache.add_entry([10, 11], 4)
+    cache.update_busy_bit(4, False)
+    cache.set_entry(5, 12)
+    assert cache.get_line(4) == (10, 12)
+
+    cache.update_busy_bit(4, False)
+    cache.set_line(4, [20, 21])
+    assert cache.get_lines() == [Victim(4, (20, 21), True)]
+
+
+def test_multi_word_lines():
+    cache = make_cache(size=4, ways=2, line_size=4)
+    cache.add_entry([10, 11, 12, 13], 6)
+
+    assert cache.get_line_address(6) == 4
+    assert all(cache.has_entry(addr) for addr in range(4, 8))
+    assert not cache.has_entry(8)
+    assert [cache.get_memory_entry(addr) for addr in range(4, 8)] == [10, 11, 12, 13]
+
+
+def test_invalidate_returns_the_line():
+    cache = make_cache()
+    cache.add_entry([5], 1, dirty_bit=True)
+
+    assert cache.invalidate(1) == Victim(1, (5,), True)
+    assert cache.invalidate(1) is None
+    assert not cache.has_entry(1)
+
+
+def test_get_cache_rows():
+    cache = make_cache(size=4, ways=2)
+    cache.add_entry([5], 1)
+
+    rows = cache.get_cache()
+    assert len(rows) == 2 and all(len(row) == 2 for row in rows)
+    assert (0, (5,), True, False, False) in rows[1]
+
+
+def test_state_round_trip():
+    cache = make_cache(size=4, ways=2, line_size=2, replacement="plru")
+    for addr in [0, 4, 8, 2]:
+        cache.add_entry([addr, addr + 1], addr)
+    state = cache.save_state()
+
+    restored = make_cache(size=4, ways=2, line_size=2, replacement="plru")
+    restored.restore_state(state)
+
+    assert restored.save_state() == state
+    assert sorted(restored.get_lines()) == sorted(cache.get_lines())
+    assert restored.add_entry([1, 1], 12) == cache.add_entry([1, 1], 12)
+
+
+# A line filled into an invalidated way is the newest one in the set, so it is evicted last
+def test_fifo_order_after_invalidate():
+    cache = make_cache(size=4, ways=4, replacement="fifo")
+    for addr in range(4):
+        cache.add_entry([addr], addr)
+    cache.invalidate(2)
+    cache.add_entry([4], 4)
+
+    assert [cache.add_entry([addr], addr).addr for addr in range(5, 8)] == [0, 1, 3]
@@ -0,0 +1,111 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the config of the machine and its cache hierarchy
+'''
+
+import sys
+import json
+
+import pytest
+
+import constants
+from config import HierarchyConfig, MachineConfig, default_hierarchy
+
+
+def test_defaults_come_from_the_constants():
+    config = MachineConfig()
+
+    assert config.rob_size == constants.ROB_SIZE
+    assert config.num_cycles == constants.NumCycles
+    assert [level.name for level in config.hierarchy.levels] == ["L1D", "L2D"]
+
+
+def test_missing_fields_are_taken_from_the_constants():
+    config = MachineConfig.from_dict({"rob_size": 4, "num_cycles": {"MUL": 7},
+                                      "functional_units": {"DIV": {"count": 2}}})
+
+    assert config.rob_size == 4
+    assert config.num_cycles["MUL"] == 7 and config.num_cycles["ADD"] == constants.NumCycles["ADD"]
+    assert config.functional_units["DIV"].count == 2
+    assert config.functional_units["DIV"].pipelined == constants.FUNCTIONAL_UNITS["DIV"]["pipelined"]
+
+
+def test_functional_unit_latency_replaces_num_cycles():
+    config = MachineConfig.from_dict({"functional_units": {"MUL": {"latency": 3}}})
+
+    assert config.get_latency("MUL") == 3
+    assert config.get_latency("ADD") == constants.NumCycles["ADD"]
+
+
+@pytest.mark.parametrize("params", [
+    {"rob_size": 0},
+    {"issue_width": 0},
+    {"arf_init": []},
+    {"select_policy": "youngest_first"},
+    {"num_cycles": {"XOR": 1}},
+    {"num_cycles": {"ADD": 0}},
+    {"functional_units": {"FPU": {"count": 1}}},
+    {"functional_units": {"ALU": {"count": 0}}},
+    {"functional_units": {"DIV": {"initiation_interval": 0}}},
+    {"flush_interval": -1},
+])
+def test_invalid_machine(params):
+    with pytest.raises(ValueError):
+        MachineConfig.from_dict(params)
+
+
+@pytest.mark.parametrize("levels", [
+    [],
+    [{"name": "L1D", "size": 3, "ways": 2, "latency": 1}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1, "line_size": 0}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1, "replacement": "mru"}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1, "inclusion": "exclusive"}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1, "prefetcher": "markov"}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1, "prefetcher": {"name": "next_line", "degree": 0}}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1}, {"name": "L1D", "size": 4, "ways": 2, "latency": 5}],
+    [{"name": "L1D", "size": 2, "ways": 2, "latency": 1},
+     {"name": "L2D", "size": 4, "ways": 2, "latency": 5, "line_size": 2}],
+])
+def test_invalid_hierarchy(levels):
+    with pytest.raises(ValueError):
+        HierarchyConfig.from_dict({"levels": levels})
+
+
+def test_prefetcher_given_by_name():
+    hierarchy = HierarchyConfig.from_dict({"levels": [
+        {"name": "L1D", "size": 2, "ways": 2, "latency": 1, "prefetcher": "stride"}]})
+
+    assert hierarchy.levels[0].prefetcher.name == "stride"
+    assert hierarchy.levels[0].prefetcher.degree == constants.PREFETCH_DEGREE
+
+
+def test_hierarchy_round_trip():
+    hierarchy = default_hierarchy()
+
+    assert HierarchyConfig.from_dict(hierarchy.to_dict()) == hierarchy
+
+
+def test_machine_round_trip_through_a_file(tmp_path):
+    config = MachineConfig.from_dict({"rob_size": 12, "select_policy": "longest_latency_first",
+                                      "functional_units": {"DIV": {"count": 2, "pipelined": False}}})
+    filename = tmp_path / "machine.json"
+    filename.write_text(json.dumps(config.to_dict()))
+
+    assert MachineConfig.from_file(str(filename)) == config
+
+
+def test_toml_config(tmp_path):
+    pytest.importorskip("tomllib" if sys.version_info >= (3, 11) else "tomli")
+    filename = tmp_path / "machine.toml"
+    filename.write_text('rob_size = 6\n[num_cycles]\nMUL = 4\n')
+
+    config = MachineConfig.from_file(str(filename))
+    assert config.rob_size == 6 and config.num_cycles["MUL"] == 4
+
+
+def test_unknown_config_format(tmp_path):
+    with pytest.raises(ValueError):
+        MachineConfig.from_file(str(tmp_path / "machine.ini"))
@@ -0,0 +1,81 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the functional units, and of how they decide which entries start executing
+'''
+
+import memory_image
+from bench import encode_r
+from config import MachineConfig
+from functional_units import FunctionalUnitPool
+from headless import run_simulation
+
+
+# Function to run a program and get the cycle in which each of its instructions started executing
+def get_ex_start(words, data_memory, tmp_path, **params):
+    program = str(tmp_path / "program.pbin")
+    memory_image.write_packed(program, words)
+
+    results = run_simulation(program, data_memory, config=MachineConfig.from_dict(params))
+    assert results["completed"]
+
+    return [int(row["ex_start"]) for row in results["instruction_table"]]
+
+
+def test_pipelined_pool_starts_one_instruction_per_unit_every_interval():
+    pool = FunctionalUnitPool("MUL", count=2, initiation_interval=2)
+
+    assert pool.start(1, 5) and pool.start(1, 5)
+    assert not pool.is_free(2)
+    assert pool.is_free(3)
+
+
+def test_unpipelined_pool_is_busy_until_the_instruction_completes():
+    pool = FunctionalUnitPool("DIV", pipelined=False)
+
+    pool.start(1, 8)
+    assert not pool.is_free(8)
+    assert pool.is_free(9)
+
+
+def test_issue_width_limits_each_class():
+    pool = FunctionalUnitPool("ALU", count=4, issue_width=2)
+
+    pool.start(1, 1)
+    pool.start(1, 1)
+    assert not pool.is_free(1)
+    assert pool.is_free(2)
+
+
+def test_pool_state_round_trips():
+    pool = FunctionalUnitPool("ALU", count=2, issue_width=1)
+    pool.start(3, 1)
+    state = pool.save_state()
+
+    restored = FunctionalUnitPool("ALU", count=2, issue_width=1)
+    restored.restore_state(state)
+    assert restored.save_state() == state
+    assert not restored.is_free(3)
+
+
+# A MUL and a DIV sit in the same RS, but run on different units. The issue width used to be counted per RS,
+# so the DIV had to wait a cycle behind the MUL
+def test_mul_and_div_start_in_the_same_cycle(data_memory, tmp_path):
+    words = [encode_r("MUL", 1, 2, 3), encode_r("DIV", 4, 5, 6)]
+
+    mul_start, div_start = get_ex_start(words, data_memory, tmp_path, dispatch_width=2)
+    assert mul_start == div_start
+
+
+# The ALU pool can only start issue_width instructions in a cycle, however many units it has
+def test_issue_width_is_per_class(data_memory, tmp_path):
+    words = [encode_r("ADD", 1, 2, 3), encode_r("SUB", 4, 5, 6), encode_r("ADD", 7, 8, 9)]
+
+    starts = get_ex_start(words, data_memory, tmp_path, dispatch_width=3, functional_units={"ALU": {"count": 3}})
+    assert len(set(starts)) == 3
+
+    starts = get_ex_start(words, data_memory, tmp_path, dispatch_width=3, issue_width=3,
+                          functional_units={"ALU": {"count": 3}})
+    assert len(set(starts)) == 1
@@ -0,0 +1,140 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the history buffer. The machine is copied at the end of every cycle, and the
+history of each cycle has to rebuild exactly the same state, whatever was recorded as a keyframe or a delta
+'''
+
+import copy
+
+import pytest
+
+import memory_image
+from config import MachineConfig
+from constants import HistoryMode
+from history import HistoryBuffer, DELETED
+from main import Tomasulo
+from conftest import example_program
+from reference import generate_memory_program
+
+
+# Function to get the state of every component that the history buffer records
+def get_states(components):
+    states = {name: components[name].save_state()
+              for name in ["instruction_table", "ROB", "ARF", "LSQ", "memory_controller", "functional_units"]}
+    for name, RS in components["RS"].items():
+        states[name] = RS.save_state()
+
+    return states
+
+
+# Function to get the components of a running machine, copied so that the later cycles don't change them
+def copy_components(machine):
+    return get_states({
+        "instruction_table": copy.deepcopy(machine.get_instruction_table()),
+        "ROB": copy.deepcopy(machine.get_rob()),
+        "ARF": copy.deepcopy(machine.get_arf()),
+        "LSQ": copy.deepcopy(machine.get_lsq()),
+        "memory_controller": copy.deepcopy(machine.get_mem_ctl()),
+        "functional_units": copy.deepcopy(machine.get_functional_units()),
+        "RS": copy.deepcopy(machine.get_all_rs()),
+    })
+
+
+# Function to run a program cycle by cycle, and check that the history of every cycle matches a copy of it
+def check_history(program, data_memory, config=None, mode=HistoryMode.FULL):
+    machine = Tomasulo(program, data_memory, mode, save_memory=False, config=config)
+
+    snapshots = []
+    while not machine.is_complete():
+        machine.logic_loop()
+        snapshots.append(copy_components(machine))
+
+    for index, snapshot in enumerate(snapshots):
+        if machine.has_history(index):
+            assert get_states(machine.get_history(index)) == snapshot, f"cycle {index}"
+        else:
+            assert mode == HistoryMode.KEYFRAMES
+
+    assert not machine.has_history(len(snapshots))
+
+
+# Function to get a small two level hierarchy using a replacement policy and prefetcher
+def small_hierarchy(replacement, prefetcher):
+    l1 = {"name": "L1D", "size": 4, "ways": 2, "line_size": 2, "latency": 1, "replacement": replacement}
+    l2 = {"name": "L2D", "size": 8, "ways": 4, "line_size": 2, "latency": 5, "replacement": replacement}
+    if prefetcher is not None:
+        l2["prefetcher"] = {"name": prefetcher, "degree": 2}
+
+    return {"memory_latency": 12, "levels": [l1, l2]}
+
+
+@pytest.mark.parametrize("name", ["demo", "loop_tester", "lw_Sw_tester", "sw_sw_tester"])
+@pytest.mark.parametrize("mode", [HistoryMode.FULL, HistoryMode.KEYFRAMES])
+def test_example_program_history(name, mode, data_memory):
+    check_history(example_program(name), data_memory, mode=mode)
+
+
+@pytest.mark.parametrize("replacement", ["lru", "plru", "fifo", "random", "srrip", "brrip"])
+@pytest.mark.parametrize("prefetcher", [None, "next_line", "stride", "stream"])
+def test_cache_history(replacement, prefetcher, data_memory, tmp_path):
+    program = str(tmp_path / "program.pbin")
+    memory_image.write_packed(program, generate_memory_program(60, 32, 3))
+
+    config = MachineConfig.from_dict({"hierarchy": small_hierarchy(replacement, prefetcher)})
+    check_history(program, data_memory, config)
+
+
+# Only the rows of the caches that were accessed are recorded in a cycle, not the whole cache
+def test_cache_changes_only_give_the_accessed_rows(data_memory):
+    config = MachineConfig.from_dict({"hierarchy": small_hierarchy("lru", None)})
+    machine = Tomasulo(example_program("lw_lw_tester"), data_memory, HistoryMode.FULL, save_memory=False,
+                       config=config)
+    cache = machine.get_mem_ctl()._levels[1]
+    cache.save_changes()
+
+    cache.add_entry((1, 2), 4)
+    assert set(cache.save_changes()) == {("row", 0), ("replacement", 0)}
+    assert cache.save_changes() == {}
+
+
+def test_deleted_keys_are_recorded():
+    class Component:
+        def __init__(self):
+            self.state = {"a": 1, "b": 2}
+
+        def save_state(self):
+            return dict(self.state)
+
+        def restore_state(self, state):
+            for key, value in state.items():
+                if value is DELETED:
+                    self.state.pop(key, None)
+                else:
+                    self.state[key] = value
+
+    component = Component()
+    history = HistoryBuffer(HistoryMode.FULL, keyframe_interval=10)
+    history.record({"component": component}, True)
+
+    del component.state["b"]
+    history.record({"component": component}, True)
+
+    components, changes, _ = history.get(1)
+    components["component"].restore_state(changes["component"])
+    assert components["component"].state == {"a": 1}
+
+
+# The changes are only tracked for the deltas, so a machine that doesn't record every cycle never keeps them
+@pytest.mark.parametrize("mode", [HistoryMode.OFF, HistoryMode.KEYFRAMES])
+def test_changes_are_not_tracked_without_deltas(mode, data_memory):
+    machine = Tomasulo(example_program("lw_Sw_tester"), data_memory, mode, save_memory=False)
+    while not machine.is_complete():
+        machine.logic_loop()
+
+    mem_ctl = machine.get_mem_ctl()
+    assert not machine.get_instruction_table()._changed
+    assert not mem_ctl._changed_addresses
+    assert not any(cache._changed_rows for cache in mem_ctl._levels)
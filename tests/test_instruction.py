@@ -0,0 +1,98 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of decoding the instructions, from their binary strings and integer words
+'''
+
+import copy
+import glob
+import os
+
+import pytest
+
+from bench import encode_i, encode_r, encode_s
+from conftest import BUILD_DIR
+from helpers import bin2dec, dec2bin, get_bits, sign_extend, to_unsigned
+from instruction import Instruction, Opcode
+
+
+@pytest.mark.parametrize("value", [0, 1, 5, -1, -2048, 2047, -123456])
+def test_twos_complement_helpers(value):
+    assert bin2dec(dec2bin(value, 32)) == value
+    assert sign_extend(to_unsigned(value, 32), 32) == value
+
+
+def test_get_bits():
+    assert get_bits(0b1011_0110, 7, 4) == 0b1011
+    assert get_bits(0b1011_0110, 3, 0) == 0b0110
+
+
+@pytest.mark.parametrize("name", ["ADD", "SUB", "MUL", "DIV"])
+def test_decode_r_type(name):
+    decoded = Instruction.from_word(encode_r(name, 3, 4, 5)).decoded
+
+    assert (decoded.opcode, decoded.rd, decoded.rs1, decoded.rs2, decoded.imm) == (Opcode[name], 3, 4, 5, None)
+
+
+@pytest.mark.parametrize("imm", [0, 7, -1, -2048, 2047])
+def test_decode_immediates(imm):
+    addi = Instruction.from_word(encode_i("ADDI", 1, 2, imm)).decoded
+    assert (addi.opcode, addi.rd, addi.rs1, addi.imm) == (Opcode.ADDI, 1, 2, imm)
+
+    lw = Instruction.from_word(encode_i("LW", 1, 2, imm)).decoded
+    assert (lw.opcode, lw.rd, lw.rs1, lw.imm) == (Opcode.LW, 1, 2, imm)
+
+    sw = Instruction.from_word(encode_s("SW", 3, 2, imm)).decoded
+    assert (sw.opcode, sw.rs2, sw.rs1, sw.imm) == (Opcode.SW, 3, 2, imm)
+
+
+def test_nop():
+    assert Instruction.from_word(encode_i("ADDI", 0, 0, 0)).is_NOP()
+    assert not Instruction.from_word(encode_i("ADDI", 0, 0, 1)).is_NOP()
+
+
+def test_invalid_memory_encoding():
+    assert Instruction.from_word((2 << 12) | 0b0110011) is None
+
+
+# The text and integer decoders have to agree on every instruction of the example programs
+@pytest.mark.parametrize("program", sorted(glob.glob(os.path.join(BUILD_DIR, "*.bin"))))
+def test_segment_matches_from_word(program):
+    with open(program) as binary:
+        lines = [line.strip() for line in binary if line.strip()]
+
+    for PC, line in enumerate(lines, 1):
+        segmented = Instruction.segment(line, PC)
+        from_word = Instruction.from_word(int(line.replace(" ", ""), 2), PC)
+
+        assert segmented.PC == from_word.PC == PC
+        assert repr(segmented.decoded) == repr(from_word.decoded)
+        assert segmented.str_disassemble() == from_word.str_disassemble()
+
+
+def test_segment_rejects_wrong_length():
+    assert Instruction.segment("0101") == -1
+
+
+def test_decoded_instruction_is_immutable():
+    decoded = Instruction.from_word(encode_r("ADD", 1, 2, 3)).decoded
+
+    with pytest.raises(AttributeError):
+        decoded.rd = 4
+
+
+def test_decoded_once_and_shared_by_copies():
+    instruction = Instruction.from_word(encode_r("MUL", 1, 2, 3), PC=4)
+
+    assert instruction.disassemble() is instruction.disassemble()
+    assert copy.deepcopy(instruction) is instruction
+    assert instruction.str_disassemble() == "MUL x1, x2, x3"
+
+
+def test_instructions_are_ordered_by_pc():
+    first = Instruction.from_word(encode_r("ADD", 1, 2, 3), PC=1)
+    second = Instruction.from_word(encode_r("ADD", 1, 2, 3), PC=2)
+
+    assert first < second and first != second
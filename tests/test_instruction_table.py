@@ -0,0 +1,97 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the instruction table, and the buckets its entries are kept in by state
+'''
+
+from bench import encode_r
+from constants import RunState
+from instruction import Instruction
+from instruction_table import InstructionTable
+
+
+# Function to get a table of n ADD instructions
+def make_table(n, track_changes=True):
+    table = InstructionTable(n, track_changes=track_changes)
+    for PC in range(1, n + 1):
+        table.add_entry(Instruction.from_word(encode_r("ADD", 1, 2, 3), PC))
+
+    return table
+
+
+# Function to get the PCs of the entries in any of the given states
+def get_PCs(table, *states):
+    return [entry.get_inst().PC for entry in table.get_entries_by_state(*states)]
+
+
+def test_not_started_entries_in_program_order():
+    table = make_table(5)
+    table.get_entries()[1].rs_issue(1)
+    table.get_entries()[0].rs_issue(1)
+
+    assert get_PCs(table, RunState.NOT_STARTED) == [3, 4, 5]
+    assert get_PCs(table, RunState.RS) == [1, 2]
+
+
+def test_out_of_order_dispatch_leaves_a_gap():
+    table = make_table(4)
+    table.get_entries()[2].rs_issue(1)
+
+    assert get_PCs(table, RunState.NOT_STARTED) == [1, 2, 4]
+
+
+def test_entries_move_between_buckets():
+    table = make_table(3)
+    first, second, third = table.get_entries()
+    for entry in [third, first, second]:
+        entry.rs_issue(1)
+    third.ex_start(2)
+    first.ex_start(3)
+
+    assert get_PCs(table, RunState.RS) == [2]
+    assert get_PCs(table, RunState.EX_START) == [1, 3]
+    assert get_PCs(table, RunState.RS, RunState.EX_START) == [1, 2, 3]
+
+    second.ex_start(4)
+    for entry in [first, second, third]:
+        entry.cdb_write(5)
+        entry.commit(6)
+    assert all(get_PCs(table, state) == [] for state in InstructionTable.BUCKETED_STATES)
+
+
+def test_get_entry_by_instruction():
+    table = make_table(3)
+
+    assert table.get_entry(Instruction.from_word(encode_r("SUB", 4, 5, 6), 2)) is table.get_entries()[1]
+
+
+def test_only_the_changed_entries_are_saved():
+    table = make_table(4)
+    table.save_changes()
+    table.get_entries()[2].rs_issue(1)
+
+    assert list(table.save_changes()) == [2]
+    assert table.save_changes() == {}
+
+
+def test_changes_are_not_tracked_when_turned_off():
+    table = make_table(4, track_changes=False)
+    table.get_entries()[2].rs_issue(1)
+
+    assert table.save_changes() == {}
+
+
+def test_restoring_rebuilds_the_buckets():
+    table = make_table(4)
+    table.get_entries()[1].rs_issue(1)
+    state = table.save_state()
+    table.get_entries()[0].rs_issue(2)
+    table.get_entries()[1].ex_start(2)
+
+    table.restore_state(state)
+
+    assert get_PCs(table, RunState.NOT_STARTED) == [1, 3, 4]
+    assert get_PCs(table, RunState.RS) == [2]
+    assert get_PCs(table, RunState.EX_START) == []
@@ -0,0 +1,146 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the whole machine, run headless. Synthetic programs are run on machines of
+many widths, select policies and functional units, and their final registers and memory have to match the
+reference model. The ways of running the machine(event driven, every cycle, with or without the history)
+have to give the same timing
+'''
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+import memory_image
+from bench import generate_program
+from config import MachineConfig
+from constants import HistoryMode
+from conftest import CODE_DIR, example_program
+from headless import get_results, run_simulation
+from main import Tomasulo
+from reference import run_reference, read_words
+
+MACHINES = {
+    "default": {},
+    "narrow": {"rob_size": 3, "add_rs_size": 1, "mul_rs_size": 1, "lsq_size": 1},
+    "wide": {"rob_size": 32, "add_rs_size": 8, "mul_rs_size": 8, "lsq_size": 8,
+             "dispatch_width": 4, "issue_width": 4, "cdb_width": 4, "commit_width": 4},
+    "unbalanced": {"dispatch_width": 3, "issue_width": 1, "cdb_width": 2, "commit_width": 1},
+    "longest_latency_first": {"select_policy": "longest_latency_first", "dispatch_width": 2, "issue_width": 2},
+    "functional_units": {"functional_units": {"ALU": {"count": 2}, "MUL": {"count": 2, "latency": 3},
+                                              "DIV": {"count": 2, "pipelined": False},
+                                              "MEM": {"initiation_interval": 2}}},
+    "one_level": {"hierarchy": {"memory_latency": 7,
+                                "levels": [{"name": "L1D", "size": 2, "ways": 1, "latency": 1}]}},
+}
+
+
+# Function to write a synthetic program into a packed image
+def write_program(tmp_path, data_memory, n_instructions, seed):
+    program = str(tmp_path / f"synthetic_{seed}.pbin")
+    words = generate_program(n_instructions, len(read_words(data_memory)), seed)
+    memory_image.write_packed(program, words)
+
+    return program, words
+
+
+# Function to run a program on the machine one cycle at a time, the way the GUI does
+def run_every_cycle(program, data_memory, config, record_history=HistoryMode.OFF):
+    machine = Tomasulo(program, data_memory, record_history, event_driven=False, save_memory=False, config=config)
+    while not machine.is_complete() and machine.get_cpu_clock() < machine.get_cycle_limit():
+        machine.logic_loop()
+
+    return get_results(machine)
+
+
+@pytest.mark.parametrize("machine", sorted(MACHINES))
+@pytest.mark.parametrize("seed", range(3))
+def test_synthetic_program_matches_reference(machine, seed, data_memory, tmp_path):
+    config = MachineConfig.from_dict(MACHINES[machine])
+    program, words = write_program(tmp_path, data_memory, 150, seed)
+
+    results = run_simulation(program, data_memory, config=config)
+    registers, memory = run_reference(words, read_words(data_memory), config.arf_init)
+
+    assert results["completed"]
+    assert results["instructions_completed"] == len(words)
+    assert list(results["ARF"].values()) == registers
+    assert results["memory"] == memory
+
+
+@pytest.mark.parametrize("machine", sorted(MACHINES))
+def test_event_driven_run_has_the_same_timing(machine, data_memory, tmp_path):
+    config = MachineConfig.from_dict(MACHINES[machine])
+    program, _ = write_program(tmp_path, data_memory, 120, seed=7)
+
+    event_driven = run_simulation(program, data_memory, config=config)
+    every_cycle = run_every_cycle(program, data_memory, config)
+
+    for key in ["cycles", "ARF", "memory", "cache_stats", "functional_unit_stats", "instruction_table"]:
+        assert event_driven[key] == every_cycle[key]
+
+
+@pytest.mark.parametrize("mode", [HistoryMode.FULL, HistoryMode.KEYFRAMES])
+def test_recording_the_history_has_the_same_timing(mode, data_memory):
+    program = example_program("full_test")
+
+    without = run_simulation(program, data_memory)
+    recorded = run_simulation(program, data_memory, record_history=mode)
+
+    for key in ["cycles", "ARF", "memory", "cache_stats", "instruction_table"]:
+        assert without[key] == recorded[key]
+
+
+def test_max_cycles_stops_the_run(data_memory):
+    results = run_simulation(example_program("full_test"), data_memory, max_cycles=5)
+
+    assert results["cycles"] == 5 and not results["completed"]
+
+
+def test_data_memory_is_only_written_when_asked(data_memory):
+    with open(data_memory) as memoryFile:
+        before = memoryFile.read()
+
+    results = run_simulation(example_program("sw_test"), data_memory)
+    with open(data_memory) as memoryFile:
+        assert memoryFile.read() == before
+
+    run_simulation(example_program("sw_test"), data_memory, save_memory=True)
+    assert list(memory_image.read_text(data_memory)) == [word & 0xFFFFFFFF for word in results["memory"]]
+
+
+def test_flush_interval_writes_the_memory_during_the_run(data_memory):
+    config = MachineConfig.from_dict({"flush_interval": 1, "hierarchy": {
+        "memory_latency": 5, "levels": [{"name": "L1D", "size": 1, "ways": 1, "latency": 1}]}})
+    with open(data_memory) as memoryFile:
+        before = memoryFile.read()
+
+    machine = Tomasulo(example_program("sw_sw_tester"), data_memory, HistoryMode.OFF, save_memory=True,
+                       config=config)
+    while not machine.get_mem_ctl().get_stats()["memory_writes"]:
+        machine.logic_loop()
+
+    with open(data_memory) as memoryFile:
+        assert memoryFile.read() != before
+
+
+# The headless runner must work without tkinter, so the GUI is never imported
+def test_headless_never_imports_the_gui(data_memory):
+    script = ("import sys, headless; headless.run_simulation(sys.argv[1], sys.argv[2]); "
+              "assert 'gui' not in sys.modules and 'tkinter' not in sys.modules")
+
+    subprocess.run([sys.executable, "-c", script, example_program("demo"), data_memory], cwd=CODE_DIR, check=True)
+
+
+def test_command_line(data_memory, tmp_path):
+    output = tmp_path / "results.json"
+    subprocess.run([sys.executable, os.path.join(CODE_DIR, "headless.py"), example_program("demo"), data_memory,
+                    "-o", str(output)], cwd=CODE_DIR, check=True)
+
+    results = json.loads(output.read_text())
+    assert results == json.loads(json.dumps(run_simulation(example_program("demo"), data_memory)))
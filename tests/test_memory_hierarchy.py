@@ -0,0 +1,107 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the cache hierarchy. Random programs of stores and loads to a few addresses
+are run on many hierarchies and machines, and the final registers and memory have to match the reference model
+'''
+
+import itertools
+
+import pytest
+
+import memory_image
+from config import MachineConfig
+from headless import run_simulation
+from memory_controller import MemoryController
+from conftest import example_program
+from reference import run_reference, read_words, generate_memory_program
+
+MACHINES = {
+    "default": {},
+    "tiny": {"rob_size": 2, "add_rs_size": 1, "mul_rs_size": 1, "lsq_size": 1},
+    "wide": {"rob_size": 16, "dispatch_width": 4, "issue_width": 4, "cdb_width": 4, "commit_width": 4,
+             "lsq_size": 8},
+}
+
+
+# Function to get a small two level hierarchy, so that the lines keep getting evicted
+def two_levels(replacement="lru", prefetcher=None, line_size=1, inclusion="nine"):
+    l1 = {"name": "L1D", "size": 4, "ways": 2, "line_size": line_size, "latency": 1, "replacement": replacement}
+    l2 = {"name": "L2D", "size": 8, "ways": 2, "line_size": line_size, "latency": 5, "replacement": replacement,
+          "inclusion": inclusion}
+    if prefetcher is not None:
+        l2["prefetcher"] = {"name": prefetcher, "degree": 1, "distance": 1}
+
+    return {"memory_latency": 20, "levels": [l1, l2]}
+
+
+# Function to run a program on the machine, and check its final registers and memory against the reference model
+def check_against_reference(words, data_memory, tmp_path, config):
+    program = str(tmp_path / "program.pbin")
+    memory_image.write_packed(program, words)
+
+    results = run_simulation(program, data_memory, config=config)
+    registers, memory = run_reference(words, read_words(data_memory), config.arf_init)
+
+    assert results["completed"]
+    assert list(results["ARF"].values()) == registers
+    assert results["memory"] == memory
+
+
+@pytest.mark.parametrize("machine", sorted(MACHINES))
+@pytest.mark.parametrize("replacement, prefetcher, line_size, inclusion",
+                         list(itertools.product(["lru", "fifo", "random"], [None, "next_line"], [1, 2, 4],
+                                                ["nine", "inclusive", "exclusive"])))
+def test_random_program_matches_reference(machine, replacement, prefetcher, line_size, inclusion,
+                                          data_memory, tmp_path):
+    config = MachineConfig.from_dict(dict(MACHINES[machine],
+                                          hierarchy=two_levels(replacement, prefetcher, line_size, inclusion)))
+
+    for seed in range(2):
+        check_against_reference(generate_memory_program(80, 24, seed), data_memory, tmp_path, config)
+
+
+@pytest.mark.parametrize("inclusion", ["nine", "inclusive", "exclusive"])
+def test_three_levels_match_reference(inclusion, data_memory, tmp_path):
+    hierarchy = two_levels(line_size=2, inclusion=inclusion)
+    hierarchy["levels"].append({"name": "L3D", "size": 16, "ways": 4, "line_size": 2, "latency": 10,
+                                "inclusion": inclusion, "prefetcher": {"name": "next_line"}})
+    config = MachineConfig.from_dict({"hierarchy": hierarchy})
+
+    check_against_reference(generate_memory_program(120, 40, 7), data_memory, tmp_path, config)
+
+
+@pytest.mark.parametrize("name", ["demo", "full_test", "imm_test", "loop_tester", "lw_Sw_tester", "lw_lw_tester",
+                                  "riscv_program", "sw_sw_tester", "sw_test"])
+def test_example_program_matches_reference(name, data_memory, tmp_path):
+    check_against_reference(list(read_words(example_program(name))), data_memory, tmp_path, MachineConfig())
+
+
+# A dirty line evicted from the first level used to be left busy in the second one. The loads after it
+# missed there, and read the stale word from the memory instead
+def test_dirty_victim_is_not_busy_below(data_memory):
+    config = MachineConfig.from_dict({"hierarchy": {
+        "memory_latency": 10,
+        "levels": [{"name": "L1D", "size": 1, "ways": 1, "latency": 1},
+                   {"name": "L2D", "size": 4, "ways": 4, "latency": 5}]}})
+    controller = MemoryController(data_memory, config, save_to_file=False)
+
+    controller.mem_write(3, 42)
+    controller.update_busy_bit(3, False)
+    controller.mem_write(5, 7)
+    controller.update_busy_bit(5, False)
+
+    assert controller.get_memory_entry(3) == [42, 6]
+
+
+# A load has to wait for a line that is busy in a level, instead of reading an older copy from below it
+def test_busy_line_stalls_load(data_memory):
+    controller = MemoryController(data_memory, MachineConfig(), save_to_file=False)
+
+    controller.mem_write(3, 42)
+    assert controller.get_memory_entry(3) is False
+
+    controller.update_busy_bit(3, False)
+    assert controller.get_memory_entry(3)[0] == 42
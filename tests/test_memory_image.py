@@ -0,0 +1,87 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the packed and text images of programs and data memory
+'''
+
+from array import array
+
+import pytest
+
+import memory_image
+from helpers import sign_extend
+from conftest import example_program
+from headless import run_simulation
+
+WORDS = [0, 1, -1, 2 ** 31 - 1, -2 ** 31, 12345, -54321]
+
+
+def test_packed_round_trip(tmp_path):
+    image = str(tmp_path / "memory.pdat")
+    memory_image.write_packed(image, WORDS)
+
+    assert memory_image.is_packed(image)
+    assert [sign_extend(word) for word in memory_image.read_packed(image)] == WORDS
+
+
+def test_packed_words_are_little_endian(tmp_path):
+    image = tmp_path / "memory.pdat"
+    memory_image.write_packed(str(image), [1, -2])
+
+    assert image.read_bytes() == b"\x01\x00\x00\x00\xfe\xff\xff\xff"
+
+
+def test_text_round_trip(tmp_path):
+    image = str(tmp_path / "memory.dat")
+    memory_image.write_text(image, WORDS)
+
+    assert not memory_image.is_packed(image)
+    assert [sign_extend(word) for word in memory_image.read_text(image)] == WORDS
+
+
+def test_truncated_packed_image(tmp_path):
+    image = tmp_path / "memory.pdat"
+    image.write_bytes(b"\x00" * 6)
+
+    with pytest.raises(ValueError):
+        memory_image.read_packed(str(image))
+
+
+@pytest.mark.parametrize("name", ["demo", "lw_Sw_tester"])
+def test_convert_both_ways(name, tmp_path):
+    packed = str(tmp_path / f"{name}.pbin")
+    text = str(tmp_path / f"{name}.bin")
+
+    n_words = memory_image.convert(example_program(name), packed)
+    assert memory_image.convert(packed, text) == n_words
+    assert list(memory_image.read_words(text)) == list(memory_image.read_words(example_program(name)))
+
+
+# A packed program and data memory run exactly like their text versions
+def test_packed_images_run_the_same(data_memory, tmp_path):
+    program = str(tmp_path / "lw_Sw_tester.pbin")
+    packed_memory = str(tmp_path / "data_memory.pdat")
+    memory_image.convert(example_program("lw_Sw_tester"), program)
+    memory_image.convert(data_memory, packed_memory)
+
+    text = run_simulation(example_program("lw_Sw_tester"), data_memory)
+    packed = run_simulation(program, packed_memory)
+
+    for key in ["cycles", "ARF", "memory", "instruction_table"]:
+        assert text[key] == packed[key]
+
+
+def test_packed_memory_is_saved_packed(data_memory, tmp_path):
+    packed_memory = str(tmp_path / "data_memory.pdat")
+    memory_image.convert(data_memory, packed_memory)
+
+    results = run_simulation(example_program("sw_test"), packed_memory, save_memory=True)
+
+    saved = [sign_extend(word) for word in memory_image.read_packed(packed_memory)]
+    assert saved == results["memory"]
+
+
+def test_word_typecode_holds_a_word():
+    assert array(memory_image.WORD_TYPECODE).itemsize == memory_image.WORD_BYTES == 4
@@ -0,0 +1,71 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the regression tests of the pipeline. Each program used to either never complete, or end
+with the wrong registers, and has to run to completion with the same result as the reference model
+'''
+
+import memory_image
+from bench import encode_i, encode_r
+from config import MachineConfig
+from headless import run_simulation
+from reference import run_reference, read_words
+
+
+# Function to run a program on the machine, and check it against the reference model
+# Returns the results of the run
+def run_checked(words, data_memory, tmp_path, config=None):
+    if config is None:
+        config = MachineConfig()
+
+    program = str(tmp_path / "program.pbin")
+    memory_image.write_packed(program, words)
+
+    results = run_simulation(program, data_memory, config=config)
+    registers, memory = run_reference(words, read_words(data_memory), config.arf_init)
+
+    assert results["completed"]
+    assert list(results["ARF"].values()) == registers
+    assert results["memory"] == memory
+    return results
+
+
+# The ADD x7 is dispatched after ADD x4 was written on the CDB, but before it commits behind the DIV. Its source
+# used to wait for a broadcast that had already happened, and the machine deadlocked
+def test_source_written_on_cdb_before_dispatch(data_memory, tmp_path):
+    words = [encode_r("DIV", 1, 3, 2),
+             encode_r("ADD", 4, 5, 6),
+             encode_r("ADD", 8, 2, 3),
+             encode_r("ADD", 9, 2, 3),
+             encode_r("ADD", 7, 4, 4)]
+
+    run_checked(words, data_memory, tmp_path)
+
+
+# A result of 0 used to be taken as the entry not being able to start, so the SUB never left its RS
+def test_result_of_zero(data_memory, tmp_path):
+    results = run_checked([encode_r("SUB", 1, 2, 2), encode_r("ADD", 3, 1, 4)], data_memory, tmp_path)
+    assert results["ARF"]["x1"] == 0
+
+
+# Clearing the busy bit of an address used to set it in the memory. Once the line was evicted from the caches,
+# the next load of that address found the memory busy forever
+def test_load_after_eviction(data_memory, tmp_path):
+    words = [encode_i("LW", 1, 0, 0)]
+    words += [encode_i("LW", 2, 0, addr) for addr in range(1, 9)]
+    words += [encode_i("LW", 3, 0, 0)]
+
+    run_checked(words, data_memory, tmp_path)
+
+
+# Writes to x0 used to rename it, so x0 ended up with the written value, and its readers waited for it
+def test_x0_is_hardwired_to_zero(data_memory, tmp_path):
+    words = [encode_r("SUB", 0, 1, 3),
+             encode_i("ADDI", 0, 2, 5),
+             encode_r("ADD", 4, 0, 2)]
+
+    results = run_checked(words, data_memory, tmp_path)
+    assert results["ARF"]["x0"] == 0
+    assert results["ARF"]["x4"] == results["ARF"]["x2"]
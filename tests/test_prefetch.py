@@ -0,0 +1,167 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the prefetchers, the queue of prefetches in flight and the tracker that
+measures how useful they are
+'''
+
+import pytest
+
+from cache import Victim
+from cache_algos.prefetcher import PREFETCHERS, get_prefetcher
+from config import MachineConfig
+from memory_controller import MemoryController
+from prefetch_tracker import PrefetchTracker
+
+
+def test_unknown_prefetcher():
+    with pytest.raises(ValueError):
+        get_prefetcher("markov", 64)
+
+
+def test_next_line():
+    assert get_prefetcher("next_line", 64).prefetch_addresses(5) == [6]
+    assert get_prefetcher("next_line", 64, degree=2, distance=3).prefetch_addresses(5) == [8, 9]
+    assert get_prefetcher("next_line", 8).prefetch_addresses(7) == [0]
+
+
+def test_none_never_prefetches():
+    assert get_prefetcher("none", 64).prefetch_addresses(5) == []
+
+
+def test_stride_needs_a_steady_stride():
+    prefetcher = get_prefetcher("stride", 64, degree=2)
+
+    assert prefetcher.prefetch_addresses(10, pc=1) == []
+    assert prefetcher.prefetch_addresses(13, pc=1) == []
+    assert prefetcher.prefetch_addresses(16, pc=1) == [19, 22]
+    assert prefetcher.prefetch_addresses(20, pc=1) == []
+    assert prefetcher.prefetch_addresses(30, pc=2) == []
+
+
+def test_stride_ignores_accesses_without_a_pc():
+    prefetcher = get_prefetcher("stride", 64)
+    for addr in range(0, 10, 2):
+        assert prefetcher.prefetch_addresses(addr) == []
+
+
+def test_stream_follows_a_confirmed_direction():
+    prefetcher = get_prefetcher("stream", 64, degree=2)
+
+    assert prefetcher.prefetch_addresses(20) == []
+    assert prefetcher.prefetch_addresses(19) == []
+    assert prefetcher.prefetch_addresses(18) == [17, 16]
+    assert prefetcher.prefetch_addresses(50) == []
+
+
+def test_prefetches_stay_in_the_memory():
+    prefetcher = get_prefetcher("stream", 8, degree=4)
+    for addr in [4, 5]:
+        prefetcher.prefetch_addresses(addr)
+
+    assert prefetcher.prefetch_addresses(6) == [7]
+
+
+@pytest.mark.parametrize("name", sorted(PREFETCHERS))
+def test_state_round_trip(name):
+    prefetcher = get_prefetcher(name, 64)
+    for addr in [3, 5, 7, 9, 30]:
+        prefetcher.prefetch_addresses(addr, pc=4)
+
+    restored = get_prefetcher(name, 64)
+    restored.restore_state(prefetcher.save_state())
+
+    assert restored.prefetch_addresses(11, pc=4) == prefetcher.prefetch_addresses(11, pc=4)
+
+
+def test_tracker_counts_useful_and_useless_prefetches():
+    tracker = PrefetchTracker()
+    tracker.record_fill(4, prefetch=True)
+    tracker.record_fill(6, prefetch=True)
+    tracker.record_fill(8, victim=Victim(6, (0,), False), prefetch=True)
+
+    assert tracker.record_hit(4)
+    assert not tracker.record_hit(4)
+
+    assert tracker.get_total_prefetches() == 3
+    assert tracker.get_useful_prefetches() == 1
+    assert tracker.get_useless_prefetches() == 1
+    assert tracker.get_accuracy() == 0.33
+
+
+def test_tracker_counts_late_prefetches_and_pollution():
+    tracker = PrefetchTracker()
+    tracker.record_fill(2, victim=Victim(1, (0,), False), prefetch=True)
+    tracker.record_miss(1)
+    tracker.record_miss(3, in_flight=True)
+
+    assert tracker.get_pollution() == 1
+    assert tracker.get_late_prefetches() == 1
+    assert tracker.get_coverage(3) == 0
+
+
+def test_tracker_state_round_trip():
+    tracker = PrefetchTracker()
+    tracker.record_fill(2, victim=Victim(1, (0,), False), prefetch=True)
+    tracker.record_fill(3, prefetch=True)
+
+    restored = PrefetchTracker()
+    restored.restore_state(tracker.save_state())
+    assert restored.save_state() == tracker.save_state()
+
+
+# Function to get a memory controller, with a next line prefetcher on the second level
+def make_controller(data_memory, prefetcher="next_line"):
+    config = MachineConfig.from_dict({"hierarchy": {
+        "memory_latency": 10,
+        "levels": [{"name": "L1D", "size": 2, "ways": 2, "latency": 1},
+                   {"name": "L2D", "size": 8, "ways": 2, "latency": 4, "prefetcher": {"name": prefetcher}}]}})
+    return MemoryController(data_memory, config, save_to_file=False)
+
+
+def test_prefetch_arrives_after_the_memory_latency(data_memory):
+    controller = make_controller(data_memory)
+    controller.get_memory_entry(3)
+
+    assert controller.cycles_to_next_prefetch() == 10
+    for _ in range(9):
+        controller.prefetch_tick()
+    assert controller.get_latency(4) == controller.get_latency(100)
+
+    controller.prefetch_tick()
+    assert controller.cycles_to_next_prefetch() is None
+    assert controller.get_latency(4) == 5
+    assert controller.get_total_prefetches() == 1
+
+
+def test_prefetch_in_flight_is_not_issued_again(data_memory):
+    controller = make_controller(data_memory)
+    controller.get_memory_entry(3)
+    controller.prefetch_tick()
+    controller.get_memory_entry(3)
+
+    for _ in range(20):
+        controller.prefetch_tick()
+
+    assert controller.get_total_prefetches() == 1
+
+
+def test_prefetched_line_is_used(data_memory):
+    controller = make_controller(data_memory)
+    controller.get_memory_entry(3)
+    for _ in range(10):
+        controller.prefetch_tick()
+
+    assert controller.get_memory_entry(4)[1] == 5
+    assert controller.get_prefetch_hits() == 1
+    assert controller.get_prefetch_accuracy() == 1
+
+
+def test_skipping_prefetch_cycles(data_memory):
+    controller = make_controller(data_memory)
+    controller.get_memory_entry(3)
+    controller.skip_prefetch_cycles(9)
+
+    assert controller.cycles_to_next_prefetch() == 1
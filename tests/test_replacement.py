@@ -0,0 +1,120 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the cache replacement policies, and the registry they are picked from
+'''
+
+import pytest
+
+from cache_algos.replacement import POLICIES, get_policy
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        get_policy("mru", 4, 2)
+
+
+def test_names_are_case_insensitive():
+    assert str(get_policy("LRU", 4, 2)) == "LRU"
+
+
+def test_lru_evicts_the_least_recently_used_way():
+    policy = get_policy("lru", 4, 4)
+    for way in range(4):
+        policy.on_fill(0, way)
+    policy.on_hit(0, 0)
+    policy.on_hit(0, 2)
+
+    assert policy.evict_index(0) == 1
+
+
+def test_fifo_ignores_hits():
+    policy = get_policy("fifo", 4, 4)
+    for way in range(4):
+        policy.on_fill(0, way)
+    policy.on_hit(0, 0)
+
+    assert policy.evict_index(0) == 0
+    policy.on_fill(0, 0)
+    assert policy.evict_index(0) == 1
+
+
+def test_plru_points_away_from_the_last_access():
+    policy = get_policy("plru", 4, 4)
+    for way in range(4):
+        policy.on_fill(0, way)
+
+    policy.on_hit(0, 0)
+    assert policy.evict_index(0) in (2, 3)
+
+    policy.on_hit(0, 2)
+    assert policy.evict_index(0) == 1
+
+
+def test_plru_needs_a_power_of_two_ways():
+    with pytest.raises(ValueError):
+        get_policy("plru", 6, 3)
+
+
+def test_srrip_evicts_lines_that_were_never_hit():
+    policy = get_policy("srrip", 4, 4)
+    for way in range(4):
+        policy.on_fill(0, way)
+    for way in [0, 1, 3]:
+        policy.on_hit(0, way)
+
+    assert policy.evict_index(0) == 2
+
+
+def test_brrip_mostly_inserts_at_the_distant_interval():
+    policy = get_policy("brrip", 4, 4, throttle=4)
+    rrpvs = [policy.insertion_rrpv() for _ in range(8)]
+
+    assert rrpvs.count(2) == 2 and rrpvs.count(3) == 6
+
+
+def test_random_is_repeatable():
+    first = get_policy("random", 8, 4)
+    second = get_policy("random", 8, 4)
+
+    assert [first.evict_index(0) for _ in range(10)] == [second.evict_index(0) for _ in range(10)]
+
+
+@pytest.mark.parametrize("name", ["lru", "fifo", "plru", "srrip", "brrip"])
+@pytest.mark.parametrize("invalidated", range(4))
+def test_invalidated_way_is_the_next_victim(name, invalidated):
+    policy = get_policy(name, 4, 4)
+    for way in range(4):
+        policy.on_fill(0, way)
+        policy.on_hit(0, way)
+
+    policy.on_invalidate(0, invalidated)
+    assert policy.evict_index(0) == invalidated
+
+
+@pytest.mark.parametrize("name", sorted(POLICIES))
+def test_state_round_trip(name):
+    policy = get_policy(name, 8, 4)
+    for way in [0, 1, 2, 3, 1, 0]:
+        policy.on_fill(1, way)
+        policy.on_hit(1, (way + 1) % 4)
+    state = policy.save_state()
+
+    restored = get_policy(name, 8, 4)
+    restored.restore_state(state)
+
+    assert restored.save_state() == state
+    assert [restored.evict_index(index) for index in range(2)] == [policy.evict_index(index) for index in range(2)]
+
+
+@pytest.mark.parametrize("name", sorted(POLICIES))
+def test_state_of_some_sets(name):
+    policy = get_policy(name, 8, 4)
+    policy.on_fill(1, 2)
+
+    full = policy.save_state()
+    part = policy.save_state([1])
+    assert all(full[key] == value for key, value in part.items())
+    assert 0 not in part
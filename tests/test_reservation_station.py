@@ -0,0 +1,111 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the reservation stations, their ready queues and the select policies
+'''
+
+import pytest
+
+import constants
+from bench import encode_i, encode_r
+from config import MachineConfig
+from instruction import Instruction
+from register_bank import RegisterBank
+from reservation_station import ReservationStation
+from rob import ROBTable
+from select_policy import get_select_policy
+
+
+# Function to get an RS, along with an ARF in which x5 is waiting on the ROB entry of an older instruction
+def make_rs(select_policy="oldest_first", size=4):
+    config = MachineConfig(select_policy=select_policy)
+    arf = RegisterBank("ARF", init=list(range(8)))
+    rob = ROBTable(size=8)
+
+    slot = rob.add_entry(Instruction.from_word(encode_r("MUL", 5, 1, 1), 1), arf.get_register("x5"))
+    arf.get_register("x5").set_link(rob.get_tag(slot))
+
+    return ReservationStation(constants.MUL_DIV, size, config), arf, rob, slot
+
+
+def test_unknown_select_policy():
+    with pytest.raises(ValueError):
+        get_select_policy("youngest_first")
+
+
+def test_entry_with_its_operands_is_ready():
+    rs, arf, rob, _ = make_rs()
+    rs.add_entry(Instruction.from_word(encode_r("ADD", 1, 2, 3), 2), arf, rob)
+
+    ready = rs.get_ready_entries()
+    assert len(ready) == 1 and ready[0].get_result() == 5
+
+
+def test_only_dependents_are_woken_up():
+    rs, arf, rob, slot = make_rs()
+    waiting = Instruction.from_word(encode_r("ADD", 1, 5, 2), 2)
+    rs.add_entry(waiting, arf, rob)
+    assert not rs.has_ready()
+
+    rob.update_value(slot, 10)
+    rs.update_rs_entries(rob.get_entries()[rob.get_tag(slot)])
+
+    # The entry woken up by the broadcast only starts executing in the next cycle
+    assert rs.has_ready() and rs.get_ready_entries() == []
+    rs.update_ready_queue()
+    assert [entry.get_result() for entry in rs.get_ready_entries()] == [12]
+
+
+def test_ready_queue_is_in_program_order():
+    rs, arf, rob, slot = make_rs()
+    rs.add_entry(Instruction.from_word(encode_r("ADD", 1, 5, 2), 2), arf, rob)
+    rs.add_entry(Instruction.from_word(encode_r("ADD", 1, 2, 3), 3), arf, rob)
+
+    rob.update_value(slot, 10)
+    rs.update_rs_entries(rob.get_entries()[rob.get_tag(slot)])
+    rs.update_ready_queue()
+
+    assert [entry.get_inst().PC for entry in rs.get_ready_entries()] == [2, 3]
+
+
+def test_longest_latency_first():
+    rs, arf, rob, _ = make_rs("longest_latency_first")
+    rs.add_entry(Instruction.from_word(encode_r("MUL", 1, 2, 3), 2), arf, rob)
+    rs.add_entry(Instruction.from_word(encode_r("DIV", 1, 2, 3), 3), arf, rob)
+    rs.add_entry(Instruction.from_word(encode_r("MUL", 1, 2, 3), 4), arf, rob)
+
+    assert [entry.get_inst().PC for entry in rs.get_ready_entries()] == [3, 2, 4]
+
+
+def test_full_rs_rejects_entries():
+    rs, arf, rob, _ = make_rs(size=2)
+    for PC in range(2, 4):
+        assert rs.add_entry(Instruction.from_word(encode_i("ADDI", 1, 2, PC), PC), arf, rob)
+
+    assert rs.is_busy()
+    assert not rs.add_entry(Instruction.from_word(encode_i("ADDI", 1, 2, 4), 4), arf, rob)
+
+    rs.remove_entry(rs.get_ready_entries()[0])
+    assert not rs.is_busy()
+    assert [entry.get_inst().PC for entry in rs.get_ready_entries()] == [3]
+
+
+def test_state_round_trip():
+    rs, arf, rob, slot = make_rs()
+    rs.add_entry(Instruction.from_word(encode_r("ADD", 1, 5, 2), 2), arf, rob)
+    rs.add_entry(Instruction.from_word(encode_r("ADD", 1, 2, 3), 3), arf, rob)
+    state = rs.save_state()
+
+    restored = ReservationStation(constants.MUL_DIV, 4, MachineConfig())
+    restored.restore_state(state)
+    assert restored.save_state() == state
+
+    rob.update_value(slot, 10)
+    for station in [rs, restored]:
+        station.update_rs_entries(rob.get_entries()[rob.get_tag(slot)])
+        station.update_ready_queue()
+
+    assert [entry.save_state() for entry in restored.get_ready_entries()] == \
+        [entry.save_state() for entry in rs.get_ready_entries()]
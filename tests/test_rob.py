@@ -0,0 +1,67 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the ROB, which is a circular buffer of fixed size
+'''
+
+from bench import encode_r
+from instruction import Instruction
+from register_bank import RegisterBank
+from rob import ROBTable
+
+
+# Function to get a few instructions in program order
+def get_instructions(n):
+    return [Instruction.from_word(encode_r("ADD", 1, 2, 3), PC) for PC in range(1, n + 1)]
+
+
+def test_entries_leave_in_program_order():
+    rob = ROBTable(size=3)
+    instructions = get_instructions(3)
+    slots = [rob.add_entry(instruction) for instruction in instructions]
+
+    assert slots == [0, 1, 2]
+    assert rob.is_full() and rob.add_entry(instructions[0]) is False
+    assert [rob.remove_entry().get_inst() for _ in range(3)] == instructions
+    assert rob.remove_entry() is False
+
+
+def test_slots_wrap_around():
+    rob = ROBTable(size=2)
+    first, second, third = get_instructions(3)
+    rob.add_entry(first)
+    rob.add_entry(second)
+    rob.remove_entry()
+
+    assert rob.add_entry(third) == 0
+    assert rob.get_tail_inst() == second
+    assert rob.get_tag(0) == "ROB1"
+
+
+def test_values_are_looked_up_by_tag():
+    rob = ROBTable(size=4)
+    slot = rob.add_entry(get_instructions(1)[0])
+    tag = rob.get_tag(slot)
+
+    assert not rob.has_value(tag)
+    rob.update_value(slot, 0)
+    assert rob.has_value(tag) and rob.get_value(tag) == 0
+    assert not rob.has_value(None)
+
+
+def test_state_round_trip():
+    arf = RegisterBank("ARF", init=[0, 1, 2, 3])
+    rob = ROBTable(size=3)
+    for instruction in get_instructions(3):
+        rob.add_entry(instruction, arf.get_register("x1"))
+    rob.remove_entry()
+    rob.update_value(1, 7)
+    state = rob.save_state()
+
+    restored = ROBTable(size=3)
+    restored.restore_state(state, arf)
+
+    assert restored.save_state() == state
+    assert restored.remove_entry().get_destination() is arf.get_register("x1")
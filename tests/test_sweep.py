@@ -0,0 +1,100 @@
+'''
+MIT Licensed by Shubhayu Das, Veerendra S Devaraddi, Sai Manish Sasanapuri, copyright 2021
+
+Developed for Processor Architecture course assignments 1 and 3 - Tomasulo Out-Of-Order Machine
+
+This file contains the tests of the parameter sweep driver and the benchmark harness
+'''
+
+import csv
+import copy
+
+import pytest
+
+import bench
+from config import MachineConfig
+from conftest import example_program
+from headless import run_simulation
+from instruction import Instruction
+from sweep import build_config, expand_grid, parse_value, run_sweep, write_results
+
+
+def test_expand_grid():
+    assert expand_grid({"rob_size": [4, 8], "L1D.size": [2]}) == [
+        {"rob_size": 4, "L1D.size": 2}, {"rob_size": 8, "L1D.size": 2}]
+
+
+def test_build_config_leaves_the_base_config_alone():
+    base = MachineConfig()
+    original = copy.deepcopy(base)
+
+    config = build_config({"rob_size": 4, "NumCycles.MUL": 7, "FU.DIV.count": 3, "memory_latency": 30,
+                           "line_size": 2, "L2D.ways": 4, "L2D.prefetcher": "stride",
+                           "L2D.prefetcher.degree": 2}, base)
+
+    assert base == original
+    assert (config.rob_size, config.num_cycles["MUL"], config.functional_units["DIV"].count) == (4, 7, 3)
+    assert config.hierarchy.memory_latency == 30
+    assert [level.line_size for level in config.hierarchy.levels] == [2, 2]
+    l2 = config.hierarchy.levels[1]
+    assert (l2.ways, l2.prefetcher.name, l2.prefetcher.degree) == (4, "stride", 2)
+
+
+@pytest.mark.parametrize("point", [
+    {"rob_size": 0},
+    {"L3D.size": 4},
+    {"L1D.colour": 1},
+    {"NumCycles.XOR": 1},
+    {"FU.FPU.count": 1},
+    {"L1D.size": 3},
+])
+def test_invalid_points(point):
+    with pytest.raises(ValueError):
+        build_config(point, MachineConfig())
+
+
+def test_parse_value():
+    assert [parse_value(value) for value in ["4", "0.5", "True", "lru"]] == [4, 0.5, True, "lru"]
+
+
+def test_sweep_rows_match_headless_runs(data_memory, tmp_path):
+    programs = [example_program("demo"), example_program("lw_Sw_tester")]
+    grid = {"rob_size": [2, 8], "L1D.size": [2, 4]}
+
+    rows = run_sweep(programs, data_memory, grid, workers=1)
+
+    assert len(rows) == 8
+    for row, (program, point) in zip(rows, [(program, point) for program in programs for point in expand_grid(grid)]):
+        results = run_simulation(program, data_memory, config=build_config(point, MachineConfig()))
+        assert row["program"] == program and row["cycles"] == results["cycles"]
+
+    output = tmp_path / "sweep.csv"
+    write_results(rows, str(output))
+    with open(output) as csvFile:
+        assert [int(row["cycles"]) for row in csv.DictReader(csvFile)] == [row["cycles"] for row in rows]
+
+
+def test_encoders():
+    assert Instruction.from_word(bench.encode_r("SUB", 1, 2, 3)).str_disassemble() == "SUB x1, x2, x3"
+    assert Instruction.from_word(bench.encode_i("LW", 4, 5, -8)).str_disassemble() == "LW x4, -8(x5)"
+    assert Instruction.from_word(bench.encode_s("SW", 6, 7, 12)).str_disassemble() == "SW x6, 12(x7)"
+
+
+def test_generated_program_is_repeatable():
+    program = bench.generate_program(200, 32, seed=3)
+
+    assert len(program) == 200
+    assert program == bench.generate_program(200, 32, seed=3)
+    assert program != bench.generate_program(200, 32, seed=4)
+
+
+def test_suite_and_compare(data_memory):
+    results = bench.run_suite([example_program("demo")], [50], data_memory, inline=True)
+
+    assert list(results["benchmarks"]) == ["demo", "synthetic_50"]
+    assert all(result["completed"] for result in results["benchmarks"].values())
+    assert bench.compare(results, results) == []
+
+    slower = copy.deepcopy(results)
+    slower["benchmarks"]["demo"]["cycles"] += 1
+    assert len(bench.compare(results, slower)) == 1